@@ -0,0 +1,212 @@
+import math
+from typing import Dict, Set, Tuple
+
+import numpy as np
+
+from bubble import Bubble
+from bubble_swarm import BubbleSwarm
+from collision import CollisionDetector
+from food import Food
+from food_field import FoodField
+from food_generator import FoodGenerator
+from kd_tree import KDTree
+from position import Position
+from profiler import NullProfiler
+from size import Size
+from spatial_grid import SpatialGrid
+
+
+class Arena:
+    """
+    Headless world of many player bubbles that share the foods.
+
+    The bubbles are stored in a `BubbleSwarm` and steered all at once towards the
+    targets of their players, so a tick costs about the same for hundreds of players
+    as for a few.
+
+    AI players head for their nearest food. The foods are indexed by a `KDTree`, rebuilt
+    in bulk only in the ticks when foods were added or removed, and the nearest foods of
+    all the AI bubbles are found with a single batched query.
+
+    With a `view_size`, every human player sees the area of that size around its bubble.
+    The bubbles in none of these viewports, grown by `LOD_MARGIN`, are stepped only every
+    `lod_interval` ticks with `BubbleSwarm.step_with_lod()`, so the far off-screen bubbles
+    cost a fraction of a tick.
+    ___
+
+    ### Arguments
+     - `size (Size)`: Size of the world.
+     - `generation_rate [float=20]`: Number of foods to be generated in one second.
+     - `seed [int=None]`: Seed of the food generation and the spawn positions. (None) for unpredictable.
+     - `easing [float=40]`: Easing coefficent of the steering.
+     - `profiler [FrameProfiler=None]`: Profiler that times the phases of `step()`.
+       Needs the `generation`, `expiry`, `targeting`, `steering` and `feeding` phases.
+     - `view_size [Size=None]`: Size of the viewports of the human players. (None) to step every bubble every tick.
+     - `lod_interval [int=4]`: Number of ticks between the steps of the bubbles outside the viewports.
+    """
+
+    # Distance around the viewports that is still stepped every tick, so bubbles entering the view are up to date
+    LOD_MARGIN = 100
+
+    def __init__(self, size: Size, generation_rate: float = 20, seed: int = None, easing: float = 40,
+                 profiler=None, view_size: Size = None, lod_interval: int = 4):
+        self.size = size
+        self.easing = easing
+        self.view_size = view_size
+        self.lod_interval = lod_interval
+        self.profiler = profiler if profiler is not None else NullProfiler()
+        self.bubble_radius = Bubble.DEFAULT_SIZE.width // 2
+
+        self.players = BubbleSwarm()
+        self.targets: Dict[int, Tuple[float, float]] = {}
+        self.scores: Dict[int, int] = {}
+        self.ai_players: Set[int] = set()
+        self.food_grid = SpatialGrid.for_radii(size, Food.DEFAULT_SIZE.width / 2, self.bubble_radius)
+        self.foods = FoodField(food_grid=self.food_grid)
+        self.food_generator = FoodGenerator(size, generation_rate=generation_rate, generating=True, seed=seed)
+        self.collision_detector = CollisionDetector(self.food_grid)
+        self.random = np.random.default_rng(seed)
+        self.tick = 0
+        self.food_tree = KDTree(np.empty((0, 2)))
+        self._food_tree_version = -1
+        self._food_tree_positions = np.empty((0, 2))
+
+    def add_player(self, ai: bool = False) -> int:
+        """
+        Spawns a bubble at a random position.
+        ___
+
+        ### Arguments
+         - `ai [bool=False]`: Whether the bubble is steered towards the nearest food instead of by its player.
+
+        ### Returns
+        `int`: Id of the player, the same as the id of its bubble.
+        """
+        x = float(self.random.uniform(0, self.size.width))
+        y = float(self.random.uniform(0, self.size.height))
+        player_id = self.players.add(Position(x, y))
+        self.targets[player_id] = (x, y)
+        self.scores[player_id] = 0
+        if ai:
+            self.ai_players.add(player_id)
+        return player_id
+
+    def remove_player(self, player_id: int) -> None:
+        """
+        ### Raises
+        `KeyError`: If there is no such player.
+        """
+        self.players.remove(player_id)
+        del self.targets[player_id]
+        del self.scores[player_id]
+        self.ai_players.discard(player_id)
+
+    def set_target(self, player_id: int, x: float, y: float) -> None:
+        """
+        Sets the target of a player, clamped to the world. Unknown players are ignored,
+        since their inputs can arrive after they left, and so are the targets that are not
+        finite, which the clamp would let through and which would break the spatial index.
+        """
+        if player_id in self.targets and math.isfinite(x) and math.isfinite(y):
+            self.targets[player_id] = (min(max(x, 0.0), self.size.width), min(max(y, 0.0), self.size.height))
+
+    def step(self, fps: int) -> None:
+        """
+        Advances the arena by a single tick of `1 / fps` seconds.
+        ___
+
+        ### Arguments
+         - `fps (int)`: The FPS (Frames per Second) value of the simulation
+        """
+        profiler = self.profiler
+        with profiler.phase('generation'):
+            self.food_generator.generate_in_game_loop(self.foods, fps)
+        with profiler.phase('expiry'):
+            self.foods.expire(1 / fps)
+
+        players = self.players
+        with profiler.phase('targeting'):
+            if self.ai_players:
+                self.target_nearest_foods()
+
+        with profiler.phase('steering'):
+            if len(players):
+                targets = self.targets
+                target_array = np.array([targets[player_id] for player_id in players.ids.tolist()],
+                                        dtype=np.float64)
+                if self.view_size is not None and self.lod_interval > 1:
+                    players.step_with_lod(target_array, fps, self.tick, self.viewports(), self.lod_interval,
+                                          self.easing)
+                else:
+                    players.steer(target_array, fps, self.easing)
+                    players.commit_movement(fps)
+
+        with profiler.phase('feeding'):
+            if len(players):
+                ids = players.ids
+                contacts = self.collision_detector.detect_feeding_at(players.positions, self.bubble_radius)
+                for index, food in sorted(contacts, key=lambda contact: contact[1].food_id):
+                    self.foods.remove(food)
+                    self.scores[int(ids[index])] += 1
+
+        self.tick += 1
+
+    def viewports(self) -> np.ndarray:
+        """
+        ### Returns
+        `numpy.ndarray`: (M, 4) array of the (left, top, right, bottom) viewports of the human players,
+        centered on their bubbles and grown by `LOD_MARGIN`. Empty without a `view_size`.
+        """
+        if self.view_size is None:
+            return np.empty((0, 4))
+        ids = self.players.ids
+        human = np.fromiter((player_id not in self.ai_players for player_id in ids.tolist()),
+                            dtype=np.bool_, count=len(ids))
+        centers = self.players.positions[human]
+        half = np.array([self.view_size.width / 2 + self.LOD_MARGIN, self.view_size.height / 2 + self.LOD_MARGIN])
+        return np.hstack((centers - half, centers + half))
+
+    def nearest_food_tree(self) -> KDTree:
+        """
+        ### Returns
+        `KDTree`: Index of the current food positions, rebuilt if foods were added or removed since the last call.
+        """
+        if self._food_tree_version != self.foods.version:
+            self._food_tree_positions = self.foods.positions()
+            self.food_tree = KDTree(self._food_tree_positions)
+            self._food_tree_version = self.foods.version
+        return self.food_tree
+
+    def target_nearest_foods(self) -> None:
+        """
+        Sets the target of every AI player to the food nearest to its bubble. The targets
+        are kept while there are no foods.
+        """
+        tree = self.nearest_food_tree()
+        if len(tree) == 0:
+            return
+        ids = self.players.ids
+        is_ai = np.fromiter((player_id in self.ai_players for player_id in ids.tolist()), dtype=np.bool_,
+                            count=len(ids))
+        _, nearest = tree.query(self.players.positions[is_ai], k=1)
+        targets = self.targets
+        for player_id, (x, y) in zip(ids[is_ai].tolist(), self._food_tree_positions[nearest[:, 0]].tolist()):
+            targets[player_id] = (x, y)
+
+    def __str__(self):
+        return "Arena: tick={}, players={}, foods={}".format(self.tick, len(self.players), len(self.foods))
+
+
+def main():
+    """ Created for test purposes """
+    arena = Arena(Size(1800, 1350), seed=0)
+    for index in range(100):
+        arena.add_player(ai=index % 2 == 0)
+    for _ in range(600):
+        arena.step(60)
+    print(arena, sum(arena.scores[player_id] for player_id in arena.ai_players),
+          sum(score for player_id, score in arena.scores.items() if player_id not in arena.ai_players))
+
+
+if __name__ == '__main__':
+    main()
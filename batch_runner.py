@@ -0,0 +1,291 @@
+"""
+Batch runner of many independent headless worlds for parameter tuning.
+
+    python batch_runner.py --seeds 100 --generation-rate 1 2 5 --max-velocity 200 300 \
+        --easing 20 40 --out results.jsonl
+
+Every combination of the given parameters is simulated once per seed. The worlds are
+spread across a `ProcessPoolExecutor` and their summaries are written to the results
+file as soon as they finish, one JSON object per line, or one CSV row per world if the
+path ends with `.csv`.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator
+
+import factor
+from bubble import Bubble
+from size import Size
+from world import RandomPilot, World
+
+SURFACE_SIZE = Size(900, 675)
+FPS = 60
+
+RESULT_FIELDS = ('index', 'seed', 'ticks', 'fps', 'generation_rate', 'max_velocity', 'easing',
+                 'swept_collision', 'factors', 'foods_eaten', 'distance_travelled', 'foods_left', 'elapsed', 'ticks_per_second')
+
+
+class WorldConfig:
+    """
+    Parameter set of a single headless world.
+    ___
+
+    ### Arguments
+     - `seed (int)`: Seed of the food generation and of the pilot.
+     - `ticks [int=FPS * 60]`: Number of simulation ticks.
+     - `fps [int=FPS]`: Simulated ticks per second of game time.
+     - `generation_rate [float=1]`: Number of foods to be generated in one second.
+     - `max_velocity [float=Bubble.DEFAULT_MAX_VELOCITY]`: Max velocity of the bubble.
+     - `easing [float=40]`: Easing coefficent of the bubble's steering.
+     - `factors [Dict[str, float]=None]`: Overrides of the `factor` module constants.
+     - `index [int=0]`: Position of the world in its batch.
+     - `swept_collision [bool=False]`: Whether the world detects the feeding along the movement of the bubble.
+    """
+
+    __slots__ = ('seed', 'ticks', 'fps', 'generation_rate', 'max_velocity', 'easing', 'factors', 'index',
+                 'swept_collision')
+
+    def __init__(self, seed: int, ticks: int = FPS * 60, fps: int = FPS, generation_rate: float = 1,
+                 max_velocity: float = Bubble.DEFAULT_MAX_VELOCITY, easing: float = 40,
+                 factors: Dict[str, float] = None, index: int = 0, swept_collision: bool = False):
+        self.seed = seed
+        self.ticks = ticks
+        self.fps = fps
+        self.generation_rate = generation_rate
+        self.max_velocity = max_velocity
+        self.easing = easing
+        self.factors = dict(factors) if factors else {}
+        self.index = index
+        self.swept_collision = swept_collision
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __str__(self):
+        return "WorldConfig: " + ", ".join("{}={}".format(name, value) for name, value in self.as_dict().items())
+
+
+def check_factor(name: str) -> None:
+    """
+    ### Raises
+    `ValueError`: If `name` is not a constant of the `factor` module.
+    """
+    if not name.isupper() or not hasattr(factor, name):
+        raise ValueError("{} is not a constant of the factor module".format(name))
+
+
+def apply_factors(factors: Dict[str, float]) -> Dict[str, float]:
+    """
+    Overrides the constants of the `factor` module.
+    ___
+
+    ### Arguments
+     - `factors (Dict[str, float])`: New values by constant name.
+
+    ### Returns
+    `Dict[str, float]`: Previous values, to restore the constants with.
+
+    ### Raises
+    `ValueError`: If a name is not a constant of the `factor` module.
+    """
+    previous = {}
+    for name, value in factors.items():
+        check_factor(name)
+        previous[name] = getattr(factor, name)
+        setattr(factor, name, value)
+    return previous
+
+
+def simulate(config: WorldConfig) -> dict:
+    """
+    Runs a single headless world to the end and summarizes it. This is the unit of work
+    of the worker processes, it only exchanges the small config and summary objects.
+    ___
+
+    ### Arguments
+     - `config (WorldConfig)`: Parameters of the world.
+
+    ### Returns
+    `dict`: The config fields with the foods eaten, distance travelled, foods left,
+    elapsed wall time and ticks per second of the run.
+    """
+    previous = apply_factors(config.factors)
+    try:
+        pilot = RandomPilot(config.seed)
+        world = World(SURFACE_SIZE, generation_rate=config.generation_rate, seed=config.seed,
+                      max_velocity=config.max_velocity, easing=config.easing,
+                      swept_collision=config.swept_collision)
+        fps = config.fps
+
+        start = time.perf_counter()
+        for _ in range(config.ticks):
+            pilot.update(world)
+            world.step(fps)
+        elapsed = time.perf_counter() - start
+    finally:
+        apply_factors(previous)
+
+    result = config.as_dict()
+    result.update({
+        'foods_eaten': world.foods_eaten,
+        'distance_travelled': world.distance_travelled,
+        'foods_left': len(world.foods),
+        'elapsed': elapsed,
+        'ticks_per_second': config.ticks / elapsed if elapsed > 0 else float('inf'),
+    })
+    return result
+
+
+def parameter_grid(seeds: Iterable[int], ticks: int = FPS * 60, fps: int = FPS,
+                   generation_rates: Iterable[float] = (1,),
+                   max_velocities: Iterable[float] = (Bubble.DEFAULT_MAX_VELOCITY,),
+                   easings: Iterable[float] = (40,),
+                   factor_grid: Dict[str, Iterable[float]] = None,
+                   swept_collision: bool = False) -> Iterator[WorldConfig]:
+    """
+    Yields a config for every seed of every combination of the parameters.
+    ___
+
+    ### Arguments
+     - `seeds (Iterable[int])`: Seeds to run each combination with.
+     - `ticks [int=FPS * 60]`: Number of simulation ticks of each world.
+     - `fps [int=FPS]`: Simulated ticks per second of game time.
+     - `generation_rates [Iterable[float]=(1,)]`: Food generation rates.
+     - `max_velocities [Iterable[float]=(Bubble.DEFAULT_MAX_VELOCITY,)]`: Max velocities of the bubble.
+     - `easings [Iterable[float]=(40,)]`: Easing coefficents of the steering.
+     - `factor_grid [Dict[str, Iterable[float]]=None]`: Values of the `factor` constants to combine.
+     - `swept_collision [bool=False]`: Whether the worlds detect the feeding along the movement of the bubble.
+
+    ### Returns
+    `Iterator[WorldConfig]`: Configs, indexed in the order they are yielded.
+    """
+    factor_grid = factor_grid or {}
+    names = list(factor_grid)
+    combinations = itertools.product(generation_rates, max_velocities, easings,
+                                     itertools.product(*(factor_grid[name] for name in names)),
+                                     seeds)
+    for index, (rate, max_velocity, easing, factor_values, seed) in enumerate(combinations):
+        yield WorldConfig(seed, ticks, fps, rate, max_velocity, easing, dict(zip(names, factor_values)), index,
+                          swept_collision)
+
+
+class ResultWriter:
+    """
+    Appends world summaries to a results file and flushes after each one, so partial
+    results survive an interrupted batch.
+    ___
+
+    ### Arguments
+     - `path (str)`: Output file path. CSV if it ends with `.csv`, JSON lines otherwise.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'w', newline='')
+        self._csv = None
+        if path.endswith('.csv'):
+            self._csv = csv.DictWriter(self._file, RESULT_FIELDS)
+            self._csv.writeheader()
+
+    def write(self, result: dict) -> None:
+        if self._csv is not None:
+            self._csv.writerow(dict(result, factors=json.dumps(result['factors'])))
+        else:
+            self._file.write(json.dumps(result) + '\n')
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+def run_batch(configs: Iterable[WorldConfig], writer: ResultWriter, workers: int = None,
+              in_flight_per_worker: int = 4) -> int:
+    """
+    Simulates the worlds in a process pool and writes their summaries as they finish,
+    in completion order. Only a bounded number of worlds are submitted ahead, so the
+    configs can be a lazy iterator of any length.
+    ___
+
+    ### Arguments
+     - `configs (Iterable[WorldConfig])`: Worlds to be simulated.
+     - `writer (ResultWriter)`: Destination of the summaries.
+     - `workers [int=None]`: Number of worker processes. (None) for the number of CPUs.
+     - `in_flight_per_worker [int=4]`: Number of submitted but unfinished worlds per worker.
+
+    ### Returns
+    `int`: Number of simulated worlds.
+    """
+    workers = workers or os.cpu_count() or 1
+    configs = iter(configs)
+    completed = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for config in itertools.islice(configs, workers * in_flight_per_worker):
+            pending.add(executor.submit(simulate, config))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                writer.write(future.result())
+                completed += 1
+            for config in itertools.islice(configs, len(done)):
+                pending.add(executor.submit(simulate, config))
+    return completed
+
+
+def parse_arguments(arguments=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Batch runner of headless Feed or Breed worlds")
+    parser.add_argument('--out', default='results.jsonl', metavar='PATH',
+                        help="results file, CSV if PATH ends with .csv, JSON lines otherwise")
+    parser.add_argument('--seeds', type=int, default=10, help="number of seeds per parameter set")
+    parser.add_argument('--first-seed', type=int, default=0, help="first seed of the range")
+    parser.add_argument('--ticks', type=int, default=FPS * 60, help="simulation ticks of each world")
+    parser.add_argument('--tick-rate', type=int, default=FPS, help="simulation ticks per second of game time")
+    parser.add_argument('--generation-rate', type=float, nargs='+', default=[1])
+    parser.add_argument('--max-velocity', type=float, nargs='+', default=[Bubble.DEFAULT_MAX_VELOCITY])
+    parser.add_argument('--easing', type=float, nargs='+', default=[40])
+    parser.add_argument('--swept-collision', action='store_true',
+                        help="detect the feeding along the movement of the bubble, for low tick rates")
+    parser.add_argument('--factor', nargs='+', action='append', default=[], metavar=('NAME', 'VALUE'),
+                        help="values of a factor.py constant, e.g. --factor TIME_FACTOR 1 1.5")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parsed = parser.parse_args(arguments)
+    for values in parsed.factor:
+        if len(values) < 2:
+            parser.error("argument --factor: {} needs at least one value".format(values[0]))
+    return parsed
+
+
+def main():
+    arguments = parse_arguments()
+    factor_grid = {values[0]: [float(value) for value in values[1:]] for values in arguments.factor}
+    for name in factor_grid:
+        check_factor(name)
+
+    seeds = range(arguments.first_seed, arguments.first_seed + arguments.seeds)
+    configs = parameter_grid(seeds, arguments.ticks, arguments.tick_rate, arguments.generation_rate,
+                             arguments.max_velocity, arguments.easing, factor_grid, arguments.swept_collision)
+
+    start = time.perf_counter()
+    with ResultWriter(arguments.out) as writer:
+        completed = run_batch(configs, writer, arguments.workers)
+    elapsed = time.perf_counter() - start
+    print("Simulated {} worlds in {:.2f} s ({:.0f} ticks/s), results in {}".format(
+        completed, elapsed, completed * arguments.ticks / elapsed if elapsed > 0 else float('inf'),
+        arguments.out), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
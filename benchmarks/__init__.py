@@ -0,0 +1,4 @@
+"""
+Benchmarks of the game. Each module is runnable from the repository root, e.g.
+`python -m benchmarks.collision`.
+"""
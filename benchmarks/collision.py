@@ -0,0 +1,70 @@
+"""
+Per-frame cost of `CollisionDetector.detect_feeding` as the food count grows.
+
+The `grid` column keeps the world at `SURFACE_SIZE`, so the food density grows with
+the count. The `grid, scaled` column grows the world with the count to keep the
+density of 1000 foods on `SURFACE_SIZE`, which isolates the cost of the total count.
+
+    python -m benchmarks.collision
+"""
+import math
+import random
+import timeit
+
+from bubble import Bubble
+from collision import CollisionDetector
+from food import Food
+from position import Position
+from size import Size
+from spatial_grid import SpatialGrid
+
+SURFACE_SIZE = Size(900, 675)
+FOOD_COUNTS = (100, 1000, 10000, 100000)
+N_BUBBLES = 10
+BRUTE_FORCE_LIMIT = 10000
+REFERENCE_COUNT = 1000
+
+
+def build_world(n_foods: int, world_size: Size = SURFACE_SIZE, seed: int = 0):
+    rng = random.Random(seed)
+    grid = SpatialGrid.for_radii(world_size, Food.DEFAULT_SIZE.width / 2,
+                                 Bubble.DEFAULT_SIZE.width / 2)
+    foods = []
+    for _ in range(n_foods):
+        food = Food(Position(rng.randint(0, world_size.width - 1),
+                             rng.randint(0, world_size.height - 1)))
+        grid.insert(food, food.position, food.radius())
+        foods.append(food)
+    bubbles = [Bubble(Position(rng.uniform(0, world_size.width), rng.uniform(0, world_size.height)))
+               for _ in range(N_BUBBLES)]
+    return grid, foods, bubbles
+
+
+def scaled_world_size(n_foods: int) -> Size:
+    scale = math.sqrt(max(n_foods, REFERENCE_COUNT) / REFERENCE_COUNT)
+    return Size(int(SURFACE_SIZE.width * scale), int(SURFACE_SIZE.height * scale))
+
+
+def time_per_frame(detector: CollisionDetector, foods, bubbles, number: int) -> float:
+    timer = timeit.Timer(lambda: detector.detect_feeding(foods, bubbles))
+    return min(timer.repeat(repeat=5, number=number)) / number
+
+
+def main():
+    print("{:>8} {:>14} {:>22} {:>14}".format("foods", "grid (us)", "grid, scaled (us)", "brute (us)"))
+    for n_foods in FOOD_COUNTS:
+        grid, foods, bubbles = build_world(n_foods, scaled_world_size(n_foods))
+        scaled_time = time_per_frame(CollisionDetector(grid), foods, bubbles, number=200)
+
+        grid, foods, bubbles = build_world(n_foods)
+        grid_time = time_per_frame(CollisionDetector(grid), foods, bubbles, number=200)
+        if n_foods <= BRUTE_FORCE_LIMIT:
+            brute_time = "{:14.1f}".format(
+                time_per_frame(CollisionDetector(), foods, bubbles, number=5) * 1e6)
+        else:
+            brute_time = "{:>14}".format("-")
+        print("{:>8} {:14.1f} {:22.1f} {}".format(n_foods, grid_time * 1e6, scaled_time * 1e6, brute_time))
+
+
+if __name__ == '__main__':
+    main()
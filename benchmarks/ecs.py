@@ -0,0 +1,133 @@
+"""
+Simulation tick of the entity-component store against the per-object `Bubble` and `Food` loop.
+
+Checks that `EcsWorld` simulates the same game as `World`. Then times a tick of many
+wandering bubbles and foods, once as objects stepped one by one through their `Moveable`
+methods, and once as entities updated by the systems in bulk. Last, the same number of
+entities is split into more and more kinds, to show that a new kind costs the tick one
+more table instead of a call per entity.
+
+    python -m benchmarks.ecs
+"""
+import time
+
+import numpy as np
+
+from bubble import Bubble
+from ecs import EntityStore, SystemScheduler
+from ecs_world import EcsWorld, ExpirySystem, MovementSystem, SteeringSystem
+from food import Food
+from position import Position
+from size import Size
+from velocity import Velocity
+from world import RandomPilot, World
+
+SURFACE_SIZE = Size(900, 675)
+FPS = 60
+ENTITY_COUNTS = (100, 1000, 10000, 100000)
+OBJECT_LIMIT = 10000
+KIND_COUNTS = (1, 4, 16, 64)
+KIND_ENTITIES = 20000
+FRAMES = 30
+WANDERER_COMPONENTS = ('position', 'velocity', 'target', 'pinned', 'render_style')
+FOOD_COMPONENTS = ('position', 'lifetime', 'render_style', 'edible')
+
+
+def check_against_world(ticks: int = 20000, seed: int = 3) -> bool:
+    results = []
+    for world_class in (World, EcsWorld):
+        world = world_class(SURFACE_SIZE, generation_rate=200, seed=seed)
+        pilot = RandomPilot(seed)
+        for _ in range(ticks):
+            pilot.update(world)
+            world.step(FPS)
+        results.append((len(world.foods), world.foods_eaten, round(world.distance_travelled, 6)))
+    return results[0] == results[1]
+
+
+def random_points(rng: np.random.Generator, n_points: int) -> np.ndarray:
+    return rng.uniform((0, 0), SURFACE_SIZE.as_tuple(), size=(n_points, 2))
+
+
+def build_objects(n_entities: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    bubbles = [Bubble(Position(x, y), velocity=Velocity(0, 0)) for x, y in random_points(rng, n_entities).tolist()]
+    targets = [Position(x, y) for x, y in random_points(rng, n_entities).tolist()]
+    foods = [Food(Position(int(x), int(y))) for x, y in random_points(rng, n_entities).tolist()]
+    for food in foods:
+        food.remaining_life = float('inf')
+    return bubbles, targets, foods
+
+
+def object_tick(bubbles, targets, foods):
+    for bubble, target in zip(bubbles, targets):
+        bubble.remember_position()
+        if target.euclidean_distance_to(bubble.position) < bubble.velocity.coefficent / FPS:
+            bubble.position.copy_from(target)
+            bubble.pinned = True
+        else:
+            bubble.pinned = False
+            bubble.set_velocity_for_target(target)
+            bubble.commit_movement(FPS)
+    living = []
+    for food in foods:
+        food.age(1 / FPS)
+        if food.is_alive():
+            living.append(food)
+    foods[:] = living
+
+
+def build_store(n_entities: int, n_kinds: int = 1, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    store = EntityStore()
+    wanderers_per_kind = n_entities // n_kinds
+    for kind in range(n_kinds):
+        store.register_kind('wanderer {}'.format(kind), WANDERER_COMPONENTS)
+        positions = random_points(rng, wanderers_per_kind)
+        targets = random_points(rng, wanderers_per_kind)
+        store.spawn_many('wanderer {}'.format(kind), wanderers_per_kind, x=positions[:, 0], y=positions[:, 1],
+                         previous_x=positions[:, 0], previous_y=positions[:, 1], target_x=targets[:, 0],
+                         target_y=targets[:, 1], max_velocity=Bubble.DEFAULT_MAX_VELOCITY,
+                         radius=Bubble.DEFAULT_SIZE.width // 2, color=Bubble.DEFAULT_COLOR.as_rgba(), visible=True)
+    store.register_kind('food', FOOD_COMPONENTS)
+    positions = random_points(rng, n_entities).astype(np.int64)
+    store.spawn_many('food', n_entities, x=positions[:, 0], y=positions[:, 1], expires_at=np.inf,
+                     radius=Food.DEFAULT_SIZE.width // 2, color=Food.DEFAULT_COLOR.as_rgba(), visible=True)
+    return store
+
+
+def time_frames(frame, *arguments) -> float:
+    frame(*arguments)
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        frame(*arguments)
+    return (time.perf_counter() - start) / FRAMES
+
+
+def main():
+    print("EcsWorld simulates the same game as World: {}".format(check_against_world()))
+
+    print("Tick of N wandering bubbles and N foods, ms")
+    print("{:>8}{:>14}{:>14}{:>10}".format("N", "objects", "ecs", "speedup"))
+    for n_entities in ENTITY_COUNTS:
+        store = build_store(n_entities)
+        systems = SystemScheduler((SteeringSystem(), MovementSystem(), ExpirySystem()))
+        ecs_tick = time_frames(systems.run, store, FPS)
+        if n_entities <= OBJECT_LIMIT:
+            bubbles, targets, foods = build_objects(n_entities)
+            object_tick_time = time_frames(object_tick, bubbles, targets, foods)
+            texts = ("{:.2f}".format(object_tick_time * 1e3), "{:.1f}x".format(object_tick_time / ecs_tick))
+        else:
+            texts = ("-", "-")
+        print("{:>8}{:>14}{:>14.2f}{:>10}".format(n_entities, texts[0], ecs_tick * 1e3, texts[1]))
+
+    print("Tick of {} wandering bubbles split into kinds, ms".format(KIND_ENTITIES))
+    print("{:>8}{:>12}".format("kinds", "ecs"))
+    for n_kinds in KIND_COUNTS:
+        store = build_store(KIND_ENTITIES, n_kinds)
+        systems = SystemScheduler((SteeringSystem(), MovementSystem(), ExpirySystem()))
+        print("{:>8}{:>12.2f}".format(n_kinds, time_frames(systems.run, store, FPS) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
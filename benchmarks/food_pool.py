@@ -0,0 +1,104 @@
+"""
+Garbage collections and frame times of spawning and expiring foods, with and without
+the `FoodPool`s.
+
+Runs a headless world at a high generation rate, with the grid views of its food field
+pooled and not pooled, then the `List[Food]` bucket path with and without a pool of
+`Food` objects. The measurement starts after a warm-up of two food lifetimes, when as
+many foods expire as spawn.
+
+    python -m benchmarks.food_pool
+"""
+import gc
+import time
+
+import numpy as np
+
+from food import Food
+from food_generator import FoodGenerator
+from food_pool import FoodPool
+from position import Position
+from profiler import GCMonitor
+from size import Size
+from world import World
+
+WORLD_SIZE = Size(1800, 1350)
+FPS = 60
+GENERATION_RATE = 2000
+SIMULATED_SECONDS = 120
+WARM_UP_SECONDS = 2 * Food.EXISTENCE_LENGTH
+
+
+def run_world(pooled: bool):
+    world = World(WORLD_SIZE, generation_rate=GENERATION_RATE, seed=0)
+    if not pooled:
+        world.foods.view_pool.max_size = 0
+    for _ in range(int(WARM_UP_SECONDS * FPS)):
+        world.step(FPS)
+    pool = world.foods.view_pool
+    pool.hits = pool.misses = 0
+
+    ticks = SIMULATED_SECONDS * FPS
+    frames = np.empty(ticks)
+    gc.collect()
+    with GCMonitor() as monitor:
+        for tick in range(ticks):
+            start = time.perf_counter()
+            world.step(FPS)
+            frames[tick] = time.perf_counter() - start
+    return frames, monitor, pool
+
+
+def run_food_list(pooled: bool):
+    pool = FoodPool(lambda: Food(Position(0, 0))) if pooled else None
+    generator = FoodGenerator(WORLD_SIZE, generation_rate=GENERATION_RATE, generating=True, seed=0, food_pool=pool)
+    foods = []
+
+    def step():
+        generator.generate_in_game_loop(foods, FPS)
+        living = []
+        for food in foods:
+            food.age(1 / FPS)
+            if food.is_alive():
+                living.append(food)
+            elif pool is not None:
+                pool.release(food)
+        foods[:] = living
+
+    for _ in range(int(WARM_UP_SECONDS * FPS)):
+        step()
+    if pool is not None:
+        pool.hits = pool.misses = 0
+
+    ticks = SIMULATED_SECONDS * FPS
+    frames = np.empty(ticks)
+    gc.collect()
+    with GCMonitor() as monitor:
+        for tick in range(ticks):
+            start = time.perf_counter()
+            step()
+            frames[tick] = time.perf_counter() - start
+    return frames, monitor, pool
+
+
+def report(name, frames, monitor, pool):
+    p50, p99 = np.percentile(frames * 1e3, (50, 99))
+    per_minute = monitor.per_minute(SIMULATED_SECONDS)
+    print("{:<22}{:8.3f}{:8.3f}{:8.3f}{:>20}{:9.2f}{:>22}".format(
+        name, p50, p99, frames.max() * 1e3, "/".join("{:.0f}".format(rate) for rate in per_minute),
+        monitor.pauses.summary()['max'],
+        "{}/{}".format(pool.hits, pool.misses) if pool is not None else "-"))
+
+
+def main():
+    print("{} foods/s for {} simulated seconds".format(GENERATION_RATE, SIMULATED_SECONDS))
+    print("{:<22}{:>8}{:>8}{:>8}{:>20}{:>9}{:>22}".format(
+        "", "p50 ms", "p99 ms", "max ms", "gc/min (gen 0/1/2)", "gc max", "pool hits/misses"))
+    for pooled in (False, True):
+        report("world, " + ("pooled" if pooled else "not pooled"), *run_world(pooled))
+    for pooled in (False, True):
+        report("food list, " + ("pooled" if pooled else "not pooled"), *run_food_list(pooled))
+
+
+if __name__ == '__main__':
+    main()
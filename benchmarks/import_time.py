@@ -0,0 +1,75 @@
+"""
+Import time budget of the headless simulation modules.
+
+Imports the headless modules in fresh interpreters with `python -X importtime`, checks
+that pygame was not imported, and compares the best cumulative import time of the
+runs against the budget. Exits with 1 if the budget is exceeded or pygame is imported.
+
+    python -m benchmarks.import_time --budget 200
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+HEADLESS_MODULES = ('world', 'ecs_world', 'arena', 'replay', 'batch_runner', 'threaded_simulation', 'server',
+                    'feed_or_breed')
+FORBIDDEN_MODULES = ('pygame',)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(modules, runs: int = 5):
+    """
+    ### Returns
+    `tuple (float, dict)`: Best total import time in milliseconds, and the cumulative
+    import times in milliseconds of the top level modules of the best run.
+    """
+    best_total, best_times = None, None
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + ', '.join(modules)],
+                                cwd=ROOT, stderr=subprocess.PIPE, text=True, check=True)
+        times = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = line.split('|')
+            # Nested imports are indented under their importer
+            if not name.startswith('  ') and name.strip() in modules:
+                times[name.strip()] = int(cumulative) / 1000
+        total = sum(times.values())
+        if best_total is None or total < best_total:
+            best_total, best_times = total, times
+    return best_total, best_times
+
+
+def imported_modules(modules):
+    code = 'import sys, {}; print(" ".join(sys.modules))'.format(', '.join(modules))
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, stdout=subprocess.PIPE, text=True, check=True)
+    return set(result.stdout.split())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time budget of the headless modules")
+    parser.add_argument('--budget', type=float, default=200, help="budget of the total import time in ms")
+    parser.add_argument('--runs', type=int, default=5, help="fresh interpreters to take the best time of")
+    arguments = parser.parse_args()
+
+    total, times = measure(HEADLESS_MODULES, arguments.runs)
+    for name in HEADLESS_MODULES:
+        print("{:<24}{:8.1f} ms".format(name, times.get(name, 0.0)))
+    print("{:<24}{:8.1f} ms (budget {:.0f} ms)".format("total", total, arguments.budget))
+
+    failed = False
+    forbidden = sorted(name for name in imported_modules(HEADLESS_MODULES)
+                       if name.split('.')[0] in FORBIDDEN_MODULES)
+    if forbidden:
+        print("Imported by the headless modules: {}".format(', '.join(forbidden)))
+        failed = True
+    if total > arguments.budget:
+        print("Over the budget by {:.1f} ms".format(total - arguments.budget))
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Nearest-food queries of many AI bubbles: a naive scan, a NumPy brute force and a `KDTree`.
+
+For each number of foods and bubbles, finds the nearest food and the foods within a
+radius of every bubble. The naive scan loops over the foods in Python for each bubble,
+the brute force computes the whole (bubbles, foods) distance matrix, and the tree is
+built from the positions then queried in one batched call, as `Arena` does every tick
+the foods change. The results of the tree are checked against the brute force.
+
+    python -m benchmarks.kd_tree
+"""
+import math
+import time
+
+import numpy as np
+
+from kd_tree import KDTree
+
+WORLD_SIZE = (1800, 1350)
+FOOD_COUNTS = (1000, 10000, 100000)
+BUBBLE_COUNTS = (100, 1000)
+K = 4
+RADIUS = 50
+NAIVE_MAX_WORK = 10 ** 7
+
+
+def naive_nearest(foods, bubbles):
+    nearest = []
+    for bubble_x, bubble_y in bubbles:
+        best, best_distance = -1, math.inf
+        for index, (food_x, food_y) in enumerate(foods):
+            distance = (food_x - bubble_x) ** 2 + (food_y - bubble_y) ** 2
+            if distance < best_distance:
+                best, best_distance = index, distance
+        nearest.append(best)
+    return nearest
+
+
+def squared_distances(foods: np.ndarray, bubbles: np.ndarray):
+    # In chunks of bubbles, so the distance matrix stays small
+    for start in range(0, len(bubbles), 64):
+        chunk = bubbles[start:start + 64]
+        yield start, ((chunk[:, None, :] - foods[None, :, :]) ** 2).sum(axis=2)
+
+
+def brute_force(foods: np.ndarray, bubbles: np.ndarray, k: int) -> np.ndarray:
+    distances = np.empty((len(bubbles), k))
+    for start, squared in squared_distances(foods, bubbles):
+        distances[start:start + len(squared)] = np.sqrt(np.sort(np.partition(squared, k - 1, axis=1)[:, :k], axis=1))
+    return distances
+
+
+def brute_force_within(foods: np.ndarray, bubbles: np.ndarray, radius: float):
+    return [set(np.flatnonzero(row <= radius * radius).tolist())
+            for _, squared in squared_distances(foods, bubbles) for row in squared]
+
+
+def best_of(function, runs: int = 3):
+    best = math.inf
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print("k={}, radius={}, times in ms, best of 3".format(K, RADIUS))
+    print("{:>8}{:>9}{:>12}{:>13}{:>9}{:>13}{:>14}{:>10}{:>10}".format(
+        "foods", "bubbles", "naive scan", "brute force", "build", "tree k-NN", "tree radius", "vs naive", "vs brute"))
+    for n_foods in FOOD_COUNTS:
+        foods = rng.uniform((0, 0), WORLD_SIZE, size=(n_foods, 2))
+        for n_bubbles in BUBBLE_COUNTS:
+            bubbles = rng.uniform((0, 0), WORLD_SIZE, size=(n_bubbles, 2))
+
+            if n_foods * n_bubbles <= NAIVE_MAX_WORK:
+                naive_time, naive = best_of(lambda: naive_nearest(foods.tolist(), bubbles.tolist()), runs=1)
+            else:
+                naive_time, naive = math.nan, None
+            brute_time, expected = best_of(lambda: brute_force(foods, bubbles, K))
+            build_time, tree = best_of(lambda: KDTree(foods))
+            query_time, (distances, indices) = best_of(lambda: tree.query(bubbles, K))
+            radius_time, within = best_of(lambda: tree.query_radius(bubbles, RADIUS))
+
+            assert np.allclose(distances, expected), "k-NN distances differ from the brute force"
+            expected_within = brute_force_within(foods, bubbles, RADIUS)
+            assert all(set(found.tolist()) == wanted for found, wanted in zip(within, expected_within)), \
+                "radius results differ from the brute force"
+            if naive is not None:
+                assert np.allclose(distances[:, 0], np.hypot(*(foods[naive] - bubbles).T)), \
+                    "nearest foods differ from the naive scan"
+
+            tree_time = build_time + query_time
+            naive_texts = ("{:.1f}".format(naive_time * 1e3), "{:.0f}x".format(naive_time / tree_time)) \
+                if naive is not None else ("-", "-")
+            print("{:>8}{:>9}{:>12}{:>13.1f}{:>9.1f}{:>13.1f}{:>14.1f}{:>10}{:>9.0f}x".format(
+                n_foods, n_bubbles, naive_texts[0], brute_time * 1e3, build_time * 1e3, query_time * 1e3,
+                radius_time * 1e3, naive_texts[1], brute_time / tree_time))
+
+
+if __name__ == '__main__':
+    main()
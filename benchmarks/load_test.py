@@ -0,0 +1,134 @@
+"""
+Load test of the multiplayer server with many simulated clients.
+
+Every client connects over TCP, sends a random target a few times a second and decodes
+every state update. Reports the received bytes per client per second and the update
+rate, and with `--spawn-server` also the tick times reported by the server.
+
+    python -m benchmarks.load_test --clients 300 --duration 10 --spawn-server
+"""
+import argparse
+import asyncio
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+
+import protocol
+
+
+class LoadClient:
+    """
+    Simulated player that moves its target randomly and keeps a decoded copy of the world.
+    ___
+
+    ### Arguments
+     - `seed (int)`: Seed of the random targets.
+     - `input_rate [float=10]`: Inputs sent per second.
+    """
+
+    def __init__(self, seed: int, input_rate: float = 10):
+        self.random = random.Random(seed)
+        self.input_rate = input_rate
+        self.state = None
+        self.bytes_received = 0
+        self.updates = 0
+
+    async def run(self, host: str, port: int, duration: float) -> None:
+        reader, writer = await asyncio.open_connection(host, port)
+        message_type, body = await protocol.read_frame(reader)
+        assert message_type == protocol.WELCOME
+        _, _, width, height, quantum = protocol.WELCOME_BODY.unpack(body)
+        self.state = protocol.ClientState(quantum)
+        self.bytes_received += protocol.FRAME.size + len(body)
+
+        sender = asyncio.ensure_future(self._send_inputs(writer, width, height))
+        deadline = asyncio.get_running_loop().time() + duration
+        try:
+            while True:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                try:
+                    message_type, body = await asyncio.wait_for(protocol.read_frame(reader), remaining)
+                except asyncio.TimeoutError:
+                    break
+                self.bytes_received += protocol.FRAME.size + len(body)
+                if message_type == protocol.STATE:
+                    self.state.apply(body)
+                    self.updates += 1
+        finally:
+            sender.cancel()
+            writer.close()
+
+    async def _send_inputs(self, writer: asyncio.StreamWriter, width: int, height: int) -> None:
+        rng = self.random
+        while True:
+            body = protocol.INPUT_BODY.pack(rng.uniform(0, width), rng.uniform(0, height))
+            writer.write(protocol.frame(protocol.INPUT, body))
+            await asyncio.sleep(1 / self.input_rate)
+
+
+async def run_clients(host: str, port: int, n_clients: int, duration: float, input_rate: float):
+    clients = [LoadClient(seed, input_rate) for seed in range(n_clients)]
+    started = time.perf_counter()
+    await asyncio.gather(*(client.run(host, port, duration) for client in clients))
+    return clients, time.perf_counter() - started
+
+
+def wait_for_server(host: str, port: int, timeout: float = 10) -> None:
+    async def connect():
+        deadline = time.perf_counter() + timeout
+        while True:
+            try:
+                _, writer = await asyncio.open_connection(host, port)
+                writer.close()
+                return
+            except OSError:
+                if time.perf_counter() > deadline:
+                    raise
+                await asyncio.sleep(0.1)
+
+    asyncio.run(connect())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test of the Feed or Breed multiplayer server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--duration', type=float, default=10, help="seconds every client stays connected")
+    parser.add_argument('--input-rate', type=float, default=10, help="inputs per client per second")
+    parser.add_argument('--spawn-server', action='store_true', help="start server.py for the test")
+    arguments = parser.parse_args()
+
+    server = None
+    if arguments.spawn_server:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        server = subprocess.Popen([sys.executable, os.path.join(root, 'server.py'), '--host', arguments.host,
+                                   '--port', str(arguments.port), '--stats-interval', '3600'],
+                                  stdout=subprocess.PIPE, text=True)
+        wait_for_server(arguments.host, arguments.port)
+
+    try:
+        clients, elapsed = asyncio.run(run_clients(arguments.host, arguments.port, arguments.clients,
+                                                   arguments.duration, arguments.input_rate))
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGINT)
+            output = server.communicate(timeout=10)[0]
+
+    received = sum(client.bytes_received for client in clients)
+    updates = sum(client.updates for client in clients)
+    print("{} clients for {:.1f} s".format(len(clients), elapsed))
+    print("  received: {:.0f} bytes/client/s, {:.1f} updates/client/s, {:.0f} messages/s in total".format(
+        received / len(clients) / elapsed, updates / len(clients) / elapsed, updates / elapsed))
+    print("  last client: {}".format(clients[-1].state))
+    if server is not None:
+        print("  server: {}".format(output.strip().splitlines()[-1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Memory cost of a live food, as `Food` objects and as `FoodField` rows.
+
+    python -m benchmarks.memory
+"""
+import gc
+import random
+import tracemalloc
+
+from food import Food
+from food_field import FoodField
+from position import Position
+from size import Size
+
+SURFACE_SIZE = Size(900, 675)
+N_FOODS = 100000
+
+
+def random_positions(n_foods: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [(rng.randint(0, SURFACE_SIZE.width - 1), rng.randint(0, SURFACE_SIZE.height - 1))
+            for _ in range(n_foods)]
+
+
+def measure(build) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / N_FOODS
+
+
+def main():
+    coordinates = random_positions(N_FOODS)
+
+    def build_foods():
+        return [Food(Position(x, y)) for x, y in coordinates]
+
+    def build_field():
+        field = FoodField(capacity=N_FOODS)
+        for x, y in coordinates:
+            field.add(Position(x, y), Food.DEFAULT_SIZE.width // 2, Food.DEFAULT_COLOR)
+        return field
+
+    print("{} live foods".format(N_FOODS))
+    print("{:>12} {:>14}".format("storage", "bytes/food"))
+    print("{:>12} {:14.1f}".format("Food", measure(build_foods)))
+    print("{:>12} {:14.1f}".format("FoodField", measure(build_field)))
+
+
+if __name__ == '__main__':
+    main()
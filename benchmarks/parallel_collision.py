@@ -0,0 +1,82 @@
+"""
+Contacts of very large worlds: `circle_contacts()` on one process against the tiled
+`ParallelCollisionDetector` on 1 to N worker processes, with its serial fallback for
+small worlds turned off.
+
+The bubbles and foods are put in shared memory by a `SharedArrayAllocator`, as the
+component arrays of an `EntityStore` using it are, so the workers read them in place.
+The last column times the same work when the arrays are ordinary NumPy arrays that are
+copied into the staging blocks first. Every parallel result is checked against the
+serial one. Speedup and efficiency are against the serial time; on a machine with fewer
+cores than workers, the extra workers only add overhead.
+
+    python -m benchmarks.parallel_collision
+"""
+import multiprocessing
+import time
+
+import numpy as np
+
+from collision import circle_contacts
+from parallel_collision import ParallelCollisionDetector, SharedArrayAllocator
+from size import Size
+
+WORLD_SIZE = Size(40000, 30000)
+WORLDS = ((10000, 1000000), (50000, 4000000))
+BUBBLE_RADIUS = 30
+FOOD_RADIUS = 5
+REPEATS = 3
+
+
+def worker_counts():
+    cores = multiprocessing.cpu_count()
+    return sorted({1, 2, 4, cores} | {count for count in (8, 16, 32) if count <= cores})
+
+
+def build_world(allocator: SharedArrayAllocator, n_bubbles: int, n_foods: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    arrays = []
+    for n_circles, radius in ((n_bubbles, BUBBLE_RADIUS), (n_foods, FOOD_RADIUS)):
+        positions = rng.uniform((0, 0), WORLD_SIZE.as_tuple(), size=(n_circles, 2))
+        for values in (positions[:, 0], positions[:, 1], np.full(n_circles, radius)):
+            array = allocator.zeros((n_circles,), values.dtype)
+            array[:] = values
+            arrays.append(array)
+    return arrays
+
+
+def best_time(find_contacts, arrays):
+    result = find_contacts(*arrays)
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        find_contacts(*arrays)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    print("CPU cores: {}".format(multiprocessing.cpu_count()))
+    for n_bubbles, n_foods in WORLDS:
+        with SharedArrayAllocator() as allocator:
+            arrays = build_world(allocator, n_bubbles, n_foods)
+            serial, expected = best_time(circle_contacts, arrays)
+            print("{} bubbles, {} foods, {} contacts, serial circle_contacts {:.1f} ms".format(
+                n_bubbles, n_foods, len(expected[1]), serial * 1e3))
+            print("{:>8}{:>8}{:>12}{:>10}{:>12}{:>12}{:>8}".format(
+                "workers", "tiles", "shared ms", "speedup", "efficiency", "copied ms", "same"))
+            for workers in worker_counts():
+                with ParallelCollisionDetector(WORLD_SIZE, workers, allocator=allocator, min_foods=0) as detector:
+                    shared, result = best_time(detector.contacts, arrays)
+                    same = all(np.array_equal(a, b) for a, b in zip(expected, result))
+                with ParallelCollisionDetector(WORLD_SIZE, workers, min_foods=0) as detector:
+                    copied, result = best_time(detector.contacts, [np.array(array) for array in arrays])
+                    same = same and all(np.array_equal(a, b) for a, b in zip(expected, result))
+                print("{:>8}{:>8}{:>12.1f}{:>9.2f}x{:>11.0%}{:>12.1f}{:>8}".format(
+                    workers, "{}x{}".format(*detector.tiles), shared * 1e3, serial / shared,
+                    serial / shared / workers, copied * 1e3, str(same)))
+            del arrays, expected, result
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Frame time of drawing the foods with per-food `gfxdraw` calls against the cached
+sprites drawn with a single `Surface.blits()` call, on an offscreen surface.
+
+    python -m benchmarks.sprites
+"""
+import random
+import timeit
+
+import pygame
+
+from food import Food
+from food_field import FoodField
+from position import Position
+from size import Size
+from sprite_cache import SpriteBatch, SpriteCache
+
+SURFACE_SIZE = Size(900, 675)
+BACKGROUND_COLOR = (42, 54, 59)
+FOOD_COUNTS = (1000, 10000, 50000)
+
+
+def build_field(n_foods: int, seed: int = 0) -> FoodField:
+    rng = random.Random(seed)
+    field = FoodField(capacity=n_foods)
+    for _ in range(n_foods):
+        position = Position(rng.randint(0, SURFACE_SIZE.width - 1), rng.randint(0, SURFACE_SIZE.height - 1))
+        field.add(position, Food.DEFAULT_SIZE.width // 2, Food.DEFAULT_COLOR)
+    return field
+
+
+def gfxdraw_frame(surface: pygame.Surface, field: FoodField):
+    surface.fill(BACKGROUND_COLOR)
+    for food in field:
+        food.render(surface, 60)
+
+
+def sprite_frame(surface: pygame.Surface, field: FoodField, sprite_batch: SpriteBatch):
+    surface.fill(BACKGROUND_COLOR)
+    field.render_sprites(sprite_batch)
+    sprite_batch.flush(surface)
+
+
+def main():
+    surface = pygame.Surface(SURFACE_SIZE.as_tuple())
+    sprite_batch = SpriteBatch(SpriteCache())
+
+    print("{:>8} {:>16} {:>16} {:>10}".format("foods", "gfxdraw (ms)", "sprites (ms)", "speedup"))
+    for n_foods in FOOD_COUNTS:
+        field = build_field(n_foods)
+        number = max(1, 20000 // n_foods)
+        gfxdraw_time = min(timeit.repeat(lambda: gfxdraw_frame(surface, field), repeat=3, number=number)) / number
+        sprite_time = min(timeit.repeat(lambda: sprite_frame(surface, field, sprite_batch),
+                                        repeat=3, number=number)) / number
+        print("{:>8} {:16.2f} {:16.2f} {:9.1f}x".format(
+            n_foods, gfxdraw_time * 1e3, sprite_time * 1e3, gfxdraw_time / sprite_time))
+    print(sprite_batch.sprite_cache)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""
+Microbenchmark suite of the core modules, with baselines and regression checks.
+
+    python -m benchmarks.suite                             # run and print
+    python -m benchmarks.suite --save baseline.json        # store a baseline
+    python -m benchmarks.suite --compare baseline.json     # flag regressions
+
+Rendering runs on offscreen surfaces under `SDL_VIDEODRIVER=dummy`. With `--compare`,
+the exit status is 1 if any benchmark got slower than the baseline by more than the
+threshold.
+"""
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import json
+import random
+import sys
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+import pygame
+
+from bubble import Bubble
+from food import Food
+from food_field import FoodField
+from food_generator import FoodGenerator
+from position import Position
+from size import Size
+from sprite_cache import SpriteBatch, SpriteCache
+from velocity import Velocity
+from world import World
+
+SURFACE_SIZE = Size(900, 675)
+BACKGROUND_COLOR = (42, 54, 59)
+FPS = 60
+FRAME_FOOD_COUNTS = (100, 1000, 10000)
+
+
+def bench_euclidean_distance() -> Callable:
+    origin = Position(0, 0)
+    other = Position(300, 400)
+    return lambda: origin.euclidean_distance_to(other)
+
+
+def bench_calculate_angle() -> Callable:
+    return lambda: Velocity.calculate_angle(-3, 4)
+
+
+def bench_axial_motion() -> Callable:
+    velocity = Velocity(30, 300)
+    return velocity.axial_motion
+
+
+def bench_set_velocity_for_target() -> Callable:
+    bubble = Bubble(Position(400, 400))
+    target = Position(100, 250)
+    return lambda: bubble.set_velocity_for_target(target)
+
+
+def bench_generate_in_game_loop() -> Callable:
+    generator = FoodGenerator(SURFACE_SIZE, generation_rate=FPS, generating=True, seed=0)
+    foods = FoodField()
+
+    def generate():
+        generator.generate_in_game_loop(foods, FPS)
+        if len(foods) > 1000:
+            foods.expire(Food.EXISTENCE_LENGTH)
+    return generate
+
+
+def bench_food_render() -> Callable:
+    surface = pygame.Surface(SURFACE_SIZE.as_tuple())
+    food = Food(Position(450, 300))
+
+    def render():
+        food.render(surface, FPS)
+    return render
+
+
+def bench_bubble_render() -> Callable:
+    surface = pygame.Surface(SURFACE_SIZE.as_tuple())
+    bubble = Bubble(Position(450, 300))
+    return lambda: bubble.render(surface, FPS)
+
+
+def bench_frame(n_foods: int) -> Callable:
+    surface = pygame.Surface(SURFACE_SIZE.as_tuple())
+    sprite_batch = SpriteBatch(SpriteCache())
+    world = World(SURFACE_SIZE, seed=0, target=Position(600, 200))
+    rng = random.Random(0)
+    for _ in range(n_foods):
+        position = Position(rng.randint(0, SURFACE_SIZE.width - 1), rng.randint(0, SURFACE_SIZE.height - 1))
+        world.foods.add(position, Food.DEFAULT_SIZE.width // 2, Food.DEFAULT_COLOR, remaining_life=1e9)
+
+    def frame():
+        world.step(FPS)
+        surface.fill(BACKGROUND_COLOR)
+        world.foods.render_sprites(sprite_batch)
+        world.bubble.render_sprites(sprite_batch)
+        sprite_batch.flush(surface)
+    return frame
+
+
+BENCHMARKS: List[Tuple[str, Callable[[], Callable]]] = [
+    ('position.euclidean_distance_to', bench_euclidean_distance),
+    ('velocity.calculate_angle', bench_calculate_angle),
+    ('velocity.axial_motion', bench_axial_motion),
+    ('moveable.set_velocity_for_target', bench_set_velocity_for_target),
+    ('food_generator.generate_in_game_loop', bench_generate_in_game_loop),
+    ('food.render', bench_food_render),
+    ('bubble.render', bench_bubble_render),
+] + [('frame[{} foods]'.format(n_foods), lambda n_foods=n_foods: bench_frame(n_foods))
+     for n_foods in FRAME_FOOD_COUNTS]
+
+
+def measure(function: Callable, repeat: int = 5, min_time: float = 0.1) -> float:
+    """
+    ### Returns
+    `float`: Best time of a single call in seconds over `repeat` runs of at least `min_time` seconds.
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(selected: str = None) -> Dict[str, float]:
+    pygame.init()
+    results = {}
+    for name, build in BENCHMARKS:
+        if selected is None or selected in name:
+            results[name] = measure(build())
+    pygame.quit()
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    """
+    ### Returns
+    `List[str]`: Names of the benchmarks that are slower than the baseline by more than `threshold`.
+    """
+    return [name for name, seconds in results.items()
+            if name in baseline and seconds > baseline[name] * (1 + threshold)]
+
+
+def format_time(seconds: float) -> str:
+    if seconds < 1e-6:
+        return "{:.1f} ns".format(seconds * 1e9)
+    if seconds < 1e-3:
+        return "{:.2f} us".format(seconds * 1e6)
+    return "{:.2f} ms".format(seconds * 1e3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks of Feed or Breed")
+    parser.add_argument('--save', metavar='PATH', help="store the results as a baseline")
+    parser.add_argument('--compare', metavar='PATH', help="compare the results against a baseline")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="allowed slowdown ratio against the baseline (default: 0.2)")
+    parser.add_argument('--only', metavar='TEXT', help="run only the benchmarks whose names contain TEXT")
+    arguments = parser.parse_args()
+
+    baseline = {}
+    if arguments.compare:
+        with open(arguments.compare) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+
+    results = run(arguments.only)
+    regressions = compare(results, baseline, arguments.threshold)
+
+    print("{:<40} {:>12} {:>12} {:>8}".format("benchmark", "time", "baseline", "change"))
+    for name, seconds in results.items():
+        if name in baseline:
+            reference = format_time(baseline[name])
+            change = "{:+.0%}".format(seconds / baseline[name] - 1)
+        else:
+            reference = change = "-"
+        flag = "  REGRESSION" if name in regressions else ""
+        print("{:<40} {:>12} {:>12} {:>8}{}".format(name, format_time(seconds), reference, change, flag))
+
+    if arguments.save:
+        with open(arguments.save, 'w') as baseline_file:
+            json.dump({'python': sys.version.split()[0], 'pygame': pygame.version.ver, 'results': results},
+                      baseline_file, indent=2)
+
+    if regressions:
+        print("{} benchmark(s) regressed by more than {:.0%}".format(len(regressions), arguments.threshold))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Steering and movement of `BubbleSwarm` against the scalar `Bubble` path.
+
+Checks that both paths agree, then reports the time of one simulated frame, and the
+time of a frame with reduced updates outside a viewport in a 3x3 screens world.
+
+    python -m benchmarks.swarm
+"""
+import random
+import timeit
+
+import numpy as np
+
+from bubble import Bubble
+from bubble_swarm import BubbleSwarm
+from position import Position
+from size import Size
+from velocity import Velocity
+
+SURFACE_SIZE = Size(900, 675)
+FPS = 60
+BUBBLE_COUNTS = (100, 1000, 10000, 50000)
+SCALAR_LIMIT = 10000
+WORLD_SCALE = 3
+
+
+def build_bubbles(n_bubbles: int, seed: int = 0, scale: int = 1):
+    rng = random.Random(seed)
+
+    def random_position():
+        return Position(rng.uniform(0, SURFACE_SIZE.width * scale), rng.uniform(0, SURFACE_SIZE.height * scale))
+
+    bubbles = [Bubble(random_position(), velocity=Velocity(0, 0)) for _ in range(n_bubbles)]
+    targets = [random_position() for _ in range(n_bubbles)]
+    return bubbles, targets
+
+
+def scalar_frame(bubbles, targets):
+    for bubble, target in zip(bubbles, targets):
+        if target.euclidean_distance_to(bubble.position) < bubble.velocity.coefficent / FPS:
+            bubble.position.copy_from(target)
+            bubble.pinned = True
+        else:
+            bubble.pinned = False
+            bubble.set_velocity_for_target(target)
+            bubble.commit_movement(FPS)
+
+
+def swarm_frame(swarm: BubbleSwarm, targets: np.ndarray):
+    swarm.steer(targets, FPS)
+    swarm.commit_movement(FPS)
+
+
+def max_deviation(n_bubbles: int = 1000, n_frames: int = 120) -> float:
+    bubbles, targets = build_bubbles(n_bubbles)
+    swarm = BubbleSwarm.from_bubbles(bubbles)
+    target_array = np.array([target.as_tuple() for target in targets])
+    for _ in range(n_frames):
+        scalar_frame(bubbles, targets)
+        swarm_frame(swarm, target_array)
+    scalar_positions = np.array([bubble.position.as_tuple() for bubble in bubbles])
+    return float(np.abs(scalar_positions - swarm.positions).max())
+
+
+def main():
+    print("max deviation from the scalar path after 120 frames: {:.3g} px".format(max_deviation()))
+    print("{:>8} {:>14} {:>14}".format("bubbles", "swarm (ms)", "scalar (ms)"))
+    for n_bubbles in BUBBLE_COUNTS:
+        bubbles, targets = build_bubbles(n_bubbles)
+        swarm = BubbleSwarm.from_bubbles(bubbles)
+        target_array = np.array([target.as_tuple() for target in targets])
+        swarm_time = min(timeit.repeat(lambda: swarm_frame(swarm, target_array), repeat=5, number=20)) / 20
+
+        if n_bubbles <= SCALAR_LIMIT:
+            scalar_time = min(timeit.repeat(lambda: scalar_frame(bubbles, targets), repeat=3, number=2)) / 2
+            scalar_column = "{:14.3f}".format(scalar_time * 1e3)
+        else:
+            scalar_column = "{:>14}".format("-")
+        print("{:>8} {:14.3f} {}".format(n_bubbles, swarm_time * 1e3, scalar_column))
+
+    # The viewport is the middle screen of the world
+    viewport = (SURFACE_SIZE.width, SURFACE_SIZE.height, 2 * SURFACE_SIZE.width, 2 * SURFACE_SIZE.height)
+    print("{}x{} screens world, viewport in the middle".format(WORLD_SCALE, WORLD_SCALE))
+    print("{:>8} {:>14} {:>14}".format("bubbles", "full (ms)", "lod (ms)"))
+    for n_bubbles in BUBBLE_COUNTS:
+        bubbles, targets = build_bubbles(n_bubbles, scale=WORLD_SCALE)
+        swarm = BubbleSwarm.from_bubbles(bubbles)
+        target_array = np.array([target.as_tuple() for target in targets])
+        full_time = min(timeit.repeat(lambda: swarm_frame(swarm, target_array), repeat=5, number=20)) / 20
+        ticks = iter(range(10 ** 9))
+        lod_time = min(timeit.repeat(lambda: swarm.step_with_lod(target_array, FPS, next(ticks), viewport),
+                                     repeat=5, number=20)) / 20
+        print("{:>8} {:14.3f} {:14.3f}".format(n_bubbles, full_time * 1e3, lod_time * 1e3))
+
+
+if __name__ == '__main__':
+    main()
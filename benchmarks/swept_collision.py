@@ -0,0 +1,77 @@
+"""
+Discrete against swept feeding detection at lower tick rates.
+
+First checks that the swept test finds the same foods as a discrete test on many small
+sub-steps of random paths. Then simulates the same game time at several tick rates
+with both tests, and reports the foods eaten and the simulated seconds per wall second.
+
+    python -m benchmarks.swept_collision
+"""
+import random
+import time
+
+from bubble import Bubble
+from collision import CollisionDetector
+from food import Food
+from position import Position
+from size import Size
+from world import RandomPilot, World
+
+WORLD_SIZE = Size(900, 675)
+GAME_SECONDS = 600
+GENERATION_RATE = 5
+TICK_RATES = (60, 30, 20, 15, 10)
+SUB_STEPS = 256
+
+
+def check_against_sub_steps(n_paths: int = 2000, seed: int = 0) -> int:
+    rng = random.Random(seed)
+    detector = CollisionDetector()
+    mismatches = 0
+    for _ in range(n_paths):
+        foods = [Food(Position(rng.uniform(0, 200), rng.uniform(0, 200))) for _ in range(20)]
+        bubble = Bubble(Position(rng.uniform(0, 200), rng.uniform(0, 200)))
+        bubble.remember_position()
+        bubble.position.set(rng.uniform(0, 200), rng.uniform(0, 200))
+        swept = {id(food) for _, food, _ in detector.detect_feeding_swept(foods, [bubble])}
+
+        start, end = bubble.previous_position, bubble.position
+        probe = Bubble(Position(start.x, start.y))
+        sampled = set()
+        for step in range(SUB_STEPS + 1):
+            fraction = step / SUB_STEPS
+            probe.position.set(start.x + (end.x - start.x) * fraction, start.y + (end.y - start.y) * fraction)
+            sampled.update(id(food) for _, food in detector.detect_feeding(foods, [probe]))
+        # Sampling can only miss grazing contacts between the sub-steps
+        if not sampled <= swept:
+            mismatches += 1
+    return mismatches
+
+
+def simulate(tick_rate: int, swept_collision: bool, seed: int = 0):
+    pilot = RandomPilot(seed)
+    world = World(WORLD_SIZE, generation_rate=GENERATION_RATE, seed=seed, swept_collision=swept_collision)
+    ticks = GAME_SECONDS * tick_rate
+    start = time.perf_counter()
+    for _ in range(ticks):
+        pilot.update(world)
+        world.step(tick_rate)
+    return world, time.perf_counter() - start
+
+
+def main():
+    print("Paths where the swept test missed a sub-stepped contact: {}".format(check_against_sub_steps()))
+    print("{} s of game time, {} foods/s, max velocity {} px/s".format(
+        GAME_SECONDS, GENERATION_RATE, Bubble.DEFAULT_MAX_VELOCITY))
+    print("{:>10}{:>14}{:>14}{:>18}{:>18}".format(
+        "tick rate", "eaten (disc.)", "eaten (swept)", "game s/s (disc.)", "game s/s (swept)"))
+    for tick_rate in TICK_RATES:
+        discrete, discrete_elapsed = simulate(tick_rate, False)
+        swept, swept_elapsed = simulate(tick_rate, True)
+        print("{:>10}{:>14}{:>14}{:>18.0f}{:>18.0f}".format(
+            tick_rate, discrete.foods_eaten, swept.foods_eaten,
+            GAME_SECONDS / discrete_elapsed, GAME_SECONDS / swept_elapsed))
+
+
+if __name__ == '__main__':
+    main()
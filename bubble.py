@@ -1,7 +1,6 @@
-from typing import List
-
-import pygame
+from typing import TYPE_CHECKING, List
 
+import render_backend
 from color import Color
 from moveable import Moveable
 from position import Position
@@ -9,6 +8,9 @@ from renderable import Renderable
 from size import Size
 from velocity import Velocity
 
+if TYPE_CHECKING:
+    import pygame
+
 
 class Bubble(Moveable, Renderable):
     """
@@ -17,7 +19,7 @@ class Bubble(Moveable, Renderable):
 
     ### Arguments
      - `position (Position)`: Initial position of the bubble.
-     - `velocity [Velocity=Velocity(.0, .0)]`: Initial velocity of the created bubble.
+     - `velocity [Velocity=None]`: Initial velocity of the created bubble. (None) for no motion.
      - `max_velocity [float=20.0]`: Max velocity that bubble can get.
      - `color (Color=Color(250,250,250))`: Color of the food.
      - `max_health [float=100.0]`: Max health value that bubble can has
@@ -34,7 +36,7 @@ class Bubble(Moveable, Renderable):
 
     def __init__(self,
                  position: Position,
-                 velocity: Velocity = Velocity(.0, .0),
+                 velocity: Velocity = None,
                  max_velocity: float = DEFAULT_MAX_VELOCITY,
                  size: Size = DEFAULT_SIZE,
                  color: Color = DEFAULT_COLOR,
@@ -52,6 +54,12 @@ class Bubble(Moveable, Renderable):
         else:
             self.current_health = current_health
 
+    def radius(self) -> int:
+        """
+        ### Returns 
+        `int`: Radius of the bubble as integer
+        """
+        return int(self.size.width / 2)
 
     def _move(self, fps: int):
         """
@@ -66,7 +74,7 @@ class Bubble(Moveable, Renderable):
         self.position.y += diff_y / fps
 
 
-    def _draw(self, surface: pygame.surface.Surface, fps: int):
+    def _draw(self, surface: 'pygame.surface.Surface', fps: int, alpha: float):
         """
         Renders the bubble considering the FPS value.
         ___
@@ -74,19 +82,49 @@ class Bubble(Moveable, Renderable):
         ### Arguments
          - `surface (pygame.surface.Surface)`: PyGame surface that the food will be drawn on.
          - `fps`: The FPS (Frames per Second) value of the game
+         - `alpha`: Fraction of a simulation tick between the previous and the current position.
         """
-        pygame.gfxdraw.aacircle(surface,
-                                int(self.position.x),
-                                int(self.position.y),
-                                int(self.size.width / 2),
-                                self.color.as_tuple())
-
-        pygame.gfxdraw.filled_circle(surface,
-                                     int(self.position.x),
-                                     int(self.position.y),
-                                     int(self.size.width / 2),
-                                     self.color.as_tuple())
+        position = self.interpolated_position(alpha)
+        gfxdraw = render_backend.gfxdraw()
+
+        gfxdraw.aacircle(surface,
+                         int(position.x),
+                         int(position.y),
+                         int(self.size.width / 2),
+                         self.color.as_tuple())
+
+        gfxdraw.filled_circle(surface,
+                              int(position.x),
+                              int(position.y),
+                              int(self.size.width / 2),
+                              self.color.as_tuple())
+
+    def _add_sprites(self, sprite_batch, alpha: float):
+        """
+        Queues the sprite of the bubble.
+        ___
 
+        ### Arguments
+         - `sprite_batch (SpriteBatch)`: Batch that will draw the bubble.
+         - `alpha`: Fraction of a simulation tick between the previous and the current position.
+        """
+        position = self.interpolated_position(alpha)
+        sprite_batch.add_circle(int(position.x), int(position.y),
+                                self.radius(), self.color.as_tuple())
+
+    def bounding_rect(self, alpha: float = 1.0) -> 'pygame.Rect':
+        """
+        ### Arguments
+         - `alpha [float=1.0]`: Fraction of a simulation tick between the previous and the current position.
+
+        ### Returns
+        `pygame.Rect`: Rectangle that covers the drawn bubble
+        """
+        position = self.interpolated_position(alpha)
+        radius = self.radius()
+        Rect = render_backend.load().Rect
+        return Rect(int(position.x) - radius, int(position.y) - radius,
+                    2 * radius + 2, 2 * radius + 2)
 
 
 def main():
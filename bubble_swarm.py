@@ -0,0 +1,321 @@
+from typing import Dict, Iterable, Tuple, Union
+
+import numpy as np
+
+from bubble import Bubble
+from position import Position
+from velocity import Velocity
+
+
+class BubbleSwarm:
+    """
+    Struct-of-arrays storage of many moveable bubbles.
+
+    Steering and movement are computed for every bubble at once with NumPy, using the
+    same decelerating easing formula as `Moveable.set_velocity_for_target` and the same
+    integration as `Bubble._move`. Velocities are stored as (x, y) components, a
+    `Velocity` can be built for a single bubble with `velocity_of()`.
+    ___
+
+    ### Arguments
+     - `capacity [int=64]`: Initial number of slots. The arrays grow when needed.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self._count = 0
+        self._next_id = 0
+        self._index_of: Dict[int, int] = {}
+        self._allocate(max(1, capacity))
+
+    def _allocate(self, capacity: int) -> None:
+        count = self._count
+        arrays = {
+            'x': np.zeros(capacity, dtype=np.float64),
+            'y': np.zeros(capacity, dtype=np.float64),
+            'velocity_x': np.zeros(capacity, dtype=np.float64),
+            'velocity_y': np.zeros(capacity, dtype=np.float64),
+            'max_velocity': np.zeros(capacity, dtype=np.float64),
+            'pinned': np.zeros(capacity, dtype=np.bool_),
+            'ids': np.zeros(capacity, dtype=np.int64),
+            'last_step': np.zeros(capacity, dtype=np.int64),
+        }
+        for name, array in arrays.items():
+            if count:
+                array[:count] = getattr(self, '_' + name)[:count]
+            setattr(self, '_' + name, array)
+        self.capacity = capacity
+
+    @staticmethod
+    def from_bubbles(bubbles: Iterable[Bubble]) -> 'BubbleSwarm':
+        """
+        Creates a swarm with copies of the state of `bubbles`.
+        ___
+
+        ### Arguments
+         - `bubbles (Iterable[Bubble])`: Bubbles to be copied. Their order is kept.
+
+        ### Returns
+        `BubbleSwarm`: Created swarm.
+        """
+        bubbles = list(bubbles)
+        swarm = BubbleSwarm(capacity=len(bubbles))
+        for bubble in bubbles:
+            swarm.add(bubble.position, bubble.max_velocity, bubble.velocity, bubble.pinned)
+        return swarm
+
+    def add(self, position: Position, max_velocity: float = Bubble.DEFAULT_MAX_VELOCITY,
+            velocity: Velocity = None, pinned: bool = False) -> int:
+        """
+        Adds a bubble to the swarm.
+        ___
+
+        ### Arguments
+         - `position (Position)`: Initial position of the bubble.
+         - `max_velocity [float=Bubble.DEFAULT_MAX_VELOCITY]`: Max velocity that bubble can get.
+         - `velocity [Velocity=None]`: Initial velocity of the bubble. (None) for no motion.
+         - `pinned [bool=False]`: Whether the bubble is not moveable or not.
+
+        ### Returns
+        `int`: Stable identifier of the bubble in the swarm.
+        """
+        if self._count == self.capacity:
+            self._allocate(self.capacity * 2)
+
+        index = self._count
+        bubble_id = self._next_id
+        self._next_id += 1
+
+        self._x[index] = position.x
+        self._y[index] = position.y
+        if velocity is None:
+            self._velocity_x[index] = self._velocity_y[index] = 0.0
+        else:
+            self._velocity_x[index], self._velocity_y[index] = velocity.axial_motion()
+        self._max_velocity[index] = max_velocity
+        self._pinned[index] = pinned
+        self._ids[index] = bubble_id
+        # Not stepped by step_with_lod() yet
+        self._last_step[index] = -1
+        self._index_of[bubble_id] = index
+        self._count += 1
+        return bubble_id
+
+    def remove(self, bubble_id: int) -> None:
+        """
+        Removes the bubble by moving the last bubble into its slot.
+        ___
+
+        ### Arguments
+         - `bubble_id (int)`: Identifier returned by `add()`.
+
+        ### Raises
+        `KeyError`: If there is no bubble with the given identifier.
+        """
+        index = self._index_of.pop(bubble_id)
+        last = self._count - 1
+        if index != last:
+            for name in ('_x', '_y', '_velocity_x', '_velocity_y', '_max_velocity', '_pinned', '_ids', '_last_step'):
+                array = getattr(self, name)
+                array[index] = array[last]
+            self._index_of[int(self._ids[index])] = index
+        self._count = last
+
+    def index_of(self, bubble_id: int) -> int:
+        """
+        ### Returns
+        `int`: Current index of the bubble in the arrays. It changes when other bubbles are removed.
+        """
+        return self._index_of[bubble_id]
+
+    @property
+    def positions(self) -> np.ndarray:
+        """
+        `numpy.ndarray`: (N, 2) copy of the bubble positions
+        """
+        return np.column_stack((self._x[:self._count], self._y[:self._count]))
+
+    @property
+    def ids(self) -> np.ndarray:
+        """
+        `numpy.ndarray`: Read-only view of the bubble ids, in the order of the arrays
+        """
+        ids = self._ids[:self._count]
+        ids.flags.writeable = False
+        return ids
+
+    @property
+    def pinned(self) -> np.ndarray:
+        """
+        `numpy.ndarray`: Writable view of the pinned flags
+        """
+        return self._pinned[:self._count]
+
+    @property
+    def max_velocity(self) -> np.ndarray:
+        """
+        `numpy.ndarray`: Writable view of the max velocities
+        """
+        return self._max_velocity[:self._count]
+
+    def position_of(self, bubble_id: int) -> Position:
+        """
+        ### Returns
+        `Position`: Copy of the position of the bubble.
+        """
+        index = self._index_of[bubble_id]
+        return Position(float(self._x[index]), float(self._y[index]))
+
+    def velocity_of(self, bubble_id: int) -> Velocity:
+        """
+        ### Returns
+        `Velocity`: Copy of the velocity of the bubble.
+        """
+        index = self._index_of[bubble_id]
+        velocity_x = float(self._velocity_x[index])
+        velocity_y = float(self._velocity_y[index])
+        return Velocity.from_components(velocity_x, velocity_y)
+
+    def set_velocity_for_targets(self, targets: np.ndarray, easing: float = 40,
+                                 where: np.ndarray = None) -> None:
+        """
+        Vectorized `Moveable.set_velocity_for_target` for every bubble in the swarm.
+        ___
+
+        ### Arguments
+         - `targets (numpy.ndarray)`: (N, 2) array of target positions, one for each bubble.
+         - `easing [float=40]`: Easing coefficent
+         - `where [numpy.ndarray=None]`: Boolean mask of the bubbles to be updated. (None) for all.
+        """
+        count = self._count
+        diff_x = targets[:, 0] - self._x[:count]
+        diff_y = targets[:, 1] - self._y[:count]
+        distance = np.hypot(diff_x, diff_y)
+        max_velocity = self._max_velocity[:count]
+        coefficent = (max_velocity * easing / -(distance + easing)) + max_velocity
+
+        # The coefficent is zero where the distance is zero, so any finite divisor works
+        scale = coefficent / np.where(distance > 0, distance, 1.0)
+        if where is None:
+            where = True
+        np.multiply(diff_x, scale, out=self._velocity_x[:count], where=where)
+        np.multiply(diff_y, scale, out=self._velocity_y[:count], where=where)
+
+    def steer(self, targets: np.ndarray, fps: int, easing: float = 40) -> None:
+        """
+        Vectorized form of the steering in the game loop. The bubbles that can reach
+        their targets in this frame are snapped onto them and pinned with their velocity
+        kept, the others are unpinned and steered towards their targets.
+        ___
+
+        ### Arguments
+         - `targets (numpy.ndarray)`: (N, 2) array of target positions, one for each bubble.
+         - `fps (int)`: The FPS (Frames per Second) value of the game
+         - `easing [float=40]`: Easing coefficent
+        """
+        count = self._count
+        x = self._x[:count]
+        y = self._y[:count]
+        speed = np.hypot(self._velocity_x[:count], self._velocity_y[:count])
+        reached = np.hypot(targets[:, 0] - x, targets[:, 1] - y) < speed / fps
+
+        x[reached] = targets[reached, 0]
+        y[reached] = targets[reached, 1]
+        self._pinned[:count] = reached
+        self.set_velocity_for_targets(targets, easing, where=~reached)
+
+    def commit_movement(self, fps: int) -> None:
+        """
+        Vectorized `Moveable.commit_movement`. Moves every bubble that is not pinned.
+        ___
+
+        ### Arguments
+         - `fps (int)`: The FPS (Frames per Second) value of the game
+        """
+        count = self._count
+        moving = ~self._pinned[:count]
+        self._x[:count] += np.where(moving, self._velocity_x[:count] / fps, 0.0)
+        self._y[:count] += np.where(moving, self._velocity_y[:count] / fps, 0.0)
+
+    def step_with_lod(self, targets: np.ndarray, fps: int, tick: int,
+                      active_area: Union[Tuple[float, float, float, float], np.ndarray],
+                      interval: int = 4, easing: float = 40) -> np.ndarray:
+        """
+        Steers and moves the swarm with a lower level of detail outside `active_area`, e.g.
+        the viewport of a camera grown by a margin. The bubbles inside it are updated
+        every tick, the others only every `interval` ticks. The updates of the distant
+        bubbles are staggered by their ids, so every tick handles about `1 / interval` of
+        them. Every updated bubble advances by the ticks since its own last update, at most
+        `interval`, so a bubble that leaves the area does not overshoot and one that enters
+        it catches up. Several areas can be given, e.g. the
+        viewports of all the players, then a bubble in any of them is updated every tick.
+        ___
+
+        ### Arguments
+         - `targets (numpy.ndarray)`: (N, 2) array of target positions, one for each bubble.
+         - `fps (int)`: The FPS (Frames per Second) value of the game
+         - `tick (int)`: Number of the current tick.
+         - `active_area (tuple (left, top, right, bottom) or numpy.ndarray)`: Area of the world simulated
+           at full rate, or an (M, 4) array of such areas.
+         - `interval [int=4]`: Number of ticks between the updates of the bubbles outside the area.
+         - `easing [float=40]`: Easing coefficent
+
+        ### Returns
+        `numpy.ndarray`: Boolean mask of the bubbles that were updated.
+        """
+        count = self._count
+        areas = np.asarray(active_area, dtype=np.float64).reshape(-1, 4)
+        left, top, right, bottom = areas.T
+        x = self._x[:count, None]
+        y = self._y[:count, None]
+        near = ((x >= left) & (x <= right) & (y >= top) & (y <= bottom)).any(axis=1)
+        updated = near | ((self._ids[:count] + tick) % interval == 0)
+
+        # Steer and move only the gathered bubbles, the same way as steer() and commit_movement()
+        indices = np.flatnonzero(updated)
+        last_step = self._last_step[indices]
+        elapsed_ticks = np.where(last_step < 0, 1, np.clip(tick - last_step, 1, interval))
+        self._last_step[indices] = tick
+        step_fps = fps / elapsed_ticks
+        x = self._x[indices]
+        y = self._y[indices]
+        velocity_x = self._velocity_x[indices]
+        velocity_y = self._velocity_y[indices]
+        max_velocity = self._max_velocity[indices]
+        target_x = targets[indices, 0]
+        target_y = targets[indices, 1]
+
+        diff_x = target_x - x
+        diff_y = target_y - y
+        distance = np.hypot(diff_x, diff_y)
+        reached = distance < np.hypot(velocity_x, velocity_y) / step_fps
+        coefficent = (max_velocity * easing / -(distance + easing)) + max_velocity
+        scale = coefficent / np.where(distance > 0, distance, 1.0)
+        velocity_x = np.where(reached, velocity_x, diff_x * scale)
+        velocity_y = np.where(reached, velocity_y, diff_y * scale)
+
+        self._x[indices] = np.where(reached, target_x, x + velocity_x / step_fps)
+        self._y[indices] = np.where(reached, target_y, y + velocity_y / step_fps)
+        self._velocity_x[indices] = velocity_x
+        self._velocity_y[indices] = velocity_y
+        self._pinned[indices] = reached
+        return updated
+
+    def write_to(self, bubbles: Iterable[Bubble]) -> None:
+        """
+        Copies the state of the swarm back to the bubbles that it was created from.
+        ___
+
+        ### Arguments
+         - `bubbles (Iterable[Bubble])`: Bubbles in the order of the swarm.
+        """
+        for index, bubble in enumerate(bubbles):
+            bubble.position.x = float(self._x[index])
+            bubble.position.y = float(self._y[index])
+            bubble.velocity.set_components(float(self._velocity_x[index]), float(self._velocity_y[index]))
+            bubble.pinned = bool(self._pinned[index])
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __str__(self):
+        return "BubbleSwarm: count={}, capacity={}".format(self._count, self.capacity)
@@ -0,0 +1,97 @@
+from typing import Tuple
+
+from position import Position
+from size import Size
+
+Rect = Tuple[float, float, float, float]
+
+
+class Camera:
+    """
+    Viewport of the screen onto a world that can be bigger than the screen.
+
+    The viewport is kept centered on the followed position, but never leaves the world.
+    Its origin is snapped to whole pixels, so integral screen positions such as the mouse
+    map to integral world positions.
+    ___
+
+    ### Arguments
+     - `viewport_size (Size)`: Size of the screen.
+     - `world_size (Size)`: Size of the world.
+    """
+
+    __slots__ = ('viewport_size', 'world_size', 'left', 'top')
+
+    def __init__(self, viewport_size: Size, world_size: Size):
+        self.viewport_size = viewport_size
+        self.world_size = world_size
+        self.left = 0
+        self.top = 0
+
+    def follow(self, position: Position) -> bool:
+        """
+        Centers the viewport on `position`, clamped to the world.
+        ___
+
+        ### Arguments
+         - `position (Position)`: World position to follow, e.g. the interpolated position of the bubble.
+
+        ### Returns
+        `bool`: Whether the viewport moved or not.
+        """
+        width, height = self.viewport_size.as_tuple()
+        left = min(max(int(position.x - width / 2), 0), max(self.world_size.width - width, 0))
+        top = min(max(int(position.y - height / 2), 0), max(self.world_size.height - height, 0))
+        moved = left != self.left or top != self.top
+        self.left = left
+        self.top = top
+        return moved
+
+    @property
+    def origin(self) -> Tuple[int, int]:
+        """
+        ### Returns
+        `tuple (int, int)`: World position of the top left corner of the screen.
+        """
+        return self.left, self.top
+
+    def screen_to_world(self, x: float, y: float) -> Tuple[float, float]:
+        """
+        ### Returns
+        `tuple (float, float)`: World position of the screen position (`x`, `y`).
+        """
+        return x + self.left, y + self.top
+
+    def world_to_screen(self, x: float, y: float) -> Tuple[float, float]:
+        """
+        ### Returns
+        `tuple (float, float)`: Screen position of the world position (`x`, `y`).
+        """
+        return x - self.left, y - self.top
+
+    def viewport(self, margin: float = 0) -> Rect:
+        """
+        ### Arguments
+         - `margin [float=0]`: Distance to grow the viewport by on every side.
+
+        ### Returns
+        `tuple (left, top, right, bottom)`: Visible area of the world.
+        """
+        width, height = self.viewport_size.as_tuple()
+        return (self.left - margin, self.top - margin,
+                self.left + width + margin, self.top + height + margin)
+
+    def __str__(self):
+        return "Camera: origin=({}, {}), viewport={}, world={}".format(
+            self.left, self.top, self.viewport_size, self.world_size)
+
+
+def main():
+    """ Created for test purposes """
+    camera = Camera(Size(900, 675), Size(2700, 2025))
+    camera.follow(Position(1000, 100))
+    print(camera, camera.screen_to_world(450, 337), camera.viewport())
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,252 @@
-from typing import List
+import math
+from typing import List, Optional, Tuple
 
+import numpy as np
+
+from bubble import Bubble
 from food import Food
+from position import Position
+from spatial_grid import SpatialGrid
+
+
+def swept_contact_time(start_x: float, start_y: float, motion_x: float, motion_y: float,
+                       x: float, y: float, reach: float) -> Optional[float]:
+    """
+    Finds the earliest time that a circle moving along a segment touches a static circle.
+    ___
+
+    ### Arguments
+     - `start_x (float)`: Center of the moving circle at the start, in X axis.
+     - `start_y (float)`: Center of the moving circle at the start, in Y axis.
+     - `motion_x (float)`: Movement along the segment in X axis.
+     - `motion_y (float)`: Movement along the segment in Y axis.
+     - `x (float)`: Center of the static circle in X axis.
+     - `y (float)`: Center of the static circle in Y axis.
+     - `reach (float)`: Sum of the radii of the circles.
+
+    ### Returns
+    `float`: Fraction of the segment in [0, 1] at the first contact. (None) if they do not touch.
+    """
+    offset_x = start_x - x
+    offset_y = start_y - y
+    # |offset + t * motion|^2 = reach^2, solved for the smaller t
+    c = offset_x * offset_x + offset_y * offset_y - reach * reach
+    if c <= 0:
+        return 0.0
+    a = motion_x * motion_x + motion_y * motion_y
+    b = offset_x * motion_x + offset_y * motion_y
+    if a == 0 or b >= 0:
+        # Not moving, or moving away from the static circle
+        return None
+    discriminant = b * b - a * c
+    if discriminant < 0:
+        return None
+    time = (-b - math.sqrt(discriminant)) / a
+    return time if time <= 1 else None
+
+
+# Most eater and food pairs that circle_contacts() tests directly, without the cell list
+DIRECT_CONTACT_PAIRS = 4096
+
+
+def circle_contacts(eater_x: np.ndarray, eater_y: np.ndarray, eater_radius: np.ndarray,
+                    food_x: np.ndarray, food_y: np.ndarray, food_radius: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the touching eater and food circles in bulk, with a cell list instead of a `SpatialGrid`.
+
+    The foods are sorted by the cell of a grid as wide as the longest reach, so every eater
+    only tests the foods of the 3x3 cells around it, looked up with binary searches. Every
+    food is reported once, for the first eater that touches it.
+    ___
+
+    ### Arguments
+     - `eater_x (numpy.ndarray)`: Centers of the eaters in X axis.
+     - `eater_y (numpy.ndarray)`: Centers of the eaters in Y axis.
+     - `eater_radius (numpy.ndarray)`: Radii of the eaters.
+     - `food_x (numpy.ndarray)`: Centers of the foods in X axis.
+     - `food_y (numpy.ndarray)`: Centers of the foods in Y axis.
+     - `food_radius (numpy.ndarray)`: Radii of the foods.
+
+    ### Returns
+    `tuple (numpy.ndarray, numpy.ndarray)`: Indices of the eaters and of the foods in contact, by the food indices.
+    """
+    if len(eater_x) == 0 or len(food_x) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    if len(eater_x) * len(food_x) <= DIRECT_CONTACT_PAIRS:
+        # Few enough pairs to test them all, with fewer calls than the cell list
+        diff_x = food_x - eater_x[:, None]
+        diff_y = food_y - eater_y[:, None]
+        reach = (eater_radius[:, None] + food_radius).astype(np.float64)
+        touching = diff_x * diff_x + diff_y * diff_y <= reach * reach
+        eaten = np.flatnonzero(touching.any(axis=0))
+        return touching[:, eaten].argmax(axis=0), eaten
+
+    cell_size = max(float(eater_radius.max()) + float(food_radius.max()), 1.0)
+
+    food_column = np.floor(food_x / cell_size).astype(np.int64)
+    food_row = np.floor(food_y / cell_size).astype(np.int64)
+    eater_column = np.floor(eater_x / cell_size).astype(np.int64)
+    eater_row = np.floor(eater_y / cell_size).astype(np.int64)
+    # Cell keys of a grid that covers both sets with a free column around them
+    min_column = min(food_column.min(), eater_column.min()) - 1
+    min_row = min(food_row.min(), eater_row.min()) - 1
+    columns = max(food_column.max(), eater_column.max()) - min_column + 2
+    food_keys = (food_row - min_row) * columns + (food_column - min_column)
+    order = np.argsort(food_keys, kind='stable')
+    sorted_keys = food_keys[order]
+
+    eater_keys = (eater_row - min_row) * columns + (eater_column - min_column)
+    neighbor_keys = (eater_keys[:, None] + (np.array([-columns, 0, columns])[:, None]
+                                            + np.array([-1, 0, 1])).ravel()).ravel()
+    starts = np.searchsorted(sorted_keys, neighbor_keys, side='left')
+    counts = np.searchsorted(sorted_keys, neighbor_keys, side='right') - starts
+    pair_eaters = np.repeat(np.repeat(np.arange(len(eater_x)), 9), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    pair_foods = order[np.repeat(starts, counts) + offsets]
+
+    diff_x = food_x[pair_foods] - eater_x[pair_eaters]
+    diff_y = food_y[pair_foods] - eater_y[pair_eaters]
+    reach = (eater_radius[pair_eaters] + food_radius[pair_foods]).astype(np.float64)
+    touching = diff_x * diff_x + diff_y * diff_y <= reach * reach
+    pair_eaters = pair_eaters[touching]
+    pair_foods = pair_foods[touching]
+
+    first = np.lexsort((pair_eaters, pair_foods))
+    pair_eaters = pair_eaters[first]
+    pair_foods = pair_foods[first]
+    unique = np.ones(len(pair_foods), dtype=np.bool_)
+    unique[1:] = pair_foods[1:] != pair_foods[:-1]
+    return pair_eaters[unique], pair_foods[unique]
+
 
 class CollisionDetector:
-    def __init__(self):
-        pass
+    """
+    Class for detecting the interactions between the objects in the game.
+    ___
 
-    def detect_feeding(self, foods: List[Food], bubbles):
-        pass
+    ### Arguments
+     - `food_grid [SpatialGrid=None]`: Spatial index of the living foods. When it is not
+       given, every bubble is checked against every food.
+    """
+
+    def __init__(self, food_grid: SpatialGrid = None):
+        self.food_grid = food_grid
+
+    def detect_feeding(self, foods: List[Food], bubbles: List[Bubble]) -> List[Tuple[Bubble, Food]]:
+        """
+        Detects the foods that are touched by the bubbles. Every food is reported once,
+        for the first bubble that touches it.
+        ___
+
+        ### Arguments
+         - `foods (List[Food])`: Living foods. Only used if there is no `food_grid`.
+         - `bubbles (List[Bubble])`: Bubbles that can eat the foods.
+
+        ### Returns
+        `List[tuple (Bubble, Food)]`: Bubble and food pairs in contact. The foods from the `food_grid`
+        of a `FoodField` are pooled views, invalidated once their food is removed.
+        """
+        if self.food_grid is None:
+            return self._detect_feeding_brute_force(foods, bubbles)
+
+        contacts = []
+        eaten = set()
+        for bubble in bubbles:
+            bubble_x = bubble.position.x
+            bubble_y = bubble.position.y
+            bubble_radius = bubble.radius()
+            for food, x, y, food_radius in self.food_grid.query(bubble.position, bubble_radius):
+                reach = bubble_radius + food_radius
+                diff_x = x - bubble_x
+                diff_y = y - bubble_y
+                if diff_x * diff_x + diff_y * diff_y <= reach * reach and food not in eaten:
+                    eaten.add(food)
+                    contacts.append((bubble, food))
+        return contacts
+
+    def detect_feeding_swept(self, foods: List[Food], bubbles: List[Bubble]) -> List[Tuple[Bubble, Food, float]]:
+        """
+        Detects the foods that are touched by the bubbles anywhere along their movement
+        of the tick, from `previous_position` to `position`. Unlike `detect_feeding()`,
+        a bubble that moves farther than a food in a tick does not pass through it.
+        Every food is reported once, for the bubble that touches it first.
+        ___
+
+        ### Arguments
+         - `foods (List[Food])`: Living foods. Only used if there is no `food_grid`.
+         - `bubbles (List[Bubble])`: Bubbles that can eat the foods.
+
+        ### Returns
+        `List[tuple (Bubble, Food, float)]`: Bubble and food pairs in contact with the time of the
+        first contact as a fraction of the tick, ordered by the time. As in `detect_feeding()`,
+        pooled food views are invalidated once their food is removed.
+        """
+        first_contacts = {}
+        for bubble in bubbles:
+            start_x = bubble.previous_position.x
+            start_y = bubble.previous_position.y
+            motion_x = bubble.position.x - start_x
+            motion_y = bubble.position.y - start_y
+            bubble_radius = bubble.radius()
+            if self.food_grid is None:
+                candidates = ((food, food.position.x, food.position.y, food.radius()) for food in foods)
+            else:
+                candidates = self.food_grid.query_rect(
+                    min(start_x, bubble.position.x) - bubble_radius, min(start_y, bubble.position.y) - bubble_radius,
+                    max(start_x, bubble.position.x) + bubble_radius, max(start_y, bubble.position.y) + bubble_radius)
+            for food, x, y, food_radius in candidates:
+                time = swept_contact_time(start_x, start_y, motion_x, motion_y, x, y, bubble_radius + food_radius)
+                if time is not None:
+                    first = first_contacts.get(food)
+                    if first is None or time < first[2]:
+                        first_contacts[food] = (bubble, food, time)
+        return sorted(first_contacts.values(), key=lambda contact: contact[2])
+
+    def detect_feeding_at(self, positions: np.ndarray, radius: float) -> List[Tuple[int, Food]]:
+        """
+        Same as `detect_feeding()` for bubbles given as an array of positions, such as
+        the positions of a `BubbleSwarm`. Needs the `food_grid`.
+        ___
+
+        ### Arguments
+         - `positions (numpy.ndarray)`: (N, 2) array of the bubble positions.
+         - `radius (float)`: Radius of the bubbles.
+
+        ### Returns
+        `List[tuple (int, Food)]`: Bubble index and food pairs in contact. As in `detect_feeding()`,
+        pooled food views are invalidated once their food is removed.
+        """
+        contacts = []
+        eaten = set()
+        query = Position(0, 0)
+        for index, (bubble_x, bubble_y) in enumerate(positions.tolist()):
+            query.set(bubble_x, bubble_y)
+            for food, x, y, food_radius in self.food_grid.query(query, radius):
+                reach = radius + food_radius
+                diff_x = x - bubble_x
+                diff_y = y - bubble_y
+                if diff_x * diff_x + diff_y * diff_y <= reach * reach and food not in eaten:
+                    eaten.add(food)
+                    contacts.append((index, food))
+        return contacts
+
+    @staticmethod
+    def _detect_feeding_brute_force(foods: List[Food], bubbles: List[Bubble]) -> List[Tuple[Bubble, Food]]:
+        contacts = []
+        eaten = set()
+        for bubble in bubbles:
+            bubble_radius = bubble.radius()
+            for food in foods:
+                reach = bubble_radius + food.radius()
+                diff_x = food.position.x - bubble.position.x
+                diff_y = food.position.y - bubble.position.y
+                if diff_x * diff_x + diff_y * diff_y <= reach * reach and food not in eaten:
+                    eaten.add(food)
+                    contacts.append((bubble, food))
+        return contacts
 
     def detect_breeding(self):
         pass
 
     def detect_attacking(self):
-        pass
\ No newline at end of file
+        pass
@@ -1,39 +1,74 @@
 class Color:
     """
     A basic class for simplifying color operations.
+
+    Colors are immutable, so a single instance can be shared by many objects and
+    its tuple form is built only once. Common colors are available as constants
+    such as `WHITE`.
     ___
 
     ### Arguments
     - `red (int)`: Red value of the color.
     - `green (int)`: Green value of the color.
     - `blue (int)`: Blue color of the color.
-    - `alpha [int=255]`: Alpha value of the color.    
+    - `alpha [int=255]`: Alpha value of the color.
 
     ### Raises
     `ValueError`: If one of the (r,g,b,a) value is greater than 255 or less than 0,
     this method raises an ValueError
     """
 
+    __slots__ = ('_rgba', '_tuple')
+
     def __init__(self, red: int, green: int, blue: int, alpha: int = 255):
-        if 0 > red > 255 or 0 > green > 255 or 0 > blue > 255 or 0 > alpha > 255:
+        if not (0 <= red <= 255 and 0 <= green <= 255 and 0 <= blue <= 255 and 0 <= alpha <= 255):
             raise ValueError(
-                "Invalid subpixel value in rgb({}, {}, {})".format(red, green, blue))
-        self.red = red
-        self.green = green
-        self.blue = blue
-        self.alpha = alpha
+                "Invalid subpixel value in rgba({}, {}, {}, {})".format(red, green, blue, alpha))
+        self._rgba = (red, green, blue, alpha)
+        if alpha != 255:
+            self._tuple = self._rgba
+        else:
+            self._tuple = (red, green, blue)
+
+    @property
+    def red(self) -> int:
+        return self._rgba[0]
+
+    @property
+    def green(self) -> int:
+        return self._rgba[1]
+
+    @property
+    def blue(self) -> int:
+        return self._rgba[2]
+
+    @property
+    def alpha(self) -> int:
+        return self._rgba[3]
 
     def as_tuple(self) -> tuple:
         """
         ### Returns
         `tuple (int, int, int, [int])`: Color in tuple form as (red, green, blue, [alpha])
         """
-        if self.alpha is not 255:
-            return self.red, self.green, self.blue, self.alpha
-        else:
-            return self.red, self.green, self.blue
+        return self._tuple
 
+    def as_rgba(self) -> tuple:
+        """
+        ### Returns
+        `tuple (int, int, int, int)`: Color in tuple form as (red, green, blue, alpha)
+        """
+        return self._rgba
+
+    def __eq__(self, other):
+        return isinstance(other, Color) and other._rgba == self._rgba
+
+    def __hash__(self):
+        return hash(self._rgba)
 
     def __str__(self):
         s = "Color: red={}, green={}, blue={}, alpha={}"
-        return s.format(self.red, self.green, self.blue, self.alpha)
+        return s.format(*self._rgba)
+
+
+WHITE = Color(255, 255, 255)
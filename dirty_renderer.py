@@ -0,0 +1,119 @@
+from typing import TYPE_CHECKING, Iterable, List
+
+import render_backend
+
+if TYPE_CHECKING:
+    import pygame
+
+
+class DirtyRectRenderer:
+    """
+    Renderer that only restores and pushes the changed regions of the screen.
+
+    Every frame, the rectangles drawn in the previous frame are restored from the cached
+    `background`, then the objects are drawn and their rectangles are marked. Only the
+    previous and the current rectangles are pushed to the display. If they cover more
+    than `full_update_ratio` of the screen, the whole display is flipped instead.
+
+    Rectangles marked as retained belong to static objects that may be left on the screen
+    for a frame: `restore(keep_retained=True)` neither restores nor pushes them, and the
+    caller does not draw them again. Objects crossing them can erase parts of them until
+    they are redrawn.
+    ___
+
+    ### Arguments
+     - `surface (pygame.Surface)`: Display surface.
+     - `background (pygame.Surface)`: Background of the scene, the same size as `surface`.
+     - `full_update_ratio [float=0.3]`: Dirty area ratio above which the whole display is updated.
+    """
+
+    def __init__(self, surface: 'pygame.Surface', background: 'pygame.Surface', full_update_ratio: float = 0.3):
+        self.surface = surface
+        self.background = background
+        self.full_update_ratio = full_update_ratio
+        self.screen_rect = surface.get_rect()
+        self.full_updates = 0
+        self.partial_updates = 0
+        self._previous_rects: List['pygame.Rect'] = []
+        self._current_rects: List['pygame.Rect'] = []
+        self._previous_retained_rects: List['pygame.Rect'] = []
+        self._current_retained_rects: List['pygame.Rect'] = []
+        self._retained_kept = False
+        self._force_full_update = True
+
+    def restore(self, keep_retained: bool = False) -> bool:
+        """
+        Erases the objects drawn in the previous frame by restoring the background under them.
+        Must be called at the beginning of the frame, before drawing.
+        ___
+
+        ### Arguments
+         - `keep_retained [bool=False]`: Whether to leave the retained objects of the previous frame on the screen.
+
+        ### Returns
+        `bool`: Whether the retained objects were kept. If not, they must be drawn again.
+        """
+        if self._force_full_update:
+            self.surface.blit(self.background, (0, 0))
+            self._retained_kept = False
+            return False
+        rects = self._previous_rects
+        if keep_retained:
+            self._current_retained_rects = self._previous_retained_rects
+        else:
+            rects = rects + self._previous_retained_rects
+        background = self.background
+        self.surface.blits([(background, rect, rect) for rect in rects], doreturn=False)
+        self._retained_kept = keep_retained
+        return keep_retained
+
+    def mark(self, rects: Iterable['pygame.Rect'], retained: bool = False) -> None:
+        """
+        Marks the rectangles drawn in the current frame.
+        ___
+
+        ### Arguments
+         - `rects (Iterable[pygame.Rect])`: Bounding rectangles of the drawn objects.
+         - `retained [bool=False]`: Whether the objects may be kept on the screen by `restore()`.
+        """
+        if retained:
+            self._current_retained_rects.extend(rects)
+        else:
+            self._current_rects.extend(rects)
+
+    def invalidate(self) -> None:
+        """ Makes the next frame redraw and update the whole screen. """
+        self._force_full_update = True
+
+    def present(self) -> None:
+        """
+        Pushes the dirty regions of the frame to the display.
+        """
+        screen_rect = self.screen_rect
+        current_rects = [rect.clip(screen_rect) for rect in self._current_rects]
+        dirty_rects = self._previous_rects + current_rects
+        if self._retained_kept:
+            # Kept objects did not change on the screen
+            retained_rects = self._current_retained_rects
+        else:
+            retained_rects = [rect.clip(screen_rect) for rect in self._current_retained_rects]
+            dirty_rects += self._previous_retained_rects + retained_rects
+        dirty_area = sum(rect.width * rect.height for rect in dirty_rects)
+
+        if self._force_full_update or dirty_area > self.full_update_ratio * screen_rect.width * screen_rect.height:
+            render_backend.load().display.flip()
+            self.full_updates += 1
+        else:
+            render_backend.load().display.update(dirty_rects)
+            self.partial_updates += 1
+
+        self._previous_rects = current_rects
+        self._current_rects = []
+        self._previous_retained_rects = retained_rects
+        self._current_retained_rects = []
+        self._retained_kept = False
+        self._force_full_update = False
+
+    def __str__(self):
+        s = "DirtyRectRenderer: full_updates={}, partial_updates={}"
+        return s.format(self.full_updates, self.partial_updates)
@@ -0,0 +1,420 @@
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from profiler import NullProfiler
+
+# Fields of the components as (name, dtype, shape of a single value). Field names are unique
+# across the components, so an archetype can store all its fields side by side.
+COMPONENTS: Dict[str, Tuple[Tuple[str, type, tuple], ...]] = {
+    'position': (('x', np.float64, ()), ('y', np.float64, ()),
+                 ('previous_x', np.float64, ()), ('previous_y', np.float64, ())),
+    'velocity': (('velocity_x', np.float64, ()), ('velocity_y', np.float64, ()),
+                 ('max_velocity', np.float64, ())),
+    'target': (('target_x', np.float64, ()), ('target_y', np.float64, ())),
+    'pinned': (('pinned', np.bool_, ()),),
+    'lifetime': (('expires_at', np.float64, ()),),
+    'render_style': (('radius', np.int32, ()), ('color', np.uint8, (4,)), ('visible', np.bool_, ())),
+    'feeder': (('eaten', np.int64, ()),),
+    'edible': (),
+}
+
+
+class Archetype:
+    """
+    Dense table of the entities of a single kind, the entities that have the same set of
+    components.
+
+    Every field of the components is stored in its own contiguous NumPy array, and the
+    arrays of a table are aligned, so the index of an entity is the same in all of them.
+    Removal swaps the last entities into the freed slots, so the arrays stay dense and the
+    systems can process the whole table with a few NumPy calls.
+    ___
+
+    ### Arguments
+     - `kind (str)`: Name of the entity kind.
+     - `components (Sequence[str])`: Names of the components, keys of `COMPONENTS`.
+     - `capacity [int=64]`: Initial number of slots. The arrays grow when needed.
+     - `allocator [SharedArrayAllocator=None]`: Allocator of the arrays, e.g. to put them in shared memory.
+       (None) for ordinary NumPy arrays.
+
+    ### Raises
+    `KeyError`: If a component is not one of the `COMPONENTS`.
+    """
+
+    def __init__(self, kind: str, components: Sequence[str], capacity: int = 64, allocator=None):
+        self.kind = kind
+        self.allocator = allocator
+        self.components = frozenset(components)
+        self.fields = {name: (dtype, shape) for component in components for name, dtype, shape in COMPONENTS[component]}
+        self.fields['id'] = (np.int64, ())
+        self._count = 0
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._index_of: Dict[int, int] = {}
+        self._allocate(max(1, capacity))
+
+    def _allocate(self, capacity: int) -> None:
+        count = self._count
+        allocator = self.allocator
+        for name, (dtype, shape) in self.fields.items():
+            if allocator is None:
+                array = np.zeros((capacity,) + shape, dtype=dtype)
+            else:
+                array = allocator.zeros((capacity,) + shape, dtype)
+            previous = self._arrays.get(name)
+            if previous is not None:
+                array[:count] = previous[:count]
+                if allocator is not None:
+                    allocator.free(previous)
+            self._arrays[name] = array
+        self.capacity = capacity
+
+    def has(self, *components: str) -> bool:
+        """
+        ### Returns
+        `bool`: Whether the entities of the kind have all the `components`.
+        """
+        return self.components.issuperset(components)
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        """
+        ### Returns
+        `numpy.ndarray`: Writable view of a field of the stored entities, e.g. `archetype['x']`.
+        """
+        return self._arrays[field][:self._count]
+
+    def index_of(self, entity_id: int) -> int:
+        """
+        ### Returns
+        `int`: Current index of the entity in the arrays. It changes when other entities are removed.
+        """
+        return self._index_of[entity_id]
+
+    def add_many(self, entity_ids: np.ndarray, values: Dict[str, object]) -> None:
+        """
+        Stores new entities. Fields without a value are zero.
+        ___
+
+        ### Arguments
+         - `entity_ids (numpy.ndarray)`: Ids of the entities.
+         - `values (Dict[str, object])`: Values of the fields, a single value for all the entities or one each.
+
+        ### Raises
+        `KeyError`: If a field is not one of the fields of the kind.
+        """
+        n_entities = len(entity_ids)
+        start = self._count
+        end = start + n_entities
+        if end > self.capacity:
+            capacity = self.capacity
+            while capacity < end:
+                capacity *= 2
+            self._allocate(capacity)
+
+        unknown = set(values) - set(self.fields)
+        if unknown:
+            raise KeyError("{} has no fields {}".format(self.kind, sorted(unknown)))
+        for name, array in self._arrays.items():
+            array[start:end] = values.get(name, 0)
+        self._arrays['id'][start:end] = entity_ids
+        self._index_of.update(zip(entity_ids.tolist(), range(start, end)))
+        self._count = end
+
+    def remove_many(self, entity_ids: Iterable[int]) -> None:
+        """
+        Removes entities in a single batched swap-and-pop. The living entities from the
+        tail fill the slots of the removed ones in the kept range.
+        ___
+
+        ### Arguments
+         - `entity_ids (Iterable[int])`: Ids of the distinct entities to be removed.
+
+        ### Raises
+        `KeyError`: If an entity is not stored in the table.
+        """
+        index_of = self._index_of
+        removed = np.sort(np.fromiter((index_of.pop(entity_id) for entity_id in entity_ids), dtype=np.int64))
+        if len(removed) == 0:
+            return
+        count = self._count
+        kept = count - len(removed)
+        holes = removed[removed < kept]
+        movers = np.setdiff1d(np.arange(kept, count), removed[removed >= kept], assume_unique=True)
+
+        for array in self._arrays.values():
+            array[holes] = array[movers]
+        for index, entity_id in zip(holes.tolist(), self._arrays['id'][holes].tolist()):
+            index_of[entity_id] = index
+        self._count = kept
+
+    def __contains__(self, entity_id: int) -> bool:
+        return entity_id in self._index_of
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __str__(self):
+        return "Archetype: kind={}, components={}, count={}, capacity={}".format(
+            self.kind, sorted(self.components), self._count, self.capacity)
+
+
+class EntityStore:
+    """
+    Entity-component storage. Entities are plain integer ids, their data live in the
+    dense arrays of the `Archetype` of their kind.
+
+    A kind is registered once with its components. Systems ask for the archetypes that
+    have the components they work on with `query()`, and process each of them in bulk,
+    so a new kind of entity costs the systems one more table, not a call per entity.
+    ___
+
+    ### Arguments
+     - `capacity [int=64]`: Initial number of slots of the registered kinds.
+     - `allocator [SharedArrayAllocator=None]`: Allocator of the arrays of the kinds. (None) for ordinary NumPy arrays.
+    """
+
+    def __init__(self, capacity: int = 64, allocator=None):
+        self.capacity = capacity
+        self.allocator = allocator
+        self.time = 0.0
+        self.archetypes: Dict[str, Archetype] = {}
+        self._next_id = 0
+        self._kind_of: Dict[int, Archetype] = {}
+        # Archetypes matching the queried component sets, cleared when a kind is registered
+        self._matches: Dict[Tuple[str, ...], List[Archetype]] = {}
+
+    def register_kind(self, kind: str, components: Sequence[str]) -> Archetype:
+        """
+        Registers a kind of entity. The archetypes are queried in the order they were registered.
+        ___
+
+        ### Arguments
+         - `kind (str)`: Name of the kind.
+         - `components (Sequence[str])`: Names of the components of the kind, keys of `COMPONENTS`.
+
+        ### Returns
+        `Archetype`: Table of the entities of the kind.
+
+        ### Raises
+        `ValueError`: If the kind is already registered.
+        """
+        if kind in self.archetypes:
+            raise ValueError("Kind {} is already registered".format(kind))
+        archetype = self.archetypes[kind] = Archetype(kind, components, self.capacity, self.allocator)
+        self._matches.clear()
+        return archetype
+
+    def spawn(self, kind: str, **values) -> int:
+        """
+        Creates a single entity of a registered kind.
+        ___
+
+        ### Arguments
+         - `kind (str)`: Name of the kind.
+         - `**values`: Values of the fields, e.g. `x=10, y=20`. Missing fields are zero.
+
+        ### Returns
+        `int`: Id of the entity.
+        """
+        return int(self.spawn_many(kind, 1, **values)[0])
+
+    def spawn_many(self, kind: str, count: int, **values) -> np.ndarray:
+        """
+        Creates many entities of a registered kind at once.
+        ___
+
+        ### Arguments
+         - `kind (str)`: Name of the kind.
+         - `count (int)`: Number of entities.
+         - `**values`: Values of the fields, single values for all the entities or arrays of `count` values.
+
+        ### Returns
+        `numpy.ndarray`: Ids of the entities.
+        """
+        archetype = self.archetypes[kind]
+        entity_ids = np.arange(self._next_id, self._next_id + count, dtype=np.int64)
+        archetype.add_many(entity_ids, values)
+        self._next_id += count
+        self._kind_of.update(dict.fromkeys(entity_ids.tolist(), archetype))
+        return entity_ids
+
+    def destroy(self, entity_id: int) -> None:
+        """
+        ### Raises
+        `KeyError`: If there is no such entity.
+        """
+        self.destroy_many((entity_id,))
+
+    def destroy_many(self, entity_ids: Iterable[int]) -> None:
+        """
+        Removes distinct entities, in one batch per kind.
+        ___
+
+        ### Arguments
+         - `entity_ids (Iterable[int])`: Ids of the entities.
+
+        ### Raises
+        `KeyError`: If there is no such entity.
+        """
+        by_kind: Dict[str, List[int]] = {}
+        kind_of = self._kind_of
+        for entity_id in entity_ids:
+            by_kind.setdefault(kind_of.pop(entity_id).kind, []).append(entity_id)
+        for kind, kind_ids in by_kind.items():
+            self.archetypes[kind].remove_many(kind_ids)
+
+    def archetype_of(self, entity_id: int) -> Archetype:
+        """
+        ### Returns
+        `Archetype`: Table of the kind of the entity.
+
+        ### Raises
+        `KeyError`: If there is no such entity.
+        """
+        return self._kind_of[entity_id]
+
+    def query(self, *components: str) -> List[Archetype]:
+        """
+        ### Returns
+        `List[Archetype]`: Non-empty tables of the kinds that have all the `components`.
+        """
+        matches = self._matches.get(components)
+        if matches is None:
+            matches = self._matches[components] = [archetype for archetype in self.archetypes.values()
+                                                   if archetype.has(*components)]
+        return [archetype for archetype in matches if len(archetype)]
+
+    def count(self, *components: str) -> int:
+        """
+        ### Returns
+        `int`: Number of the entities that have all the `components`.
+        """
+        return sum(len(archetype) for archetype in self.query(*components))
+
+    def __contains__(self, entity_id: int) -> bool:
+        return entity_id in self._kind_of
+
+    def __len__(self) -> int:
+        return len(self._kind_of)
+
+    def __str__(self):
+        return "EntityStore: entities={}, kinds={}".format(
+            len(self), {kind: len(archetype) for kind, archetype in self.archetypes.items()})
+
+
+class System:
+    """
+    Bulk update of the entities that have all the `components`.
+
+    Subclasses implement `update()`, which is called once for every matching archetype
+    with its whole table, or override `run()` to work across the archetypes.
+    ___
+
+    ### Arguments
+     - `phase (str)`: Name of the system, also its profiler phase.
+     - `components (Sequence[str])`: Components that the updated entities must have.
+    """
+
+    def __init__(self, phase: str, components: Sequence[str] = ()):
+        self.phase = phase
+        self.components = tuple(components)
+
+    def run(self, store: EntityStore, fps: int) -> None:
+        """
+        Runs the system for a single tick of `1 / fps` seconds.
+        ___
+
+        ### Arguments
+         - `store (EntityStore)`: Entities to be updated.
+         - `fps (int)`: The FPS (Frames per Second) value of the simulation
+        """
+        for archetype in store.query(*self.components):
+            self.update(archetype, store, fps)
+
+    def update(self, archetype: Archetype, store: EntityStore, fps: int) -> None:
+        """
+        Updates the entities of a single archetype.
+
+        __This method must be implemented unless `run()` is overridden!__
+        ___
+
+        ### Arguments
+         - `archetype (Archetype)`: Table of the entities.
+         - `store (EntityStore)`: Owner of the table.
+         - `fps (int)`: The FPS (Frames per Second) value of the simulation
+
+        ### Raises
+        `NotImplementedError`: If the method called without implementation,
+                               NotImplementedError will be raised.
+        """
+        raise NotImplementedError(
+            "Class {} doesn't implement update()".format(self.__class__.__name__))
+
+    def __str__(self):
+        return "{}: phase={}, components={}".format(self.__class__.__name__, self.phase, self.components)
+
+
+class SystemScheduler:
+    """
+    Runs systems in a fixed order, each one timed as a phase of the profiler.
+    ___
+
+    ### Arguments
+     - `systems (Sequence[System])`: Systems in the order they run.
+     - `profiler [FrameProfiler=None]`: Profiler with a phase for every system. (None) for no profiling.
+    """
+
+    def __init__(self, systems: Sequence[System], profiler=None):
+        self.systems: List[System] = list(systems)
+        self.profiler = profiler if profiler is not None else NullProfiler()
+
+    @property
+    def phases(self) -> Tuple[str, ...]:
+        """
+        `tuple`: Phases of the systems in the order they run, for a `FrameProfiler`
+        """
+        return tuple(system.phase for system in self.systems)
+
+    def insert(self, system: System, before: str = None) -> None:
+        """
+        Adds a system before the system of the `before` phase, or at the end.
+        ___
+
+        ### Raises
+        `ValueError`: If there is no system with the `before` phase.
+        """
+        if before is None:
+            self.systems.append(system)
+        else:
+            self.systems.insert(self.phases.index(before), system)
+
+    def run(self, store: EntityStore, fps: int) -> None:
+        """
+        Runs every system once, in order.
+        ___
+
+        ### Arguments
+         - `store (EntityStore)`: Entities to be updated.
+         - `fps (int)`: The FPS (Frames per Second) value of the simulation
+        """
+        profiler = self.profiler
+        for system in self.systems:
+            with profiler.phase(system.phase):
+                system.run(store, fps)
+
+    def __str__(self):
+        return "SystemScheduler: phases={}".format(self.phases)
+
+
+def main():
+    """ Created for test purposes """
+    store = EntityStore()
+    store.register_kind('food', ('position', 'lifetime', 'render_style', 'edible'))
+    ids = store.spawn_many('food', 5, x=np.arange(5.0), y=1.0, radius=5, expires_at=5.0)
+    store.destroy_many(ids[[0, 3]].tolist())
+    food = store.archetypes['food']
+    print(store, food, food['id'], food['x'])
+
+
+if __name__ == '__main__':
+    main()
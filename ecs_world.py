@@ -0,0 +1,340 @@
+import math
+from typing import Callable
+
+import numpy as np
+
+from bubble import Bubble
+from collision import circle_contacts
+from ecs import Archetype, EntityStore, System, SystemScheduler
+from color import Color
+from food import Food
+from food_generator import FoodGenerator
+from position import Position
+from size import Size
+from velocity import Velocity
+from world import RandomPilot
+
+
+class GenerationSystem(System):
+    """
+    Spawns the foods of a `FoodGenerator` as entities of the `kind`, in a single batch per tick.
+    ___
+
+    ### Arguments
+     - `food_generator (FoodGenerator)`: Source of the food positions and of the generation rate.
+     - `kind [str='food']`: Kind of the spawned entities. Needs the `position`, `lifetime` and `render_style` components.
+     - `radius [int=Food.DEFAULT_SIZE.width//2]`: Radius of the foods.
+     - `color [Color=Food.DEFAULT_COLOR]`: Color of the foods.
+     - `life [float=Food.EXISTENCE_LENGTH]`: Life of the foods in seconds.
+    """
+
+    def __init__(self, food_generator: FoodGenerator, kind: str = 'food', radius: int = Food.DEFAULT_SIZE.width // 2,
+                 color: Color = Food.DEFAULT_COLOR, life: float = Food.EXISTENCE_LENGTH):
+        System.__init__(self, 'generation')
+        self.food_generator = food_generator
+        self.kind = kind
+        self.radius = radius
+        self.color = color.as_rgba()
+        self.life = life
+
+    def run(self, store: EntityStore, fps: int) -> None:
+        n_foods = self.food_generator.due_foods(fps)
+        if n_foods <= 0:
+            return
+        xs, ys = self.food_generator.generate_positions(n_foods)
+        store.spawn_many(self.kind, n_foods, x=xs, y=ys, previous_x=xs, previous_y=ys, radius=self.radius,
+                         color=self.color, visible=True, expires_at=store.time + self.life)
+
+
+class SteeringSystem(System):
+    """
+    Vectorized steering of the game loop, the same as `BubbleSwarm.steer()`. The entities that
+    can reach their targets in this tick are pinned with their velocity kept, the others are
+    unpinned and steered towards their targets with the decelerating easing.
+    ___
+
+    ### Arguments
+     - `easing [float=40]`: Easing coefficent
+    """
+
+    def __init__(self, easing: float = 40):
+        System.__init__(self, 'steering', ('position', 'velocity', 'target', 'pinned'))
+        self.easing = easing
+
+    def update(self, archetype: Archetype, store: EntityStore, fps: int) -> None:
+        velocity_x = archetype['velocity_x']
+        velocity_y = archetype['velocity_y']
+        diff_x = archetype['target_x'] - archetype['x']
+        diff_y = archetype['target_y'] - archetype['y']
+        distance = np.hypot(diff_x, diff_y)
+        reached = distance < np.hypot(velocity_x, velocity_y) / fps
+        archetype['pinned'][:] = reached
+
+        max_velocity = archetype['max_velocity']
+        coefficent = (max_velocity * self.easing / -(distance + self.easing)) + max_velocity
+        # The coefficent is zero where the distance is zero, so any finite divisor works
+        scale = coefficent / np.where(distance > 0, distance, 1.0)
+        np.multiply(diff_x, scale, out=velocity_x, where=~reached)
+        np.multiply(diff_y, scale, out=velocity_y, where=~reached)
+
+
+class MovementSystem(System):
+    """
+    Remembers the positions of the moving entities for the interpolation, then moves them
+    along their velocities. Pinned entities that have a target are put onto it, the other
+    pinned entities stay.
+
+    `distance_travelled` sums the distances moved by all the entities.
+    """
+
+    def __init__(self):
+        System.__init__(self, 'movement', ('position', 'velocity'))
+        self.distance_travelled = 0.0
+
+    def update(self, archetype: Archetype, store: EntityStore, fps: int) -> None:
+        x = archetype['x']
+        y = archetype['y']
+        archetype['previous_x'][:] = x
+        archetype['previous_y'][:] = y
+        step_x = archetype['velocity_x'] / fps
+        step_y = archetype['velocity_y'] / fps
+
+        pinned = archetype['pinned'] if archetype.has('pinned') else None
+        if pinned is None or not pinned.any():
+            self.distance_travelled += float(np.hypot(step_x, step_y).sum())
+            x += step_x
+            y += step_y
+        elif archetype.has('target'):
+            target_x = archetype['target_x']
+            target_y = archetype['target_y']
+            step_x = np.where(pinned, target_x - x, step_x)
+            step_y = np.where(pinned, target_y - y, step_y)
+            self.distance_travelled += float(np.hypot(step_x, step_y).sum())
+            x[:] = np.where(pinned, target_x, x + step_x)
+            y[:] = np.where(pinned, target_y, y + step_y)
+        else:
+            step_x[pinned] = 0.0
+            step_y[pinned] = 0.0
+            self.distance_travelled += float(np.hypot(step_x, step_y).sum())
+            x += step_x
+            y += step_y
+
+
+class ExpirySystem(System):
+    """
+    Advances the time of the store by a tick and destroys the entities whose lives ended.
+    The time is kept by this system, so it has to run once per tick. Expiries are rounded
+    up to ticks of `resolution` seconds the same way as in `FoodField`.
+    ___
+
+    ### Arguments
+     - `resolution [float=1/60]`: Length of an expiry tick in seconds.
+    """
+
+    def __init__(self, resolution: float = 1 / 60):
+        System.__init__(self, 'expiry', ('lifetime',))
+        self.resolution = resolution
+
+    def run(self, store: EntityStore, fps: int) -> None:
+        store.time += 1 / fps
+        System.run(self, store, fps)
+
+    def update(self, archetype: Archetype, store: EntityStore, fps: int) -> None:
+        # The tolerances keep the rounding errors of the time sums from delaying an expiry by a tick
+        current_tick = math.floor(store.time / self.resolution + 1e-9)
+        dead = np.ceil(archetype['expires_at'] / self.resolution - 1e-9) <= current_tick
+        if dead.any():
+            store.destroy_many(archetype['id'][dead].tolist())
+
+
+class CollisionSystem(System):
+    """
+    Lets the `feeder` entities eat the `edible` ones they touch. The contacts of every
+    pair of feeder and edible kinds are found in bulk with `circle_contacts()`. Each
+    eaten entity is counted in the `eaten` field of its feeder and destroyed.
+    ___
+
+    ### Arguments
+     - `find_contacts [Callable=circle_contacts]`: Function with the arguments and results of
+       `circle_contacts()`, e.g. `ParallelCollisionDetector.contacts` for very large worlds.
+    """
+
+    def __init__(self, find_contacts: Callable = circle_contacts):
+        System.__init__(self, 'collision', ('position', 'render_style', 'feeder'))
+        self.find_contacts = find_contacts
+        self.contacts = 0
+
+    def update(self, archetype: Archetype, store: EntityStore, fps: int) -> None:
+        for edible in store.query('position', 'render_style', 'edible'):
+            feeders, eaten = self.find_contacts(archetype['x'], archetype['y'], archetype['radius'],
+                                                edible['x'], edible['y'], edible['radius'])
+            if len(eaten):
+                np.add.at(archetype['eaten'], feeders, 1)
+                self.contacts += len(eaten)
+                store.destroy_many(edible['id'][eaten].tolist())
+
+
+class EntityView:
+    """
+    A `Bubble`-like handle to a single entity of an `EntityStore`, for the code that reads
+    a few entities one by one, like `RandomPilot`.
+    ___
+
+    ### Arguments
+     - `store (EntityStore)`: Owner of the entity.
+     - `entity_id (int)`: Id of the entity.
+    """
+
+    __slots__ = ('store', 'entity_id')
+
+    def __init__(self, store: EntityStore, entity_id: int):
+        self.store = store
+        self.entity_id = entity_id
+
+    def _get(self, field: str):
+        archetype = self.store.archetype_of(self.entity_id)
+        return archetype[field][archetype.index_of(self.entity_id)]
+
+    @property
+    def position(self) -> Position:
+        return Position(float(self._get('x')), float(self._get('y')))
+
+    def radius(self) -> int:
+        """
+        ### Returns
+        `int`: Radius of the entity as integer
+        """
+        return int(self._get('radius'))
+
+    def __str__(self):
+        return "EntityView: id={}, kind={}, position={}".format(
+            self.entity_id, self.store.archetype_of(self.entity_id).kind, self.position.as_tuple())
+
+
+class EcsWorld:
+    """
+    `World` on an `EntityStore`. The bubble and the foods are entities, and a tick runs
+    the generation, steering, movement, expiry and collision systems in order, each over
+    whole component arrays. It is a headless simulation, used by `--headless --ecs`; the
+    windowed game, the replays and the server run `World`, which it is checked against.
+
+    New kinds of entities are registered on the `store` with their components, and are
+    picked up by every system whose components they have, without a per-entity call in
+    the loop. Systems are added to the `systems` scheduler.
+    ___
+
+    ### Arguments
+     - `size (Size)`: Size of the world.
+     - `generation_rate [float=1]`: Number of foods to be generated in one second.
+     - `seed [int=None]`: Seed of the food generation. (None) for an unpredictable seed.
+     - `target [Position=None]`: Position that the bubble follows. (None) for the origin.
+     - `profiler [FrameProfiler=None]`: Profiler that times the systems of `step()`.
+       Needs the `generation`, `steering`, `movement`, `expiry` and `collision` phases.
+     - `max_velocity [float=Bubble.DEFAULT_MAX_VELOCITY]`: Max velocity of the bubble.
+     - `easing [float=40]`: Easing coefficent of the bubble's steering.
+     - `collision_workers [int=None]`: Number of worker processes of a `ParallelCollisionDetector`,
+       which reads the component arrays from shared memory, for very large worlds. Ticks with
+       fewer foods than its `min_foods` still find the contacts on this process. (None) to
+       always find them on this process. The world must be closed with `close()` when set.
+    """
+
+    PHASES = ('generation', 'steering', 'movement', 'expiry', 'collision')
+
+    def __init__(self, size: Size, generation_rate: float = 1, seed: int = None,
+                 target: Position = None, profiler=None,
+                 max_velocity: float = Bubble.DEFAULT_MAX_VELOCITY, easing: float = 40,
+                 collision_workers: int = None):
+        self.size = size
+        self.target = target if target is not None else Position(0, 0)
+
+        if collision_workers is not None:
+            # Imported here, so the worlds without workers do not import multiprocessing
+            from parallel_collision import ParallelCollisionDetector, SharedArrayAllocator
+            self.allocator = SharedArrayAllocator()
+            self.collision_detector = ParallelCollisionDetector(size, collision_workers, allocator=self.allocator)
+            find_contacts = self.collision_detector.contacts
+        else:
+            self.allocator = None
+            self.collision_detector = None
+            find_contacts = circle_contacts
+
+        self.store = EntityStore(allocator=self.allocator)
+        self.store.register_kind('food', ('position', 'lifetime', 'render_style', 'edible'))
+        self.store.register_kind('bubble', ('position', 'velocity', 'target', 'pinned', 'render_style', 'feeder'))
+        bubble_x, bubble_y = 400.0, 400.0
+        initial_velocity_x, initial_velocity_y = Velocity(90, 300).axial_motion()
+        self.bubble = EntityView(self.store, self.store.spawn(
+            'bubble', x=bubble_x, y=bubble_y, previous_x=bubble_x, previous_y=bubble_y,
+            velocity_x=initial_velocity_x, velocity_y=initial_velocity_y, max_velocity=max_velocity,
+            radius=Bubble.DEFAULT_SIZE.width // 2, color=Bubble.DEFAULT_COLOR.as_rgba(), visible=True))
+
+        self.food_generator = FoodGenerator(size, generation_rate=generation_rate, generating=True, seed=seed)
+        self.movement = MovementSystem()
+        self.collision = CollisionSystem(find_contacts)
+        self.systems = SystemScheduler((GenerationSystem(self.food_generator), SteeringSystem(easing),
+                                        self.movement, ExpirySystem(), self.collision), profiler)
+        self.tick = 0
+
+    def step(self, fps: int) -> None:
+        """
+        Advances the world by a single tick of `1 / fps` seconds.
+        ___
+
+        ### Arguments
+         - `fps (int)`: The FPS (Frames per Second) value of the simulation
+        """
+        bubbles = self.store.archetypes['bubble']
+        bubbles['target_x'][:] = self.target.x
+        bubbles['target_y'][:] = self.target.y
+        self.systems.run(self.store, fps)
+        self.tick += 1
+
+    def close(self) -> None:
+        """
+        Stops the collision workers and frees the shared memory of the component arrays, if any.
+        """
+        if self.collision_detector is not None:
+            self.collision_detector.close()
+            self.collision_detector = None
+        if self.allocator is not None:
+            self.allocator.close()
+            self.allocator = None
+
+    @property
+    def foods(self) -> Archetype:
+        """
+        `Archetype`: Table of the living foods
+        """
+        return self.store.archetypes['food']
+
+    @property
+    def foods_eaten(self) -> int:
+        """
+        `int`: Number of the foods eaten by the bubbles
+        """
+        return int(self.store.archetypes['bubble']['eaten'].sum())
+
+    @property
+    def distance_travelled(self) -> float:
+        """
+        `float`: Distance travelled by the moving entities
+        """
+        return self.movement.distance_travelled
+
+    def __str__(self):
+        s = "EcsWorld: tick={}, foods={}, foods_eaten={}, distance_travelled={:.1f}"
+        return s.format(self.tick, len(self.foods), self.foods_eaten, self.distance_travelled)
+
+
+def main():
+    """ Created for test purposes """
+    world = EcsWorld(Size(900, 675), generation_rate=20, seed=0)
+    pilot = RandomPilot(0)
+    for _ in range(3600):
+        pilot.update(world)
+        world.step(60)
+    print(world, world.store)
+
+
+if __name__ == '__main__':
+    main()
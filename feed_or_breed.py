@@ -1,88 +1,487 @@
-import pygame
+import argparse
+import time
 
-from target import Target
+import render_backend
 
-from bubble import Bubble
+from target import Target
+from camera import Camera
 
-from food import Food
-from food_generator import FoodGenerator
+from world import RandomPilot, World
+from ecs_world import EcsWorld
+from game_clock import GameClock
+from sprite_cache import SpriteBatch, SpriteCache
+from dirty_renderer import DirtyRectRenderer
+from frame_budget import FrameBudgetController
+from profiler import FrameProfiler, LatencyMeter, ProfilerOverlay
+from replay import Replay, ReplayRecorder, TickInput
+from threaded_simulation import SimulationThread
 
 from position import Position
-from velocity import Velocity
 from color import Color
 from size import Size
 
-from typing import List
-
 SURFACE_SIZE = Size(900, 675)
 BACKGROUND_COLOR = Color(42, 54, 59)
 FPS = 60
+PROFILED_PHASES = ('events', 'generation', 'expiry', 'steering', 'feeding',
+                   'food render', 'bubble render', 'overlay', 'display update')
+THREADED_PHASES = ('events', 'render', 'overlay', 'display update')
+# Ticks skipped by the arrow keys in replays
+SEEK_STEP = FPS * 10
+# Foods farther from the bubble or smaller than these are coarse, redrawn every other frame under load
+COARSE_FOOD_DISTANCE = 300
+COARSE_FOOD_RADIUS = 3
 
-def main():
-    global FPS 
+def scaled_world_size(world_scale: float) -> Size:
+    """
+    ### Returns
+    `Size`: Size of a world `world_scale` times as wide and as high as the screen.
+    """
+    return Size(int(SURFACE_SIZE.width * world_scale), int(SURFACE_SIZE.height * world_scale))
+
+
+def run_interactive(tick_rate: int = FPS, render_fps: int = FPS, profile_path: str = None,
+                    record_path: str = None, replay_path: str = None, seek: int = 0,
+                    world_scale: float = 1, adaptive_quality: bool = True):
+    """
+    Runs the game in a window, the bubble follows the mouse.
+
+    The world can be bigger than the window. A camera follows the bubble, the mouse is
+    converted from screen to world coordinates, and only the foods in the viewport are
+    looked up and drawn.
+
+    The simulation runs at the fixed `tick_rate` regardless of the frame rate, and the
+    frames are rendered with the positions interpolated between the last two ticks.
+    Every phase of the frame is profiled, 'p' toggles the profiler overlay. The latency
+    from a mouse movement to the first presented frame that simulated it is measured.
+
+    When a replay is played, the recorded inputs drive the bubble instead of the mouse,
+    the left and right arrow keys seek by `SEEK_STEP` ticks.
 
+    With `adaptive_quality`, a `FrameBudgetController` lowers the rendering quality while
+    the frames do not fit in the budget of the frame rate, and restores it when they do
+    again. The food generation is not throttled while recording or replaying, since
+    that would change the simulation.
+    ___
+
+    ### Arguments
+     - `tick_rate [int=FPS]`: Simulation ticks per second. Replays use their recorded rate.
+     - `render_fps [int=FPS]`: Upper limit of the rendered frames per second. 0 for no limit.
+     - `profile_path [str=None]`: File to export the profiled frames to on exit, as CSV
+       if it ends with `.csv` and as JSON otherwise. (None) for no export.
+     - `record_path [str=None]`: File to record the session to. (None) for no recording.
+     - `replay_path [str=None]`: Replay file to play instead of the mouse. (None) for the mouse.
+     - `seek [int=0]`: Tick to start the replay from.
+     - `world_scale [float=1]`: Size of the world relative to the window. Replays use their recorded size.
+     - `adaptive_quality [bool=True]`: Whether to trade rendering quality for the frame rate under load.
+    """
+    # pygame is only loaded by the windowed modes, the headless ones run without it
+    pygame = render_backend.load()
     pygame.init()
     clock = pygame.time.Clock()
+    sprite_batch = SpriteBatch(SpriteCache())
     surface = pygame.display.set_mode(SURFACE_SIZE.as_tuple())
     pygame.display.set_caption("Feed or Breed")
 
-    generated_foods: List[Food] = []
-
-    food_generator = FoodGenerator(SURFACE_SIZE, generation_rate=1, generating=True)
+    background = pygame.Surface(SURFACE_SIZE.as_tuple()).convert()
+    background.fill(BACKGROUND_COLOR.as_tuple())
+    renderer = DirtyRectRenderer(surface, background)
 
-    bubble = Bubble(
-        position=Position(400, 400), 
-        velocity=Velocity(90, 300))
+    profiler = FrameProfiler(PROFILED_PHASES)
+    overlay = ProfilerOverlay(profiler)
 
+    # The target is the crosshair on the screen, the world has its own copy in world coordinates
     target = Target(Position(0, 0), visible=False)
+    replay = player = recorder = None
+    if replay_path is not None:
+        replay = Replay(replay_path)
+        tick_rate = replay.fps
+        player = replay.seek(seek, profiler)
+        world = player.world
+        target.visible = player.tick_input.target_visible
+        world.bubble.visible = player.tick_input.bubble_visible
+    else:
+        world = World(scaled_world_size(world_scale), generation_rate=1, profiler=profiler)
+        if record_path is not None:
+            recorder = ReplayRecorder(record_path, world, tick_rate)
+    camera = Camera(SURFACE_SIZE, world.size)
+    game_clock = GameClock(tick_rate)
+    latency = LatencyMeter()
+    input_time = consumed_input_time = None
+    quality = FrameBudgetController(render_fps or FPS) if adaptive_quality else None
+    generation_rate = world.food_generator.generation_rate
+    overlay_refresh_interval = overlay.refresh_interval
 
     terminate = False
     while not terminate:
+        elapsed = clock.tick(render_fps) / 1000
+        frame_start = time.perf_counter()
 
         # Event handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                terminate = True
-            elif event.type == pygame.MOUSEMOTION:
-                target.position.x = event.pos[0]
-                target.position.y = event.pos[1]
-            elif event.type == pygame.KEYDOWN:
-                if event.unicode == 't':
-                    target.visible = not target.visible
-                if event.unicode == 'v':
-                    bubble.visible = not bubble.visible
-
-        surface.fill(BACKGROUND_COLOR.as_tuple())
-
-        food_generator.generate_in_game_loop(generated_foods, FPS)
-        for food in generated_foods:
-            if food.is_alive():
-                food.render(surface, FPS)
-            else:
-                generated_foods.remove(food)
-
-        
-        if target.position.euclidean_distance_to(bubble.position) < bubble.velocity.coefficent / FPS:
-            bubble.position = Position.from_position(target.position)
-            bubble.pinned = True
-        else:
-            bubble.pinned = False
-            bubble.set_velocity_for_target(target.position)
-            bubble.commit_movement(FPS)
-        
-        bubble.render(surface, FPS)
-
-        if target is not None:
-            target.render(surface, FPS)
-        
-        pygame.display.update()
-        clock.tick(FPS) 
+        with profiler.phase('events'):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    terminate = True
+                elif event.type == pygame.MOUSEMOTION and player is None:
+                    target.position.x = event.pos[0]
+                    target.position.y = event.pos[1]
+                    if input_time is None:
+                        input_time = time.perf_counter()
+                elif event.type == pygame.KEYDOWN:
+                    if event.unicode == 't' and player is None:
+                        target.visible = not target.visible
+                    if event.unicode == 'v' and player is None:
+                        world.bubble.visible = not world.bubble.visible
+                    if event.unicode == 'p':
+                        overlay.visible = not overlay.visible
+                    if event.key in (pygame.K_LEFT, pygame.K_RIGHT) and player is not None:
+                        step = SEEK_STEP if event.key == pygame.K_RIGHT else -SEEK_STEP
+                        player = replay.seek(world.tick + step, profiler)
+                        world = player.world
+                        renderer.invalidate()
+
+        for _ in range(game_clock.advance(elapsed)):
+            if player is not None:
+                if not player.step():
+                    break
+                target.visible = player.tick_input.target_visible
+                world.bubble.visible = player.tick_input.bubble_visible
+                continue
+            world.target.set(*camera.screen_to_world(target.position.x, target.position.y))
+            if recorder is not None:
+                recorder.record(TickInput(world.target.x, world.target.y,
+                                          target.visible, world.bubble.visible))
+            world.step(tick_rate)
+            if input_time is not None:
+                consumed_input_time, input_time = input_time, None
+        alpha = game_clock.alpha
+
+        # A scrolled screen is redrawn as a whole
+        if camera.follow(world.bubble.interpolated_position(alpha)):
+            renderer.invalidate()
+        sprite_batch.origin = camera.origin
+        if player is not None:
+            target.position.set(*camera.world_to_screen(world.target.x, world.target.y))
+
+        alternate_coarse_foods = quality is not None and not quality.redraws_coarse_foods(profiler.frames)
+        coarse_foods_kept = renderer.restore(keep_retained=alternate_coarse_foods)
+
+        with profiler.phase('food render'):
+            selected = world.foods.select_visible(camera.viewport())
+            if quality is not None and quality.alternates_coarse_foods:
+                bubble_position = world.bubble.interpolated_position(alpha)
+                selected, coarse = world.foods.split_coarse(selected, bubble_position.x, bubble_position.y,
+                                                            COARSE_FOOD_DISTANCE, COARSE_FOOD_RADIUS)
+                if not coarse_foods_kept:
+                    world.foods.render_sprites(sprite_batch, selected=coarse)
+                    renderer.mark(sprite_batch.flush(surface, return_rects=True), retained=True)
+            world.foods.render_sprites(sprite_batch, selected=selected)
+            renderer.mark(sprite_batch.flush(surface, return_rects=True))
+
+        with profiler.phase('bubble render'):
+            world.bubble.render_sprites(sprite_batch, alpha)
+            renderer.mark(sprite_batch.flush(surface, return_rects=True))
+
+            if target is not None and target.visible:
+                target.render(surface, tick_rate, alpha)
+                renderer.mark((target.bounding_rect(alpha),))
 
+        with profiler.phase('overlay'):
+            overlay_rect = overlay.render(surface)
+            if overlay_rect is not None:
+                renderer.mark((overlay_rect,))
+
+        with profiler.phase('display update'):
+            renderer.present()
+
+        if consumed_input_time is not None:
+            latency.record(time.perf_counter() - consumed_input_time)
+            consumed_input_time = None
+        profiler.end_frame()
+
+        if quality is not None and quality.record(time.perf_counter() - frame_start):
+            sprite_batch.antialiased = quality.antialiasing
+            overlay.refresh_interval = overlay_refresh_interval * quality.overlay_refresh_factor
+            if recorder is None and player is None:
+                world.food_generator.generation_rate = generation_rate * quality.generation_factor
+            # Switching the coarse foods on or off must not leave them erased for a frame
+            renderer.invalidate()
+
+    print("Input to frame latency:", latency)
+    if quality is not None:
+        print(quality)
+    if profile_path is not None:
+        profiler.export(profile_path)
+    if recorder is not None:
+        recorder.close()
+    if replay is not None:
+        replay.close()
 
     pygame.quit()
     quit()
 
 
+def run_threaded(tick_rate: int = FPS, render_fps: int = FPS, profile_path: str = None,
+                 record_path: str = None, world_scale: float = 1):
+    """
+    Runs the game in a window with the simulation on a separate thread.
+
+    The simulation thread ticks at the fixed `tick_rate` and publishes immutable
+    snapshots, the main thread handles the events and draws the latest snapshot, so
+    a slow frame does not delay the simulation and a slow tick does not delay the frame.
+    The latency from a mouse movement to the first presented frame that simulated it is
+    measured like in `run_interactive()`.
+    ___
+
+    ### Arguments
+     - `tick_rate [int=FPS]`: Simulation ticks per second.
+     - `render_fps [int=FPS]`: Upper limit of the rendered frames per second. 0 for no limit.
+     - `profile_path [str=None]`: File to export the profiled frames to on exit, as CSV
+       if it ends with `.csv` and as JSON otherwise. (None) for no export.
+     - `record_path [str=None]`: File to record the session to. (None) for no recording.
+     - `world_scale [float=1]`: Size of the world relative to the window.
+    """
+    pygame = render_backend.load()
+    pygame.init()
+    clock = pygame.time.Clock()
+    sprite_batch = SpriteBatch(SpriteCache())
+    surface = pygame.display.set_mode(SURFACE_SIZE.as_tuple())
+    pygame.display.set_caption("Feed or Breed")
+
+    background = pygame.Surface(SURFACE_SIZE.as_tuple()).convert()
+    background.fill(BACKGROUND_COLOR.as_tuple())
+    renderer = DirtyRectRenderer(surface, background)
+
+    profiler = FrameProfiler(THREADED_PHASES)
+    overlay = ProfilerOverlay(profiler)
+    latency = LatencyMeter()
+
+    world = World(scaled_world_size(world_scale), generation_rate=1)
+    recorder = ReplayRecorder(record_path, world, tick_rate) if record_path is not None else None
+    simulation = SimulationThread(world, tick_rate, recorder)
+    camera = Camera(SURFACE_SIZE, world.size)
+    target = Target(Position(0, 0), visible=False)
+    bubble_visible = True
+    measured_input_time = None
+    submitted_input = None
+
+    simulation.start()
+    terminate = False
+    while not terminate:
+        clock.tick(render_fps)
+        # The world belongs to the simulation thread, only the snapshot is read here
+        snapshot = simulation.snapshot
+
+        with profiler.phase('events'):
+            input_time = None
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    terminate = True
+                elif event.type == pygame.MOUSEMOTION:
+                    target.position.x = event.pos[0]
+                    target.position.y = event.pos[1]
+                    input_time = time.perf_counter()
+                elif event.type == pygame.KEYDOWN:
+                    if event.unicode == 't':
+                        target.visible = not target.visible
+                        input_time = time.perf_counter()
+                    if event.unicode == 'v':
+                        bubble_visible = not bubble_visible
+                        input_time = time.perf_counter()
+                    if event.unicode == 'p':
+                        overlay.visible = not overlay.visible
+
+        alpha = min(1.0, (time.perf_counter() - snapshot.published_at) * tick_rate)
+        bubble_x, bubble_y = snapshot.bubble_position(alpha)
+        if camera.follow(Position(bubble_x, bubble_y)):
+            renderer.invalidate()
+        sprite_batch.origin = camera.origin
+
+        # The crosshair stays on the screen while the camera scrolls, so its world position is
+        # recomputed every frame, like in run_interactive(), and handed over whenever it changes
+        target_x, target_y = camera.screen_to_world(target.position.x, target.position.y)
+        tick_input = TickInput(target_x, target_y, target.visible, bubble_visible)
+        if tick_input != submitted_input:
+            simulation.submit_input(tick_input, input_time)
+            submitted_input = tick_input
+
+        renderer.restore()
+
+        with profiler.phase('render'):
+            snapshot.render_sprites(sprite_batch, alpha, camera.viewport(), bubble_visible)
+            renderer.mark(sprite_batch.flush(surface, return_rects=True))
+            if target.visible:
+                target.render(surface, tick_rate, alpha)
+                renderer.mark((target.bounding_rect(alpha),))
+
+        with profiler.phase('overlay'):
+            overlay_rect = overlay.render(surface)
+            if overlay_rect is not None:
+                renderer.mark((overlay_rect,))
+
+        with profiler.phase('display update'):
+            renderer.present()
+
+        if snapshot.input_time is not None and snapshot.input_time != measured_input_time:
+            latency.record(time.perf_counter() - snapshot.input_time)
+            measured_input_time = snapshot.input_time
+        profiler.end_frame()
+
+    simulation.stop()
+    print("Input to frame latency:", latency)
+    if profile_path is not None:
+        profiler.export(profile_path)
+    if recorder is not None:
+        recorder.close()
+
+    pygame.quit()
+    quit()
+
+
+def run_headless(ticks: int, seed: int = None, fps: int = FPS, record_path: str = None,
+                 world_scale: float = 1, swept_collision: bool = False, ecs: bool = False,
+                 collision_workers: int = None) -> World:
+    """
+    Runs the simulation as fast as possible without a window or a frame limiter.
+    Instead of the mouse, the bubble follows a target that jumps to a random
+    position whenever the bubble gets within its radius.
+    ___
+
+    ### Arguments
+     - `ticks (int)`: Number of simulation ticks.
+     - `seed [int=None]`: Seed of the simulation. (None) for an unpredictable seed.
+     - `fps [int=FPS]`: Simulated ticks per second of game time.
+     - `record_path [str=None]`: File to record the simulation to. (None) for no recording.
+     - `world_scale [float=1]`: Size of the world relative to the screen.
+     - `swept_collision [bool=False]`: Whether to detect the feeding along the movement of the bubble,
+       so low tick rates do not miss the foods that the bubble passes.
+     - `ecs [bool=False]`: Whether to simulate an `EcsWorld`, whose systems update the entities in bulk.
+     - `collision_workers [int=None]`: Number of worker processes that find the contacts of the `EcsWorld`
+       from its component arrays in shared memory. (None) to find them on this process.
+
+    ### Returns
+    `World`: The world at the end of the simulation, an `EcsWorld` with `ecs`.
+
+    ### Raises
+    `ValueError`: If `ecs` is combined with the recording or the swept collision, which need a `World`,
+    or `collision_workers` is given without `ecs`.
+    """
+    pilot = RandomPilot(seed)
+    if ecs:
+        if record_path is not None or swept_collision:
+            raise ValueError("The entity-component world can not be recorded or use the swept collision")
+        world = EcsWorld(scaled_world_size(world_scale), generation_rate=1, seed=seed,
+                         collision_workers=collision_workers)
+    elif collision_workers is not None:
+        raise ValueError("Collision workers need the entity-component world")
+    else:
+        world = World(scaled_world_size(world_scale), generation_rate=1, seed=seed, swept_collision=swept_collision)
+    recorder = ReplayRecorder(record_path, world, fps) if record_path is not None else None
+
+    try:
+        start = time.perf_counter()
+        for _ in range(ticks):
+            pilot.update(world)
+            if recorder is not None:
+                recorder.record(TickInput(world.target.x, world.target.y))
+            world.step(fps)
+        elapsed = time.perf_counter() - start
+        if recorder is not None:
+            recorder.close()
+
+        print("Simulated {} ticks in {:.3f} s ({:.0f} ticks/s)".format(
+            ticks, elapsed, ticks / elapsed if elapsed > 0 else float('inf')))
+        print(world)
+    finally:
+        if ecs:
+            world.close()
+    return world
+
+
+def run_replay_headless(replay_path: str, seek: int = 0) -> World:
+    """
+    Re-simulates a recording from `seek` to its end as fast as possible, to reproduce
+    the performance of a recorded session.
+    ___
+
+    ### Arguments
+     - `replay_path (str)`: Replay file path.
+     - `seek [int=0]`: Tick to start the timed simulation from.
+
+    ### Returns
+    `World`: The world at the end of the recording.
+    """
+    with Replay(replay_path) as replay:
+        start = time.perf_counter()
+        player = replay.seek(seek)
+        seek_time = time.perf_counter() - start
+        first_tick = player.world.tick
+
+        start = time.perf_counter()
+        while player.step():
+            pass
+        elapsed = time.perf_counter() - start
+        ticks = player.world.tick - first_tick
+
+        print(replay)
+        print("Seeked to tick {} in {:.1f} ms".format(first_tick, seek_time * 1e3))
+        print("Simulated {} ticks in {:.3f} s ({:.0f} ticks/s)".format(
+            ticks, elapsed, ticks / elapsed if elapsed > 0 else float('inf')))
+        print(player.world)
+        return player.world
+
+
+def parse_arguments(arguments=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Feed or Breed")
+    parser.add_argument('--headless', action='store_true',
+                        help="run the simulation without a window, as fast as possible")
+    parser.add_argument('--ticks', type=int, default=FPS * 60,
+                        help="number of ticks to simulate in headless mode")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="seed of the simulation")
+    parser.add_argument('--tick-rate', type=int, default=FPS,
+                        help="simulation ticks per second of game time")
+    parser.add_argument('--render-fps', type=int, default=FPS,
+                        help="upper limit of the rendered frames per second, 0 for no limit")
+    parser.add_argument('--profile-out', default=None, metavar='PATH',
+                        help="export the profiled frame phases on exit, to CSV if PATH ends with .csv, to JSON otherwise")
+    parser.add_argument('--threaded', action='store_true',
+                        help="run the simulation on its own thread, separately from the rendering")
+    parser.add_argument('--world-scale', type=float, default=1,
+                        help="size of the world relative to the window (default: 1)")
+    parser.add_argument('--record', default=None, metavar='PATH',
+                        help="record the session to a replay file")
+    parser.add_argument('--replay', default=None, metavar='PATH',
+                        help="play a replay file, re-simulated as fast as possible with --headless")
+    parser.add_argument('--seek', type=int, default=0, metavar='TICK',
+                        help="tick to start the replay from")
+    parser.add_argument('--swept-collision', action='store_true',
+                        help="with --headless, detect the feeding along the movement of the bubble, for low tick rates")
+    parser.add_argument('--ecs', action='store_true',
+                        help="with --headless, simulate the world on the entity-component store")
+    parser.add_argument('--collision-workers', type=int, default=None, metavar='N',
+                        help="with --ecs, find the contacts on N worker processes over shared memory; only pays "
+                             "off in worlds of hundreds of thousands of foods, smaller ones stay on this process")
+    parser.add_argument('--fixed-quality', action='store_true',
+                        help="keep the full rendering quality even when the frames take too long")
+    return parser.parse_args(arguments)
+
+
+def main():
+    arguments = parse_arguments()
+    if arguments.headless and arguments.replay:
+        run_replay_headless(arguments.replay, arguments.seek)
+    elif arguments.headless:
+        run_headless(arguments.ticks, arguments.seed, arguments.tick_rate, arguments.record,
+                     arguments.world_scale, arguments.swept_collision, arguments.ecs, arguments.collision_workers)
+    elif arguments.threaded:
+        run_threaded(arguments.tick_rate, arguments.render_fps, arguments.profile_out, arguments.record,
+                     arguments.world_scale)
+    else:
+        run_interactive(arguments.tick_rate, arguments.render_fps, arguments.profile_out,
+                        arguments.record, arguments.replay, arguments.seek, arguments.world_scale,
+                        not arguments.fixed_quality)
+
+
 if __name__ == '__main__':
     main()
-
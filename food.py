@@ -1,11 +1,14 @@
-import pygame
-from pygame import gfxdraw
+from typing import TYPE_CHECKING
 
+import render_backend
 from size import Size
 from position import Position
 from color import Color
 from renderable import Renderable
 
+if TYPE_CHECKING:
+    import pygame
+
 
 class Food(Renderable):
     """
@@ -18,11 +21,17 @@ class Food(Renderable):
      - `color (Color=Color(250,250,250))`: Color of the food.
     """
 
+    __slots__ = ('visible', 'size', 'position', 'color', 'remaining_life')
+
     # Food existence length in seconds
     EXISTENCE_LENGTH = 5.0
 
-    def __init__(self, position: Position, size: Size = Size(10, 10),
-                 color: Color = Color(153, 184, 152, 255)):
+    # Default values
+    DEFAULT_SIZE: Size = Size(10, 10)
+    DEFAULT_COLOR: Color = Color(153, 184, 152, 255)
+
+    def __init__(self, position: Position, size: Size = DEFAULT_SIZE,
+                 color: Color = DEFAULT_COLOR):
         Renderable.__init__(self)
 
         self.size = size
@@ -30,7 +39,7 @@ class Food(Renderable):
         self.color = color
         self.remaining_life = self.EXISTENCE_LENGTH
 
-    def _draw(self, surface: pygame.surface.Surface, fps: int):
+    def _draw(self, surface: 'pygame.surface.Surface', fps: int, alpha: float):
         """
         Renders the food considering the FPS value.
         ___
@@ -38,12 +47,62 @@ class Food(Renderable):
         ### Arguments
          - `surface (pygame.surface.Surface)`: PyGame surface that the food will be drawn on.
          - `fps`: The FPS (Frames per Second) value of the game
+         - `alpha`: Fraction of a simulation tick to interpolate with. Foods do not move.
         """
+        gfxdraw = render_backend.gfxdraw()
         gfxdraw.aacircle(surface, self.position.x, self.position.y,
                          self.radius(), self.color.as_tuple())
         gfxdraw.filled_circle(
             surface, self.position.x, self.position.y, self.radius(), self.color.as_tuple())
-        self.remaining_life -= 1 / fps
+
+    def reset(self, x: float, y: float) -> None:
+        """
+        Re-initializes a released food in place as a new food at (`x`, `y`) with the
+        default size and color, e.g. after taking it from a `FoodPool`.
+        ___
+
+        ### Arguments
+         - `x (float)`: Location in X axis.
+         - `y (float)`: Location in Y axis.
+        """
+        self.position.set(x, y)
+        self.size = self.DEFAULT_SIZE
+        self.color = self.DEFAULT_COLOR
+        self.remaining_life = self.EXISTENCE_LENGTH
+        self.visible = True
+
+    def age(self, elapsed: float) -> None:
+        """
+        Shortens the remaining life of the food. Drawing does not age the food,
+        the container of the food is responsible for it.
+        ___
+
+        ### Arguments
+         - `elapsed (float)`: Elapsed time in seconds.
+        """
+        self.remaining_life -= elapsed
+
+    def _add_sprites(self, sprite_batch, alpha: float):
+        """
+        Queues the sprite of the food.
+        ___
+
+        ### Arguments
+         - `sprite_batch (SpriteBatch)`: Batch that will draw the food.
+         - `alpha`: Fraction of a simulation tick to interpolate with. Foods do not move.
+        """
+        sprite_batch.add_circle(int(self.position.x), int(self.position.y),
+                                self.radius(), self.color.as_tuple())
+
+    def bounding_rect(self, alpha: float = 1.0) -> 'pygame.Rect':
+        """
+        ### Returns
+        `pygame.Rect`: Rectangle that covers the drawn food
+        """
+        radius = self.radius()
+        Rect = render_backend.load().Rect
+        return Rect(int(self.position.x) - radius, int(self.position.y) - radius,
+                    2 * radius + 2, 2 * radius + 2)
 
     def is_alive(self) -> bool:
         """
@@ -0,0 +1,583 @@
+import math
+from typing import TYPE_CHECKING, Dict, Iterator, Tuple
+
+import numpy as np
+
+import render_backend
+from color import Color
+from food import Food
+from food_pool import FoodPool
+from position import Position
+from scheduler import ExpiryScheduler
+from size import Size
+from spatial_grid import SpatialGrid
+from sprite_cache import SpriteBatch
+
+if TYPE_CHECKING:
+    import pygame
+
+
+class FoodView:
+    """
+    A `Food`-like handle to a single food stored in a `FoodField`.
+
+    Views are cheap and created on demand. Two views of the same food are equal,
+    so a view can be used as a dictionary key or a `SpatialGrid` item.
+
+    The views in the `food_grid` of a field are pooled. When their food is removed, their
+    `food_id` becomes -1, so they are no longer alive nor equal to any other view, until
+    they are reused for a new food. The views returned by `FoodField.add()` are not pooled.
+    ___
+
+    ### Arguments
+     - `field (FoodField)`: Owner of the food.
+     - `food_id (int)`: Stable identifier of the food in the `field`.
+    """
+
+    __slots__ = ('field', 'food_id')
+
+    def __init__(self, field: 'FoodField', food_id: int):
+        self.field = field
+        self.food_id = food_id
+
+    @property
+    def _index(self) -> int:
+        return self.field._index_of[self.food_id]
+
+    @property
+    def position(self) -> Position:
+        index = self._index
+        return Position(float(self.field._x[index]), float(self.field._y[index]))
+
+    @property
+    def size(self) -> Size:
+        diameter = int(self.field._radius[self._index]) * 2
+        return Size(diameter, diameter)
+
+    @property
+    def color(self) -> Color:
+        return Color(*(int(channel) for channel in self.field._color[self._index]))
+
+    @property
+    def remaining_life(self) -> float:
+        return float(self.field._expires_at[self._index]) - self.field.time
+
+    @remaining_life.setter
+    def remaining_life(self, value: float):
+        self.field._set_expiry(self.food_id, self.field.time + value)
+
+    @property
+    def visible(self) -> bool:
+        return bool(self.field._visible[self._index])
+
+    @visible.setter
+    def visible(self, value: bool):
+        self.field._visible[self._index] = value
+
+    def radius(self) -> int:
+        """
+        ### Returns
+        `int`: Radius of the food as integer
+        """
+        return int(self.field._radius[self._index])
+
+    def is_alive(self) -> bool:
+        """
+        ### Returns
+        `bool`: Whether the food is still stored in its field with remaining life
+        """
+        index = self.field._index_of.get(self.food_id)
+        return index is not None and bool(self.field._expires_at[index] > self.field.time)
+
+    def render(self, surface: 'pygame.surface.Surface', fps: int, alpha: float = 1.0) -> None:
+        """
+        Draws the food if it is visible. Unlike `Food.render`, this does not age
+        the food, `FoodField.expire` does that for every food at once.
+        ___
+
+        ### Arguments
+         - `surface (pygame.surface.Surface)`: PyGame surface that the food will be drawn on.
+         - `fps (int)`: The FPS (Frames per Second) value of the game
+         - `alpha [float=1.0]`: Fraction of a simulation tick to interpolate with. Foods do not move.
+        """
+        field = self.field
+        index = self._index
+        if not field._visible[index]:
+            return
+        x = int(field._x[index])
+        y = int(field._y[index])
+        radius = int(field._radius[index])
+        color = tuple(int(channel) for channel in field._color[index])
+        gfxdraw = render_backend.gfxdraw()
+        gfxdraw.aacircle(surface, x, y, radius, color)
+        gfxdraw.filled_circle(surface, x, y, radius, color)
+
+    def render_sprites(self, sprite_batch: SpriteBatch, alpha: float = 1.0) -> None:
+        """
+        Queues the sprite of the food if it is visible.
+        ___
+
+        ### Arguments
+         - `sprite_batch (SpriteBatch)`: Batch that will draw the food.
+         - `alpha [float=1.0]`: Fraction of a simulation tick to interpolate with. Foods do not move.
+        """
+        field = self.field
+        index = self._index
+        if field._visible[index]:
+            sprite_batch.add_circle(int(field._x[index]), int(field._y[index]), int(field._radius[index]),
+                                    tuple(int(channel) for channel in field._color[index]))
+
+    def bounding_rect(self, alpha: float = 1.0) -> 'pygame.Rect':
+        """
+        ### Returns
+        `pygame.Rect`: Rectangle that covers the drawn food
+        """
+        field = self.field
+        index = self._index
+        radius = int(field._radius[index])
+        Rect = render_backend.load().Rect
+        return Rect(int(field._x[index]) - radius, int(field._y[index]) - radius,
+                    2 * radius + 2, 2 * radius + 2)
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        return (isinstance(other, FoodView) and other.field is self.field and other.food_id == self.food_id
+                and self.food_id >= 0)
+
+    def __hash__(self):
+        return hash(self.food_id)
+
+    def __str__(self):
+        s = "FoodView: id={}, position={}, size={}, color={}, remaining_life={}, visible={}"
+        return s.format(self.food_id,
+                        self.position.as_tuple(),
+                        self.size.as_tuple(),
+                        self.color.as_tuple(),
+                        self.remaining_life,
+                        self.visible)
+
+
+class FoodField:
+    """
+    Struct-of-arrays container of the living foods.
+
+    Positions, radii, colors and expiry times are stored in contiguous NumPy arrays.
+    Removal swaps the last food into the freed slot, so the arrays stay dense and the
+    order of the foods is not preserved. Iterating over the field yields `FoodView`s,
+    so the field can be used in place of a `List[Food]` bucket.
+
+    Lifetimes are kept by an `ExpiryScheduler`, independent of rendering, so expiring
+    the dead foods costs O(expired) instead of touching every living food.
+
+    The views stored in the `food_grid` come from a `FoodPool` and are recycled once their
+    food is removed, so `add_many()` and `expire()` do not allocate views; `add()` still
+    returns a new view, which the caller may keep. A view returned by a grid query is
+    invalidated when its food is removed and may later stand for another food, so it must
+    not be kept across ticks, keep its `food_id` instead.
+
+    `version` is incremented whenever foods are added or removed, so indexes built over
+    the positions, like a `KDTree`, know when to be rebuilt.
+    ___
+
+    ### Arguments
+     - `capacity [int=64]`: Initial number of slots. The arrays grow when needed.
+     - `food_grid [SpatialGrid=None]`: Spatial index that is kept in sync with the field.
+     - `resolution [float=1/60]`: Length of a scheduler tick in seconds. Expiries are rounded up to it.
+     - `view_pool_size [int=4096]`: Most released grid views kept for reuse. (0) for no pooling.
+    """
+
+    def __init__(self, capacity: int = 64, food_grid: SpatialGrid = None, resolution: float = 1 / 60,
+                 view_pool_size: int = 4096):
+        self.food_grid = food_grid
+        self.resolution = resolution
+        self.time = 0.0
+        self.scheduler = ExpiryScheduler()
+        self.view_pool = FoodPool(lambda: FoodView(self, -1), view_pool_size)
+        self.version = 0
+        self._count = 0
+        self._next_id = 0
+        self._index_of: Dict[int, int] = {}
+        self._grid_views: Dict[int, FoodView] = {}
+        self._allocate(max(1, capacity))
+
+    def _allocate(self, capacity: int) -> None:
+        count = self._count
+        arrays = {
+            '_x': np.zeros(capacity, dtype=np.float64),
+            '_y': np.zeros(capacity, dtype=np.float64),
+            '_radius': np.zeros(capacity, dtype=np.int32),
+            '_color': np.zeros((capacity, 4), dtype=np.uint8),
+            '_expires_at': np.zeros(capacity, dtype=np.float64),
+            '_visible': np.zeros(capacity, dtype=np.bool_),
+            '_ids': np.zeros(capacity, dtype=np.int64),
+        }
+        for name, array in arrays.items():
+            if count:
+                array[:count] = getattr(self, name)[:count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def add(self, position: Position, radius: int, color: Color,
+            remaining_life: float = Food.EXISTENCE_LENGTH, visible: bool = True) -> FoodView:
+        """
+        Stores a new food in the field.
+        ___
+
+        ### Arguments
+         - `position (Position)`: Position of the food.
+         - `radius (int)`: Radius of the food.
+         - `color (Color)`: Color of the food.
+         - `remaining_life [float=Food.EXISTENCE_LENGTH]`: Life of the food in seconds.
+         - `visible [bool=True]`: Visibility of the food.
+
+        ### Returns
+        `FoodView`: View of the stored food.
+        """
+        if self._count == self.capacity:
+            self._allocate(self.capacity * 2)
+
+        index = self._count
+        food_id = self._next_id
+        self._next_id += 1
+
+        self._x[index] = position.x
+        self._y[index] = position.y
+        self._radius[index] = radius
+        self._color[index] = color.as_rgba()
+        self._expires_at[index] = self.time + remaining_life
+        self._visible[index] = visible
+        self._ids[index] = food_id
+        self._index_of[food_id] = index
+        self._count += 1
+        self.version += 1
+        self.scheduler.schedule(food_id, self._expiry_tick(self.time + remaining_life))
+
+        if self.food_grid is not None:
+            self.food_grid.insert(self._acquire_view(food_id), position, radius)
+        return FoodView(self, food_id)
+
+    def add_many(self, xs: np.ndarray, ys: np.ndarray, radius: int, color: Color,
+                 remaining_life: float = Food.EXISTENCE_LENGTH) -> None:
+        """
+        Stores many foods with the same radius, color and life at once.
+        ___
+
+        ### Arguments
+         - `xs (numpy.ndarray)`: X coordinates of the foods.
+         - `ys (numpy.ndarray)`: Y coordinates of the foods.
+         - `radius (int)`: Radius of the foods.
+         - `color (Color)`: Color of the foods.
+         - `remaining_life [float=Food.EXISTENCE_LENGTH]`: Life of the foods in seconds.
+        """
+        n_foods = len(xs)
+        start = self._count
+        end = start + n_foods
+        if end > self.capacity:
+            capacity = self.capacity
+            while capacity < end:
+                capacity *= 2
+            self._allocate(capacity)
+
+        food_ids = np.arange(self._next_id, self._next_id + n_foods, dtype=np.int64)
+        self._next_id += n_foods
+
+        self._x[start:end] = xs
+        self._y[start:end] = ys
+        self._radius[start:end] = radius
+        self._color[start:end] = color.as_rgba()
+        self._expires_at[start:end] = self.time + remaining_life
+        self._visible[start:end] = True
+        self._ids[start:end] = food_ids
+        self._index_of.update(zip(food_ids.tolist(), range(start, end)))
+        self._count = end
+        self.version += 1
+        self.scheduler.schedule_many(food_ids.tolist(), self._expiry_tick(self.time + remaining_life))
+
+        if self.food_grid is not None:
+            for food_id, x, y in zip(food_ids.tolist(), self._x[start:end].tolist(), self._y[start:end].tolist()):
+                self.food_grid.insert_point(self._acquire_view(food_id), x, y, radius)
+
+    def append(self, food: Food) -> FoodView:
+        """
+        Copies a `Food` object into the field, so the field can be used as a food bucket.
+        ___
+
+        ### Arguments
+         - `food (Food)`: Food to be stored.
+
+        ### Returns
+        `FoodView`: View of the stored food.
+        """
+        return self.add(food.position, food.radius(), food.color, food.remaining_life, food.visible)
+
+    def remove(self, food: FoodView) -> None:
+        """
+        Removes the food by moving the last food into its slot.
+        ___
+
+        ### Arguments
+         - `food (FoodView)`: Food to be removed.
+
+        ### Raises
+        `ValueError`: If the food is not stored in the field.
+        """
+        if food.field is not self or food.food_id not in self._index_of:
+            raise ValueError("{} is not in the field".format(food))
+        index = self._index_of.pop(food.food_id)
+        last = self._count - 1
+        if index != last:
+            self._move(last, index)
+        self._count = last
+        self.version += 1
+        self.scheduler.cancel(food.food_id)
+        if self.food_grid is not None:
+            self._release_view(food.food_id)
+
+    def _acquire_view(self, food_id: int) -> FoodView:
+        view = self.view_pool.acquire()
+        view.food_id = food_id
+        self._grid_views[food_id] = view
+        return view
+
+    def _release_view(self, food_id: int) -> None:
+        view = self._grid_views.pop(food_id)
+        self.food_grid.remove(view)
+        # Invalidated, so a view kept by mistake is not alive instead of standing for the next food
+        view.food_id = -1
+        self.view_pool.release(view)
+
+    def _expiry_tick(self, expires_at: float) -> int:
+        # The tolerance keeps the rounding errors of the time sums from delaying an expiry by a tick
+        return math.ceil(expires_at / self.resolution - 1e-9)
+
+    def _set_expiry(self, food_id: int, expires_at: float) -> None:
+        self._expires_at[self._index_of[food_id]] = expires_at
+        self.scheduler.schedule(food_id, self._expiry_tick(expires_at))
+
+    def _move(self, source: int, destination: int) -> None:
+        self._x[destination] = self._x[source]
+        self._y[destination] = self._y[source]
+        self._radius[destination] = self._radius[source]
+        self._color[destination] = self._color[source]
+        self._expires_at[destination] = self._expires_at[source]
+        self._visible[destination] = self._visible[source]
+        moved_id = int(self._ids[source])
+        self._ids[destination] = moved_id
+        self._index_of[moved_id] = destination
+
+    def expire(self, elapsed: float) -> int:
+        """
+        Advances the time of the field by `elapsed` seconds and removes the foods whose
+        lives ended. Only the expired foods are touched. Their slots in the kept range are
+        filled by the living foods from the tail in a single batched swap-and-pop.
+        ___
+
+        ### Arguments
+         - `elapsed (float)`: Elapsed time in seconds.
+
+        ### Returns
+        `int`: Number of removed foods.
+        """
+        self.time += elapsed
+        dead_ids = self.scheduler.advance(math.floor(self.time / self.resolution + 1e-9))
+        n_dead = len(dead_ids)
+        if n_dead == 0:
+            return 0
+
+        index_of = self._index_of
+        dead = np.sort(np.fromiter((index_of[food_id] for food_id in dead_ids), dtype=np.int64, count=n_dead))
+        count = self._count
+        kept = count - n_dead
+        holes = dead[dead < kept]
+        movers = np.setdiff1d(np.arange(kept, count), dead[dead >= kept], assume_unique=True)
+
+        for name in self.STATE_ARRAYS:
+            array = getattr(self, name)
+            array[holes] = array[movers]
+
+        for food_id in dead_ids:
+            del index_of[food_id]
+        for index, food_id in zip(holes.tolist(), self._ids[holes].tolist()):
+            index_of[food_id] = index
+        self._count = kept
+        self.version += 1
+
+        if self.food_grid is not None:
+            for food_id in dead_ids:
+                self._release_view(food_id)
+        return n_dead
+
+    def render_sprites(self, sprite_batch: SpriteBatch, viewport: Tuple[float, float, float, float] = None,
+                       selected: np.ndarray = None) -> None:
+        """
+        Queues the sprites of every visible food into `sprite_batch`, reading the arrays
+        directly instead of going through the views.
+
+        With a `viewport`, only the foods in it are queued. They are looked up in the
+        spatial index if the field has one, so the cost depends on the foods on screen
+        instead of all the foods in the world.
+        ___
+
+        ### Arguments
+         - `sprite_batch (SpriteBatch)`: Batch that will draw the foods.
+         - `viewport [tuple (left, top, right, bottom)=None]`: Drawn area of the world. (None) for everywhere.
+         - `selected [numpy.ndarray=None]`: Indices of the foods to be queued, e.g. from `select_visible()`,
+           instead of the foods in the `viewport`.
+        """
+        if selected is None:
+            selected = self.select_visible(viewport)
+        sprite_batch.add_circles(self._x[selected], self._y[selected], self._radius[selected], self._color[selected])
+
+    def select_visible(self, viewport: Tuple[float, float, float, float] = None) -> np.ndarray:
+        """
+        ### Arguments
+         - `viewport [tuple (left, top, right, bottom)=None]`: Area of the world. (None) for everywhere.
+
+        ### Returns
+        `numpy.ndarray`: Sorted indices of the visible foods in the `viewport`.
+        """
+        count = self._count
+        if viewport is None:
+            selected = np.flatnonzero(self._visible[:count])
+        elif self.food_grid is not None:
+            index_of = self._index_of
+            selected = np.fromiter((index_of[food.food_id] for food, _, _, _ in self.food_grid.query_rect(*viewport)
+                                    if isinstance(food, FoodView) and food.field is self), dtype=np.int64)
+            # Sorted, so overlapping foods are drawn in the same order as without a viewport
+            selected = np.sort(selected[self._visible[selected]])
+        else:
+            left, top, right, bottom = viewport
+            x = self._x[:count]
+            y = self._y[:count]
+            radius = self._radius[:count]
+            selected = np.flatnonzero(self._visible[:count] & (x + radius >= left) & (x - radius <= right)
+                                      & (y + radius >= top) & (y - radius <= bottom))
+        return selected
+
+    def split_coarse(self, selected: np.ndarray, x: float, y: float, distance: float,
+                     min_radius: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Splits the selected foods into the fine ones and the coarse ones, which are either
+        smaller than `min_radius` or farther than `distance` from (`x`, `y`).
+        ___
+
+        ### Arguments
+         - `selected (numpy.ndarray)`: Indices of the foods, e.g. from `select_visible()`.
+         - `x (float)`: Center of the fine area in X axis, e.g. the position of the bubble.
+         - `y (float)`: Center of the fine area in Y axis.
+         - `distance (float)`: Radius of the fine area.
+         - `min_radius [int=0]`: Smallest radius of a fine food.
+
+        ### Returns
+        `tuple (numpy.ndarray, numpy.ndarray)`: Indices of the fine and of the coarse foods, in the order of `selected`.
+        """
+        diff_x = self._x[selected] - x
+        diff_y = self._y[selected] - y
+        coarse = (diff_x * diff_x + diff_y * diff_y > distance * distance) | (self._radius[selected] < min_radius)
+        return selected[~coarse], selected[coarse]
+
+    def visible_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        ### Returns
+        `tuple (numpy.ndarray, ...)`: Copies of the x, y, radius and color arrays of the visible foods.
+        """
+        selected = np.flatnonzero(self._visible[:self._count])
+        return self._x[selected], self._y[selected], self._radius[selected], self._color[selected]
+
+    def positions(self) -> np.ndarray:
+        """
+        ### Returns
+        `numpy.ndarray`: (N, 2) array of the food positions. Modifying it does not move the foods.
+        """
+        return np.column_stack((self._x[:self._count], self._y[:self._count]))
+
+    def ids(self) -> np.ndarray:
+        """
+        ### Returns
+        `numpy.ndarray`: Read-only view of the food ids, in the order of `positions()`.
+        """
+        ids = self._ids[:self._count]
+        ids.flags.writeable = False
+        return ids
+
+    def radii(self) -> np.ndarray:
+        """
+        ### Returns
+        `numpy.ndarray`: Read-only view of the food radii.
+        """
+        radii = self._radius[:self._count]
+        radii.flags.writeable = False
+        return radii
+
+    STATE_ARRAYS = ('_x', '_y', '_radius', '_color', '_expires_at', '_visible', '_ids')
+
+    def state(self) -> dict:
+        """
+        ### Returns
+        `dict`: Copy of the foods and the time of the field, for `restore()`.
+        """
+        state = {name.lstrip('_'): getattr(self, name)[:self._count].copy() for name in self.STATE_ARRAYS}
+        state.update({'time': self.time, 'next_id': self._next_id})
+        return state
+
+    def restore(self, state: dict) -> None:
+        """
+        Replaces the foods and the time of the field with a `state()`. The expiry schedule,
+        the id lookup and the spatial index are rebuilt from the arrays.
+        ___
+
+        ### Arguments
+         - `state (dict)`: State returned by `state()`.
+        """
+        if self.food_grid is not None:
+            for food_id in self._ids[:self._count].tolist():
+                self._release_view(food_id)
+
+        count = len(state['ids'])
+        self._count = 0
+        self._allocate(max(1, count, self.capacity))
+        for name in self.STATE_ARRAYS:
+            getattr(self, name)[:count] = state[name.lstrip('_')]
+        self._count = count
+        self.version += 1
+        self._next_id = state['next_id']
+        self.time = state['time']
+
+        food_ids = self._ids[:count].tolist()
+        self._index_of = dict(zip(food_ids, range(count)))
+        self.scheduler = ExpiryScheduler(math.floor(self.time / self.resolution + 1e-9))
+        for food_id, expires_at in zip(food_ids, self._expires_at[:count].tolist()):
+            self.scheduler.schedule(food_id, self._expiry_tick(expires_at))
+        if self.food_grid is not None:
+            for food_id, x, y, radius in zip(food_ids, self._x[:count].tolist(), self._y[:count].tolist(),
+                                             self._radius[:count].tolist()):
+                self.food_grid.insert_point(self._acquire_view(food_id), x, y, radius)
+
+    def __iter__(self) -> Iterator[FoodView]:
+        # Iterate over a copy of the ids, so foods can be removed while iterating
+        for food_id in self._ids[:self._count].tolist():
+            yield FoodView(self, food_id)
+
+    def __contains__(self, food: FoodView) -> bool:
+        return isinstance(food, FoodView) and food.field is self and food.food_id in self._index_of
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __str__(self):
+        return "FoodField: count={}, capacity={}".format(self._count, self.capacity)
+
+
+def main():
+    """ Created for test purposes """
+    field = FoodField(capacity=2)
+    for x in range(4):
+        field.append(Food(Position(x, x)))
+    field.remove(next(iter(field)))
+    print(field, [str(food) for food in field])
+    print(field.expire(Food.EXISTENCE_LENGTH), field)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,30 +1,182 @@
-import random
+import numpy as np
 
 import factor as f
 
 from food import Food
+from food_field import FoodField
+from food_pool import FoodPool
 from size import Size
 from position import Position
+from spatial_grid import SpatialGrid
 
-from typing import List
+from typing import Callable, List, Tuple, Union
+
+
+def uniform_distribution(rng: np.random.Generator, n_foods: int, surface_size: Size) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Spawns the foods anywhere on the surface with equal probability.
+    ___
+
+    ### Arguments
+     - `rng (numpy.random.Generator)`: Random number generator.
+     - `n_foods (int)`: Number of positions.
+     - `surface_size (Size)`: Size of the surface.
+
+    ### Returns
+    `tuple (numpy.ndarray, numpy.ndarray)`: Integer X and Y coordinates.
+    """
+    xs = rng.integers(0, surface_size.width, size=n_foods)
+    ys = rng.integers(0, surface_size.height, size=n_foods)
+    return xs, ys
+
+
+def gaussian_distribution(rng: np.random.Generator, n_foods: int, surface_size: Size,
+                          spread: float = 0.15) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Spawns the foods around the center of the surface, clipped to the surface.
+    ___
+
+    ### Arguments
+     - `rng (numpy.random.Generator)`: Random number generator.
+     - `n_foods (int)`: Number of positions.
+     - `surface_size (Size)`: Size of the surface.
+     - `spread [float=0.15]`: Standard deviation as a fraction of the surface size.
+
+    ### Returns
+    `tuple (numpy.ndarray, numpy.ndarray)`: Integer X and Y coordinates.
+    """
+    width, height = surface_size.as_tuple()
+    xs = rng.normal(width / 2, width * spread, size=n_foods)
+    ys = rng.normal(height / 2, height * spread, size=n_foods)
+    return (np.clip(xs, 0, width - 1).astype(np.int64),
+            np.clip(ys, 0, height - 1).astype(np.int64))
+
+
+def edge_distribution(rng: np.random.Generator, n_foods: int, surface_size: Size,
+                      margin: float = 0.1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Spawns the foods in a band along the edges of the surface.
+    ___
+
+    ### Arguments
+     - `rng (numpy.random.Generator)`: Random number generator.
+     - `n_foods (int)`: Number of positions.
+     - `surface_size (Size)`: Size of the surface.
+     - `margin [float=0.1]`: Width of the band as a fraction of the smaller surface edge.
+
+    ### Returns
+    `tuple (numpy.ndarray, numpy.ndarray)`: Integer X and Y coordinates.
+    """
+    width, height = surface_size.as_tuple()
+    band = max(1, int(min(width, height) * margin))
+    xs, ys = uniform_distribution(rng, n_foods, surface_size)
+    offsets = rng.integers(0, band, size=n_foods)
+    edges = rng.integers(0, 4, size=n_foods)
+    xs = np.where(edges == 0, offsets, np.where(edges == 1, width - 1 - offsets, xs))
+    ys = np.where(edges == 2, offsets, np.where(edges == 3, height - 1 - offsets, ys))
+    return xs, ys
+
+
+SpawnDistribution = Callable[[np.random.Generator, int, Size], Tuple[np.ndarray, np.ndarray]]
+
+SPAWN_DISTRIBUTIONS = {
+    'uniform': uniform_distribution,
+    'gaussian': gaussian_distribution,
+    'edges': edge_distribution,
+}
 
 
 class FoodGenerator:
     """
     Class for generating random foods manually and automatically.
+
+    Positions are drawn from a seeded NumPy `Generator` in batches of `BATCH_SIZE` and
+    consumed in order, so two generators with the same seed produce the same foods.
     ___
 
     ### Arguments
      - `surface_size (Size)`: Size of the pygame surface object.
      - `generation_rate [float=1]`: Number of foods to be generated in one second.
      - `generating [bool=False]`: On/off switch for generating foods.
+     - `food_grid [SpatialGrid=None]`: Spatial index that the generated foods are inserted into.
+     - `seed [int=None]`: Seed of the random food positions. (None) for an unpredictable seed.
+     - `distribution [str or SpawnDistribution='uniform']`: Name of one of the `SPAWN_DISTRIBUTIONS`,
+       or a function with the same signature as `uniform_distribution`.
+     - `food_pool [FoodPool=None]`: Pool that the `Food` objects are taken from. The owner of the
+       foods releases them back to it once they are eaten or expired. (None) for new objects.
     """
 
-    def __init__(self, surface_size: Size, generation_rate: float = 1, generating: bool = False):
+    # Number of positions drawn from the random number generator at once
+    BATCH_SIZE = 1024
+
+    def __init__(self, surface_size: Size, generation_rate: float = 1, generating: bool = False,
+                 food_grid: SpatialGrid = None, seed: int = None,
+                 distribution: Union[str, SpawnDistribution] = 'uniform', food_pool: FoodPool = None):
         self.surface_size = surface_size
         self.generation_rate = generation_rate
         self.generating = generating
-        self.frame_counter = 0
+        self.food_grid = food_grid
+        self.seed = seed
+        self.random = np.random.default_rng(seed)
+        if isinstance(distribution, str):
+            distribution = SPAWN_DISTRIBUTIONS[distribution]
+        self.distribution = distribution
+        self.food_pool = food_pool
+        self.pending_foods = 0.0
+        self._buffered_xs = np.empty(0, dtype=np.int64)
+        self._buffered_ys = np.empty(0, dtype=np.int64)
+        self._buffer_index = 0
+
+    def generate_positions(self, n_foods: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Takes the positions of the next `n_foods` foods from the buffer, refilling it
+        with a new batch when needed.
+        ___
+
+        ### Arguments
+         - `n_foods (int)`: Number of positions.
+
+        ### Returns
+        `tuple (numpy.ndarray, numpy.ndarray)`: Integer X and Y coordinates.
+        """
+        start = self._buffer_index
+        if start + n_foods > len(self._buffered_xs):
+            xs, ys = self.distribution(self.random, max(n_foods, self.BATCH_SIZE), self.surface_size)
+            self._buffered_xs = np.concatenate((self._buffered_xs[start:], xs))
+            self._buffered_ys = np.concatenate((self._buffered_ys[start:], ys))
+            start = 0
+        self._buffer_index = start + n_foods
+        return self._buffered_xs[start:start + n_foods], self._buffered_ys[start:start + n_foods]
+
+    def state(self) -> dict:
+        """
+        ### Returns
+        `dict`: State of the random number generator, the unused buffered positions and
+        the pending foods, for `restore()`.
+        """
+        start = self._buffer_index
+        return {
+            'random': self.random.bit_generator.state,
+            'buffered_xs': self._buffered_xs[start:].copy(),
+            'buffered_ys': self._buffered_ys[start:].copy(),
+            'pending_foods': self.pending_foods,
+            'generating': self.generating,
+        }
+
+    def restore(self, state: dict) -> None:
+        """
+        Continues the food stream from a `state()`, so the same foods are generated again.
+        ___
+
+        ### Arguments
+         - `state (dict)`: State returned by `state()`.
+        """
+        self.random.bit_generator.state = state['random']
+        self._buffered_xs = np.asarray(state['buffered_xs'], dtype=np.int64)
+        self._buffered_ys = np.asarray(state['buffered_ys'], dtype=np.int64)
+        self._buffer_index = 0
+        self.pending_foods = state['pending_foods']
+        self.generating = state['generating']
 
     def generate_single_food(self):
         """
@@ -34,11 +186,9 @@ class FoodGenerator:
         ### Returns
         `Food`: Generated food.
         """
-        position = Position(random.randint(0, self.surface_size.width - 1),
-                            random.randint(0, self.surface_size.height - 1))
-        return Food(position)
+        return self.generate_foods(1)[0]
 
-    def generate_foods(self, surface_size: Size, n_foods: int = 1):
+    def generate_foods(self, n_foods: int = 1):
         """
         Generates multiple foods at once.
         ___
@@ -49,28 +199,65 @@ class FoodGenerator:
         ### Returns
         `List[Food]`: Generated foods.
         """
+        xs, ys = self.generate_positions(n_foods)
         generated_foods = []
 
-        for _ in range(n_foods):
-            generated_foods.append(self.generate_single_food())
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            if self.food_pool is not None:
+                food = self.food_pool.acquire()
+                food.reset(x, y)
+            else:
+                food = Food(Position(x, y))
+            if self.food_grid is not None:
+                self.food_grid.insert(food, food.position, food.radius())
+            generated_foods.append(food)
 
         return generated_foods
 
-    def generate_in_game_loop(self, food_bucket: List[Food], fps: int):
+    def due_foods(self, fps: int) -> int:
         """
-        As the game time goes on, this method generates foods one by one in game loop.
-        The generated foods are returned via `food_bucket` argument.
+        Advances the generation by a frame and takes the number of foods due in it. Used by
+        `generate_in_game_loop()`, and by the callers that store the foods on their own.
         ___
 
-        ## Arguments
-         - `food_bucket (List[Food])`: The list to return the generated foods.
+        ### Arguments
          - `fps`: The FPS (Frames per Second) value of the game
+
+        ### Returns
+        `int`: Number of foods to be generated in the frame.
         """
-        if self.frame_counter > fps / self.generation_rate / f.TIME_FACTOR:
-            food = self.generate_single_food()
-            food_bucket.append(food)
-            self.frame_counter -= fps / self.generation_rate / f.TIME_FACTOR
+        if not self.generating:
+            return 0
 
-        self.frame_counter += 1
+        self.pending_foods += self.generation_rate * f.TIME_FACTOR / fps
+        # The tolerance keeps the rounding errors of the sum from delaying a food by a frame
+        n_foods = int(self.pending_foods + 1e-9)
+        if n_foods <= 0:
+            return 0
+        self.pending_foods -= n_foods
+        return n_foods
+
+    def generate_in_game_loop(self, food_bucket: Union[List[Food], FoodField], fps: int):
+        """
+        As the game time goes on, this method generates foods in game loop. As many foods as
+        the generation rate calls for are generated in a single frame, so rates above the
+        FPS value are not capped. The generated foods are returned via `food_bucket` argument.
+        ___
+
+        ## Arguments
+         - `food_bucket (List[Food] or FoodField)`: The container to return the generated foods.
+           A `FoodField` is filled in bulk, without creating `Food` objects, and expires them
+           itself with `FoodField.expire()`. The foods of a `List[Food]` are never aged, not
+           even by drawing them, so the caller must call `Food.age()` on them every tick and
+           drop the ones that are not `is_alive()` any more, or they live forever.
+         - `fps`: The FPS (Frames per Second) value of the game
+        """
+        n_foods = self.due_foods(fps)
+        if n_foods <= 0:
+            return
 
-        
+        if isinstance(food_bucket, FoodField):
+            xs, ys = self.generate_positions(n_foods)
+            food_bucket.add_many(xs, ys, Food.DEFAULT_SIZE.width // 2, Food.DEFAULT_COLOR)
+        else:
+            food_bucket.extend(self.generate_foods(n_foods))
@@ -0,0 +1,80 @@
+from typing import Callable, Generic, List, TypeVar
+
+T = TypeVar('T')
+
+
+class FoodPool(Generic[T]):
+    """
+    Free list of released food objects, e.g. `Food`s or `FoodView`s.
+
+    `acquire()` takes an object from the free list, and creates one only when the list is
+    empty. The caller re-initializes the object in place, so spawning a food does not
+    allocate and expiring one does not leave garbage for the collector.
+    ___
+
+    ### Arguments
+     - `create (Callable[[], T])`: Creates a new object when the free list is empty.
+     - `max_size [int=4096]`: Most objects kept in the free list. Released objects over it are dropped.
+
+    ### Raises
+    `ValueError`: If `max_size` is negative.
+    """
+
+    def __init__(self, create: Callable[[], T], max_size: int = 4096):
+        if max_size < 0:
+            raise ValueError("Max size must not be negative, got {}".format(max_size))
+        self.create = create
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+        self._free: List[T] = []
+
+    def acquire(self) -> T:
+        """
+        ### Returns
+        `T`: A released object, or a new one if there is none. It must be re-initialized by the caller.
+        """
+        if self._free:
+            self.hits += 1
+            return self._free.pop()
+        self.misses += 1
+        return self.create()
+
+    def release(self, item: T) -> None:
+        """
+        Puts `item` on the free list. It must not be used by the caller any more.
+        """
+        if len(self._free) < self.max_size:
+            self._free.append(item)
+        else:
+            self.dropped += 1
+
+    def hit_rate(self) -> float:
+        """
+        ### Returns
+        `float`: Fraction of the acquired objects that came from the free list.
+        """
+        acquired = self.hits + self.misses
+        return self.hits / acquired if acquired else 0.0
+
+    def __len__(self) -> int:
+        return len(self._free)
+
+    def __str__(self):
+        s = "FoodPool: free={}, max_size={}, hits={}, misses={}, dropped={}"
+        return s.format(len(self), self.max_size, self.hits, self.misses, self.dropped)
+
+
+def main():
+    """ Created for test purposes """
+    pool = FoodPool(list, max_size=2)
+    items = [pool.acquire() for _ in range(3)]
+    for item in items:
+        pool.release(item)
+    pool.acquire()
+    print(pool, pool.hit_rate())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+from typing import Dict
+
+
+class FrameBudgetController:
+    """
+    Lowers and restores the rendering quality step by step to keep the frame times
+    within the budget of the target frame rate.
+
+    The measured work time of the frames, without the time spent waiting for the next
+    frame, is averaged over windows of `window` frames. A window over `degrade_ratio`
+    of the budget lowers the quality by one level. Only `restore_windows` windows in a
+    row under `restore_ratio` of the budget restore a level, and the window after a
+    change is not judged, so the quality does not oscillate around the budget.
+
+    The levels are cumulative, every level also keeps the reductions of the lower ones:
+     0. Full quality.
+     1. Circles are drawn filled only, without the anti-aliased outline.
+     2. Coarse foods, the tiny and the far-away ones, are redrawn every other frame only.
+     3. Food generation is throttled to `GENERATION_FACTOR` of its rate.
+     4. The overlay text is refreshed `OVERLAY_REFRESH_FACTOR` times less often.
+    ___
+
+    ### Arguments
+     - `target_fps (int)`: Frame rate to hold.
+     - `window [int=30]`: Number of frames averaged for a decision.
+     - `degrade_ratio [float=0.9]`: Fraction of the budget above which the quality is lowered.
+     - `restore_ratio [float=0.6]`: Fraction of the budget under which the quality is restored.
+     - `restore_windows [int=4]`: Number of calm windows in a row needed to restore a level.
+     - `max_level [int=len(LEVELS)-1]`: Lowest quality level allowed.
+
+    ### Raises
+    `ValueError`: If `restore_ratio` is not below `degrade_ratio`.
+    """
+
+    LEVELS = ('full', 'no antialiasing', 'alternate coarse foods', 'throttled generation', 'reduced overlay')
+    GENERATION_FACTOR = 0.5
+    OVERLAY_REFRESH_FACTOR = 4
+
+    def __init__(self, target_fps: int, window: int = 30, degrade_ratio: float = 0.9,
+                 restore_ratio: float = 0.6, restore_windows: int = 4, max_level: int = len(LEVELS) - 1):
+        if restore_ratio >= degrade_ratio:
+            raise ValueError("Restore ratio must be below the degrade ratio, got {} and {}".format(
+                restore_ratio, degrade_ratio))
+        self.budget = 1 / target_fps
+        self.window = window
+        self.degrade_ratio = degrade_ratio
+        self.restore_ratio = restore_ratio
+        self.restore_windows = restore_windows
+        self.max_level = min(max_level, len(self.LEVELS) - 1)
+        self.level = 0
+        self.changes = 0
+        self.frames = 0
+        self.frames_at_level = [0] * len(self.LEVELS)
+        self._window_time = 0.0
+        self._window_frames = 0
+        self._calm_windows = 0
+        self._settling = False
+
+    def record(self, frame_time: float) -> bool:
+        """
+        Adds the work time of a frame and adjusts the level at the end of a window.
+        ___
+
+        ### Arguments
+         - `frame_time (float)`: Work time of the frame in seconds.
+
+        ### Returns
+        `bool`: Whether the level changed or not.
+        """
+        self.frames += 1
+        self.frames_at_level[self.level] += 1
+        self._window_time += frame_time
+        self._window_frames += 1
+        if self._window_frames < self.window:
+            return False
+
+        mean = self._window_time / self._window_frames
+        self._window_time = 0.0
+        self._window_frames = 0
+        if self._settling:
+            # The first window after a change still holds frames of the previous level
+            self._settling = False
+            return False
+
+        if mean > self.degrade_ratio * self.budget:
+            self._calm_windows = 0
+            return self._set_level(self.level + 1)
+        if mean < self.restore_ratio * self.budget:
+            self._calm_windows += 1
+            if self._calm_windows >= self.restore_windows:
+                self._calm_windows = 0
+                return self._set_level(self.level - 1)
+        else:
+            self._calm_windows = 0
+        return False
+
+    def _set_level(self, level: int) -> bool:
+        level = min(max(level, 0), self.max_level)
+        if level == self.level:
+            return False
+        self.level = level
+        self.changes += 1
+        self._settling = True
+        return True
+
+    @property
+    def antialiasing(self) -> bool:
+        """ `bool`: Whether to draw the anti-aliased outlines of the circles. """
+        return self.level < 1
+
+    @property
+    def alternates_coarse_foods(self) -> bool:
+        """ `bool`: Whether the coarse foods are redrawn every other frame only. """
+        return self.level >= 2
+
+    def redraws_coarse_foods(self, frame: int) -> bool:
+        """
+        ### Arguments
+         - `frame (int)`: Number of the frame.
+
+        ### Returns
+        `bool`: Whether the coarse foods are to be redrawn in `frame`.
+        """
+        return not self.alternates_coarse_foods or frame % 2 == 0
+
+    @property
+    def generation_factor(self) -> float:
+        """ `float`: Factor of the food generation rate. """
+        return self.GENERATION_FACTOR if self.level >= 3 else 1.0
+
+    @property
+    def overlay_refresh_factor(self) -> int:
+        """ `int`: Factor of the refresh interval of the overlay. """
+        return self.OVERLAY_REFRESH_FACTOR if self.level >= 4 else 1
+
+    def summary(self) -> Dict[str, float]:
+        """
+        ### Returns
+        `Dict[str, float]`: Fraction of the frames spent at each level, by the level names.
+        """
+        frames = max(self.frames, 1)
+        return {name: count / frames for name, count in zip(self.LEVELS, self.frames_at_level)}
+
+    def __str__(self):
+        s = "FrameBudgetController: level={} ({}), changes={}, frames at levels={}"
+        return s.format(self.level, self.LEVELS[self.level], self.changes,
+                        {name: round(share, 3) for name, share in self.summary().items() if share})
+
+
+def main():
+    """ Created for test purposes """
+    controller = FrameBudgetController(60)
+    for frame_time in [0.020] * 150 + [0.008] * 600:
+        controller.record(frame_time)
+    print(controller)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+class GameClock:
+    """
+    Fixed timestep accumulator that decouples the simulation rate from the render rate.
+
+    The measured frame times are accumulated, and `advance()` tells how many fixed
+    simulation ticks fit in the accumulated time. The leftover time is exposed as
+    `alpha`, the fraction of a tick to interpolate the rendered positions with.
+    ___
+
+    ### Arguments
+     - `tick_rate [int=60]`: Number of simulation ticks in one second.
+     - `max_frame_time [float=0.25]`: Longest frame time in seconds that is simulated.
+       Longer frames are clamped, so a stall does not cause an endless catch-up.
+    """
+
+    def __init__(self, tick_rate: int = 60, max_frame_time: float = 0.25):
+        if tick_rate <= 0:
+            raise ValueError("Tick rate must be positive, got {}".format(tick_rate))
+        self.tick_rate = tick_rate
+        self.tick_duration = 1 / tick_rate
+        self.max_frame_time = max_frame_time
+        self.accumulator = 0.0
+        self.ticks = 0
+
+    def advance(self, elapsed: float) -> int:
+        """
+        Accumulates the elapsed frame time.
+        ___
+
+        ### Arguments
+         - `elapsed (float)`: Measured duration of the last frame in seconds.
+
+        ### Returns
+        `int`: Number of simulation ticks to run for this frame.
+        """
+        self.accumulator += min(elapsed, self.max_frame_time)
+        ticks = int(self.accumulator // self.tick_duration)
+        self.accumulator -= ticks * self.tick_duration
+        self.ticks += ticks
+        return ticks
+
+    @property
+    def alpha(self) -> float:
+        """
+        `float`: Fraction of a tick between the last simulated state and the next one, in [0, 1)
+        """
+        return self.accumulator / self.tick_duration
+
+    def __str__(self):
+        s = "GameClock: tick_rate={}, ticks={}, alpha={:.3f}"
+        return s.format(self.tick_rate, self.ticks, self.alpha)
+
+
+def main():
+    """ Created for test purposes """
+    clock = GameClock(tick_rate=120)
+    print(clock.advance(1 / 30), clock)
+
+
+if __name__ == '__main__':
+    main()
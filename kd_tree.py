@@ -0,0 +1,219 @@
+from typing import List, Tuple
+
+import numpy as np
+
+
+class KDTree:
+    """
+    Static 2D KD-tree over a set of points, e.g. the food positions, built in bulk.
+
+    The points are split at the median of the longer side of each node, level by level,
+    until the leaves hold at most `leaf_size` points. The tree is stored in arrays with
+    the children of node `i` at `2i + 1` and `2i + 2`, and every node keeps the bounding
+    box of its points.
+
+    Queries are batched: all the query points descend the tree together, one level at
+    a time, as an array of (query, node) pairs. A pair is dropped as soon as the box of
+    its node is farther than the search distance of its query, so a query only visits
+    the leaves near it, and the work of a level is a few NumPy calls for all queries.
+    ___
+
+    ### Arguments
+     - `points (numpy.ndarray)`: (N, 2) array of the indexed points.
+     - `leaf_size [int=16]`: Most points in a leaf.
+
+    ### Raises
+    `ValueError`: If `leaf_size` is not positive.
+    """
+
+    def __init__(self, points: np.ndarray, leaf_size: int = 16):
+        if leaf_size <= 0:
+            raise ValueError("Leaf size must be positive, got {}".format(leaf_size))
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        n_points = len(points)
+        self.leaf_size = leaf_size
+        self.depth = max(0, int(np.ceil(np.log2(max(n_points, 1) / leaf_size))))
+
+        # Bounds of the nodes of the current level in the permuted points
+        starts = np.zeros(1, dtype=np.int64)
+        ends = np.full(1, n_points, dtype=np.int64)
+        order = np.arange(n_points)
+        for _ in range(self.depth):
+            sizes = ends - starts
+            segments = np.repeat(np.arange(len(starts)), sizes)
+            level_points = points[order]
+            # Split every node along the longer side of its bounding box
+            low = np.minimum.reduceat(level_points, starts, axis=0)
+            high = np.maximum.reduceat(level_points, starts, axis=0)
+            spans = high - low
+            axes = np.argmax(spans, axis=1)
+            nodes = np.arange(len(starts))
+            # The coordinates scaled into [0, 1) within their node, offset by the node, sort
+            # every node at once in a single float argsort, much faster than a lexsort
+            scales = np.maximum(spans[nodes, axes], 1e-300) * (1 + 1e-9)
+            keys = (level_points[np.arange(n_points), axes[segments]] - low[nodes, axes][segments]) \
+                / scales[segments] + segments
+            order = order[np.argsort(keys)]
+            middles = (starts + ends) // 2
+            starts = np.column_stack((starts, middles)).ravel()
+            ends = np.column_stack((middles, ends)).ravel()
+
+        self.n_points = n_points
+        self._order = order
+        n_leaves = len(starts)
+        sizes = ends - starts
+        width = int(sizes.max()) if n_points else 0
+
+        # Leaves padded to the same width, the padding is at infinity
+        slots = starts[:, None] + np.arange(width)[None, :]
+        valid = slots < ends[:, None]
+        slots = np.where(valid, slots, 0)
+        self._leaf_indices = np.where(valid, order[slots] if n_points else -1, -1)
+        self._leaf_points = np.where(valid[:, :, None], points[self._leaf_indices], np.inf)
+
+        # Bounding boxes, the leaves first, then the inner nodes from their children
+        n_nodes = 2 * n_leaves - 1
+        first_leaf = n_leaves - 1
+        self._box_low = np.full((n_nodes, 2), np.inf)
+        self._box_high = np.full((n_nodes, 2), -np.inf)
+        if n_points:
+            self._box_low[first_leaf:] = np.where(valid[:, :, None], self._leaf_points, np.inf).min(axis=1)
+            self._box_high[first_leaf:] = np.where(valid[:, :, None], self._leaf_points, -np.inf).max(axis=1)
+        for level in range(self.depth - 1, -1, -1):
+            nodes = np.arange(2 ** level - 1, 2 ** (level + 1) - 1)
+            self._box_low[nodes] = np.minimum(self._box_low[2 * nodes + 1], self._box_low[2 * nodes + 2])
+            self._box_high[nodes] = np.maximum(self._box_high[2 * nodes + 1], self._box_high[2 * nodes + 2])
+
+    def _box_distances(self, queries: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+        # Squared distance from each query to the box of its node, zero inside the box
+        below = self._box_low[nodes] - queries
+        above = queries - self._box_high[nodes]
+        gaps = np.maximum(np.maximum(below, above), 0.0)
+        return np.einsum('ij,ij->i', gaps, gaps)
+
+    def _candidates(self, queries: np.ndarray, bounds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        ### Returns
+        `tuple (numpy.ndarray, numpy.ndarray)`: Query and leaf of every pair whose leaf box is
+        within the squared distance `bounds` of the query.
+        """
+        pair_queries = np.arange(len(queries))
+        pair_nodes = np.zeros(len(queries), dtype=np.int64)
+        for _ in range(self.depth):
+            pair_queries = np.repeat(pair_queries, 2)
+            pair_nodes = 2 * np.repeat(pair_nodes, 2) + np.tile((1, 2), len(pair_nodes))
+            near = self._box_distances(queries[pair_queries], pair_nodes) <= bounds[pair_queries]
+            pair_queries = pair_queries[near]
+            pair_nodes = pair_nodes[near]
+        return pair_queries, pair_nodes - (2 ** self.depth - 1)
+
+    def _home_leaves(self, queries: np.ndarray) -> np.ndarray:
+        # Descends every query to the nearer child, down to the leaf it falls in or is closest to
+        nodes = np.zeros(len(queries), dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * nodes + 1
+            right = left + 1
+            nodes = np.where(self._box_distances(queries, right) < self._box_distances(queries, left), right, left)
+        return nodes - (2 ** self.depth - 1)
+
+    def _leaf_distances(self, queries: np.ndarray, pair_queries: np.ndarray, leaves: np.ndarray) -> np.ndarray:
+        diff = self._leaf_points[leaves] - queries[pair_queries, None, :]
+        with np.errstate(invalid='ignore'):
+            return np.einsum('ijk,ijk->ij', diff, diff)
+
+    def query(self, queries: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the `k` nearest points of every query point at once.
+        ___
+
+        ### Arguments
+         - `queries (numpy.ndarray)`: (Q, 2) array of the query points.
+         - `k [int=1]`: Number of neighbors.
+
+        ### Returns
+        `tuple (numpy.ndarray, numpy.ndarray)`: (Q, k) arrays of the distances and of the indices of
+        the neighbors, nearest first. Missing neighbors have infinite distance and index -1.
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        n_queries = len(queries)
+        distances = np.full((n_queries, k), np.inf)
+        indices = np.full((n_queries, k), -1, dtype=np.int64)
+        if self.n_points == 0 or n_queries == 0 or k <= 0:
+            return distances, indices
+
+        # The leaf that contains a query gives an upper bound of its k-th distance
+        home = self._home_leaves(queries)
+        home_distances = self._leaf_distances(queries, np.arange(n_queries), home)
+        if k <= home_distances.shape[1]:
+            bounds = np.partition(home_distances, k - 1, axis=1)[:, k - 1]
+        else:
+            bounds = np.full(n_queries, np.inf)
+
+        pair_queries, leaves = self._candidates(queries, bounds)
+        pair_distances = self._leaf_distances(queries, pair_queries, leaves)
+        candidate_queries = np.repeat(pair_queries, pair_distances.shape[1])
+        candidate_distances = pair_distances.ravel()
+        candidate_indices = self._leaf_indices[leaves].ravel()
+
+        order = np.lexsort((candidate_distances, candidate_queries))
+        candidate_queries = candidate_queries[order]
+        # Rank of every candidate among the candidates of its query
+        firsts = np.searchsorted(candidate_queries, candidate_queries, side='left')
+        ranks = np.arange(len(order)) - firsts
+        kept = (ranks < k) & np.isfinite(candidate_distances[order])
+        rows = candidate_queries[kept]
+        columns = ranks[kept]
+        distances[rows, columns] = np.sqrt(candidate_distances[order][kept])
+        indices[rows, columns] = candidate_indices[order][kept]
+        return distances, indices
+
+    def query_radius(self, queries: np.ndarray, radius: float) -> List[np.ndarray]:
+        """
+        Finds the points within `radius` of every query point at once.
+        ___
+
+        ### Arguments
+         - `queries (numpy.ndarray)`: (Q, 2) array of the query points.
+         - `radius (float)`: Search radius.
+
+        ### Returns
+        `List[numpy.ndarray]`: Indices of the points within the radius of each query, nearest first.
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        n_queries = len(queries)
+        if self.n_points == 0 or n_queries == 0:
+            return [np.empty(0, dtype=np.int64) for _ in range(n_queries)]
+
+        bound = radius * radius
+        pair_queries, leaves = self._candidates(queries, np.full(n_queries, bound))
+        pair_distances = self._leaf_distances(queries, pair_queries, leaves)
+        candidate_queries = np.repeat(pair_queries, pair_distances.shape[1])
+        candidate_distances = pair_distances.ravel()
+        candidate_indices = self._leaf_indices[leaves].ravel()
+
+        within = candidate_distances <= bound
+        candidate_queries = candidate_queries[within]
+        candidate_distances = candidate_distances[within]
+        candidate_indices = candidate_indices[within]
+        order = np.lexsort((candidate_distances, candidate_queries))
+        counts = np.bincount(candidate_queries, minlength=n_queries)
+        return np.split(candidate_indices[order], np.cumsum(counts)[:-1])
+
+    def __len__(self) -> int:
+        return self.n_points
+
+    def __str__(self):
+        return "KDTree: points={}, depth={}, leaf_size={}".format(self.n_points, self.depth, self.leaf_size)
+
+
+def main():
+    """ Created for test purposes """
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 100, size=(1000, 2))
+    tree = KDTree(points)
+    distances, indices = tree.query(np.array([[50.0, 50.0], [0.0, 0.0]]), k=3)
+    print(tree, distances, indices, tree.query_radius(np.array([[50.0, 50.0]]), 5))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,5 @@
+import math
+
 from position import Position
 from velocity import Velocity
 
@@ -9,17 +11,41 @@ class Moveable():
     ### Paramaters
      - `initial_position (Position)`: Initial position of moveable object.
      - `max_velocity (float)`: The highest speed that the moveable object can be moving obround
-     - `initial_velocity [Velocity=Velocity(.0, .0)]`: The velocity of the object when its created.
+     - `initial_velocity [Velocity=None]`: The velocity of the object when its created. (None) for no motion.
      - `pinned [bool=False]`: Represents whether the object is not moveable or not. Can be used for temporary stops.
     """
 
     def __init__(self, initial_position: Position, max_velocity: float,
-                 initial_velocity: Velocity = Velocity(.0, .0), pinned: bool = False):
+                 initial_velocity: Velocity = None, pinned: bool = False):
         self.position = initial_position
+        self.previous_position = Position.from_position(initial_position)
         self.max_velocity = max_velocity
-        self.velocity = initial_velocity
+        self.velocity = initial_velocity if initial_velocity is not None else Velocity(.0, .0)
         self.pinned = pinned
 
+    def remember_position(self) -> None:
+        """
+        Stores the current position as the previous position. Must be called once
+        at the beginning of every simulation tick for `interpolated_position()`.
+        """
+        self.previous_position.x = self.position.x
+        self.previous_position.y = self.position.y
+
+    def interpolated_position(self, alpha: float) -> Position:
+        """
+        Interpolates between the previous and the current position.
+        ___
+
+        ### Arguments
+         - `alpha (float)`: Interpolation fraction. 0 for the previous, 1 for the current position.
+
+        ### Returns
+        `Position`: Interpolated position
+        """
+        previous = self.previous_position
+        return Position(previous.x + (self.position.x - previous.x) * alpha,
+                        previous.y + (self.position.y - previous.y) * alpha)
+
     def commit_movement(self, fps: int):
         """
         Process the movement of the object considering the properties of Moveable super class.
@@ -53,7 +79,8 @@ class Moveable():
 
     def set_velocity_for_target(self, target: Position, easing: float = 40) -> None:
         """
-        Calculates and sets the angle and the coefficent of moveable's velocity.
+        Calculates and sets the direction and the coefficent of moveable's velocity.
+        The direction is the normalized difference vector, so no trigonometry is needed.
         
         Decelerate interpolation is used with the equasion of:
 
@@ -70,12 +97,15 @@ class Moveable():
         """
         diff_x = target.x - self.position.x
         diff_y = target.y - self.position.y
-        self.velocity.angle = Velocity.calculate_angle(diff_x, diff_y)
-
-        distance = self.position.euclidean_distance_to(target)
+        distance = math.hypot(diff_x, diff_y)
         calculated_coefficent = \
             (self.max_velocity * easing / -(distance + easing)) + self.max_velocity
-        self.velocity.coefficent = calculated_coefficent
+
+        if distance > 0:
+            scale = calculated_coefficent / distance
+            self.velocity.set_components(diff_x * scale, diff_y * scale)
+        else:
+            self.velocity.set_components(.0, .0)
         
 
 def main():
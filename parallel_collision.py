@@ -0,0 +1,286 @@
+import math
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from collision import circle_contacts
+from size import Size
+
+# (name of the shared memory block, dtype, length) of an array that a worker can attach to
+ArrayDescriptor = Tuple[str, str, int]
+
+
+class SharedArrayAllocator:
+    """
+    Allocates NumPy arrays in `multiprocessing.shared_memory` blocks, one block per array,
+    so worker processes can read them by name without copying.
+
+    Used as the allocator of an `EntityStore`, the component arrays of the entities are
+    shared as they are. A freed block is unlinked at once, so no new worker attaches to
+    it, and its mapping is closed once no array uses it any more.
+    """
+
+    def __init__(self):
+        self._blocks: Dict[int, shared_memory.SharedMemory] = {}
+        self._retired: List[shared_memory.SharedMemory] = []
+
+    @staticmethod
+    def _address(array: np.ndarray) -> int:
+        return array.__array_interface__['data'][0]
+
+    def zeros(self, shape: Sequence[int], dtype) -> np.ndarray:
+        """
+        ### Returns
+        `numpy.ndarray`: Array of zeros in a new shared memory block.
+        """
+        dtype = np.dtype(dtype)
+        block = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        array.fill(0)
+        self._blocks[self._address(array)] = block
+        self._close_retired()
+        return array
+
+    def free(self, array: np.ndarray) -> None:
+        """
+        Releases the block of an array returned by `zeros()`. The array must not be used any more.
+        """
+        block = self._blocks.pop(self._address(array))
+        block.unlink()
+        self._retired.append(block)
+
+    def describe(self, array: np.ndarray) -> Optional[ArrayDescriptor]:
+        """
+        ### Arguments
+         - `array (numpy.ndarray)`: 1D array, or a leading slice of one, returned by `zeros()`.
+
+        ### Returns
+        `ArrayDescriptor`: What a worker needs to attach to the array. (None) if it is not in shared memory.
+        """
+        block = self._blocks.get(self._address(array))
+        if block is None or array.ndim != 1 or not array.flags.c_contiguous:
+            return None
+        return block.name, array.dtype.str, len(array)
+
+    def _close_retired(self) -> None:
+        retired = []
+        for block in self._retired:
+            try:
+                block.close()
+            except BufferError:
+                # Still used by an array, tried again later
+                retired.append(block)
+        self._retired = retired
+
+    def close(self) -> None:
+        """
+        Unlinks every block. The allocated arrays must not be used any more.
+        """
+        for block in self._blocks.values():
+            block.unlink()
+            self._retired.append(block)
+        self._blocks.clear()
+        self._close_retired()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    def __str__(self):
+        return "SharedArrayAllocator: blocks={}, bytes={}, retired={}".format(
+            len(self._blocks), sum(block.size for block in self._blocks.values()), len(self._retired))
+
+
+# Blocks attached by a worker process, by their names
+_attached: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def _attach(descriptors: Sequence[ArrayDescriptor]) -> List[np.ndarray]:
+    names = {name for name, _, _ in descriptors}
+    for name in list(_attached):
+        if name not in names:
+            # Freed by the parent, or not used by this tick
+            _attached.pop(name).close()
+    arrays = []
+    for name, dtype, length in descriptors:
+        block = _attached.get(name)
+        if block is None:
+            block = _attached[name] = shared_memory.SharedMemory(name=name)
+        arrays.append(np.ndarray((length,), dtype=dtype, buffer=block.buf))
+    return arrays
+
+
+def _tile_contacts(task) -> Tuple[np.ndarray, np.ndarray]:
+    (left, top, right, bottom), halo, descriptors = task
+    eater_x, eater_y, eater_radius, food_x, food_y, food_radius = _attach(descriptors)
+
+    # The tile owns the eaters whose centers are in it, and sees the foods in reach of them
+    owned = np.flatnonzero((eater_x >= left) & (eater_x < right) & (eater_y >= top) & (eater_y < bottom))
+    if len(owned) == 0:
+        return owned, owned
+    in_columns = np.flatnonzero((food_x >= left - halo) & (food_x < right + halo))
+    column_y = food_y[in_columns]
+    near = in_columns[(column_y >= top - halo) & (column_y < bottom + halo)]
+    eaters, foods = circle_contacts(eater_x[owned], eater_y[owned], eater_radius[owned],
+                                    food_x[near], food_y[near], food_radius[near])
+    return owned[eaters], near[foods]
+
+
+class ParallelCollisionDetector:
+    """
+    Finds the eater and food contacts of very large worlds on many processes, with the same
+    results as `circle_contacts()`.
+
+    The world is split into a grid of `tiles`. Every tile owns the eaters whose centers
+    are in it, and tests them against the foods in the tile grown by a halo as wide as the
+    longest reach, so the contacts across the tile borders are found by the tile of the
+    eater. The outer tiles extend to infinity. The tiles are processed by a pool of worker
+    processes, which read the arrays from shared memory. Arrays allocated by the
+    `allocator`, like the component arrays of an `EntityStore` using it, are read in
+    place; other arrays are copied into staging blocks first. A food touched by eaters of
+    several tiles is kept for the first eater only.
+
+    Handing the tiles to the workers costs more than the search itself in small worlds,
+    so with fewer than `min_foods` foods the contacts are found on this process.
+    ___
+
+    ### Arguments
+     - `world_size (Size)`: Size of the tiled area.
+     - `workers [int=None]`: Number of worker processes. (None) for the number of CPUs.
+     - `tiles [tuple (int, int)=None]`: Columns and rows of the tiles. (None) for about 4 tiles per worker.
+     - `allocator [SharedArrayAllocator=None]`: Allocator of the arrays that are read in place. (None) for
+       a new one, then only the staged copies are shared.
+     - `min_foods [int=MIN_PARALLEL_FOODS]`: Fewest foods that are searched on the workers.
+
+    ### Raises
+    `ValueError`: If `workers` is not positive.
+    """
+
+    TILES_PER_WORKER = 4
+    # Below this, the serial search takes about as long as the dispatch to the pool and the merge
+    MIN_PARALLEL_FOODS = 250000
+
+    def __init__(self, world_size: Size, workers: int = None, tiles: Tuple[int, int] = None,
+                 allocator: SharedArrayAllocator = None, min_foods: int = MIN_PARALLEL_FOODS):
+        workers = workers if workers is not None else multiprocessing.cpu_count()
+        if workers <= 0:
+            raise ValueError("Number of workers must be positive, got {}".format(workers))
+        self.world_size = world_size
+        self.workers = workers
+        if tiles is None:
+            # Near square tiles
+            n_tiles = workers * self.TILES_PER_WORKER
+            columns = max(1, round(math.sqrt(n_tiles * world_size.width / world_size.height)))
+            tiles = (columns, max(1, math.ceil(n_tiles / columns)))
+        self.tiles = tiles
+        self.min_foods = min_foods
+        self._own_allocator = allocator is None
+        self.allocator = allocator if allocator is not None else SharedArrayAllocator()
+        self._staging: List[np.ndarray] = [None] * 6
+        self._pool = None
+
+    def tile_bounds(self) -> List[Tuple[float, float, float, float]]:
+        """
+        ### Returns
+        `List[tuple (left, top, right, bottom)]`: Bounds of the tiles, the outer ones extended to infinity.
+        """
+        columns, rows = self.tiles
+        xs = [self.world_size.width * column / columns for column in range(columns + 1)]
+        ys = [self.world_size.height * row / rows for row in range(rows + 1)]
+        xs[0] = ys[0] = -math.inf
+        xs[-1] = ys[-1] = math.inf
+        return [(xs[column], ys[row], xs[column + 1], ys[row + 1])
+                for row in range(rows) for column in range(columns)]
+
+    def _share(self, slot: int, array: np.ndarray) -> ArrayDescriptor:
+        descriptor = self.allocator.describe(array)
+        if descriptor is not None:
+            return descriptor
+        staging = self._staging[slot]
+        if staging is None or len(staging) < len(array) or staging.dtype != array.dtype:
+            if staging is not None:
+                self.allocator.free(staging)
+            staging = self._staging[slot] = self.allocator.zeros((max(len(array), 1024),), array.dtype)
+        staging[:len(array)] = array
+        return self.allocator.describe(staging[:len(array)])
+
+    def contacts(self, eater_x: np.ndarray, eater_y: np.ndarray, eater_radius: np.ndarray,
+                 food_x: np.ndarray, food_y: np.ndarray, food_radius: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Parallel `circle_contacts()`, with the same arguments and results.
+        ___
+
+        ### Returns
+        `tuple (numpy.ndarray, numpy.ndarray)`: Indices of the eaters and of the foods in contact, by the food indices.
+        """
+        if len(food_x) < self.min_foods:
+            return circle_contacts(eater_x, eater_y, eater_radius, food_x, food_y, food_radius)
+        if len(eater_x) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        descriptors = tuple(self._share(slot, array) for slot, array in
+                            enumerate((eater_x, eater_y, eater_radius, food_x, food_y, food_radius)))
+        if self._pool is None:
+            # Started after the first block, so the workers share the resource tracker of this process
+            # instead of starting their own ones that would unlink the blocks when they exit
+            self._pool = multiprocessing.Pool(self.workers)
+        halo = float(eater_radius.max()) + float(food_radius.max())
+        results = self._pool.map(_tile_contacts, [(bounds, halo, descriptors) for bounds in self.tile_bounds()])
+
+        eaters = np.concatenate([tile_eaters for tile_eaters, _ in results]).astype(np.int64)
+        foods = np.concatenate([tile_foods for _, tile_foods in results]).astype(np.int64)
+        first = np.lexsort((eaters, foods))
+        eaters = eaters[first]
+        foods = foods[first]
+        unique = np.ones(len(foods), dtype=np.bool_)
+        unique[1:] = foods[1:] != foods[:-1]
+        return eaters[unique], foods[unique]
+
+    def close(self) -> None:
+        """
+        Stops the workers and frees the staging blocks, and the allocator if it was created by the detector.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        for slot, staging in enumerate(self._staging):
+            if staging is not None:
+                self.allocator.free(staging)
+                self._staging[slot] = None
+        if self._own_allocator:
+            self.allocator.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __str__(self):
+        return "ParallelCollisionDetector: workers={}, tiles={}".format(self.workers, self.tiles)
+
+
+def main():
+    """ Created for test purposes """
+    rng = np.random.default_rng(0)
+    size = Size(3600, 2700)
+    eaters = rng.uniform((0, 0), size.as_tuple(), size=(1000, 2))
+    foods = rng.uniform((0, 0), size.as_tuple(), size=(100000, 2))
+    eater_radius = np.full(1000, 10)
+    food_radius = np.full(100000, 5)
+    with ParallelCollisionDetector(size, workers=2, min_foods=0) as detector:
+        parallel = detector.contacts(eaters[:, 0], eaters[:, 1], eater_radius, foods[:, 0], foods[:, 1], food_radius)
+        print(detector, len(parallel[1]))
+    serial = circle_contacts(eaters[:, 0], eaters[:, 1], eater_radius, foods[:, 0], foods[:, 1], food_radius)
+    print(all(np.array_equal(a, b) for a, b in zip(parallel, serial)))
+
+
+if __name__ == '__main__':
+    main()
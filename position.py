@@ -1,8 +1,6 @@
 import math
 from typing import Tuple
 
-from velocity import Velocity
-
 
 class Position:
     """
@@ -14,10 +12,35 @@ class Position:
     - `y (float)`: Location in Y axis.
     """
 
+    __slots__ = ('x', 'y')
+
     def __init__(self, x: float, y: float):
         self.x = x
         self.y = y
 
+    def set(self, x: float, y: float) -> None:
+        """
+        Moves the position in place.
+        ___
+
+        ### Arguments
+        - `x (float)`: Location in X axis.
+        - `y (float)`: Location in Y axis.
+        """
+        self.x = x
+        self.y = y
+
+    def copy_from(self, position: 'Position') -> None:
+        """
+        Copies the values of `position` in place, without allocating a new object.
+        ___
+
+        ### Arguments
+        `position (Position)`: Position to be copied
+        """
+        self.x = position.x
+        self.y = position.y
+
     @staticmethod
     def from_position(position: 'Position'):
         """
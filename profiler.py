@@ -0,0 +1,330 @@
+import csv
+import gc
+import json
+import time
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+import render_backend
+
+
+class _PhaseTimer:
+    """
+    Reusable context manager that adds its elapsed time to a phase of the current frame.
+    """
+
+    __slots__ = ('profiler', 'column', 'start')
+
+    def __init__(self, profiler: 'FrameProfiler', column: int):
+        self.profiler = profiler
+        self.column = column
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler._current[self.column] += time.perf_counter() - self.start
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class NullProfiler:
+    """
+    Profiler that measures nothing, for running without instrumentation.
+    """
+
+    _TIMER = _NullTimer()
+
+    def phase(self, name: str) -> _NullTimer:
+        return self._TIMER
+
+    def end_frame(self) -> None:
+        pass
+
+
+class FrameProfiler:
+    """
+    Per-frame phase profiler that keeps the latest frames in a fixed-size ring buffer.
+
+    Time a phase with `with profiler.phase('name'): ...`, then call `end_frame()`
+    once per frame. A phase can be entered many times in a frame, its times are added.
+    ___
+
+    ### Arguments
+     - `phases (Sequence[str])`: Names of the phases, in the order of the game loop.
+     - `capacity [int=600]`: Number of frames to keep.
+    """
+
+    def __init__(self, phases: Sequence[str], capacity: int = 600):
+        self.phases = tuple(phases)
+        self.capacity = capacity
+        self.frames = 0
+        self._samples = np.zeros((capacity, len(self.phases)), dtype=np.float64)
+        self._current = [0.0] * len(self.phases)
+        self._timers = {name: _PhaseTimer(self, column) for column, name in enumerate(self.phases)}
+
+    def phase(self, name: str) -> _PhaseTimer:
+        """
+        ### Arguments
+         - `name (str)`: Name of the phase.
+
+        ### Returns
+        `context manager`: Timer that adds the time spent in its `with` block to the phase.
+
+        ### Raises
+        `KeyError`: If the phase is not one of `phases`.
+        """
+        return self._timers[name]
+
+    def end_frame(self) -> None:
+        """
+        Stores the phase times of the current frame in the ring buffer and starts a new frame.
+        """
+        self._samples[self.frames % self.capacity] = self._current
+        self.frames += 1
+        for column in range(len(self._current)):
+            self._current[column] = 0.0
+
+    def samples(self) -> np.ndarray:
+        """
+        ### Returns
+        `numpy.ndarray`: (frames, phases) array of the stored phase times in seconds, oldest first.
+        """
+        if self.frames <= self.capacity:
+            return self._samples[:self.frames].copy()
+        start = self.frames % self.capacity
+        return np.concatenate((self._samples[start:], self._samples[:start]))
+
+    def percentiles(self, percentile: float) -> Dict[str, float]:
+        """
+        ### Arguments
+         - `percentile (float)`: Percentile in [0, 100].
+
+        ### Returns
+        `Dict[str, float]`: Percentile of the stored times of each phase in milliseconds.
+        """
+        samples = self.samples()
+        if len(samples) == 0:
+            return {name: 0.0 for name in self.phases}
+        values = np.percentile(samples, percentile, axis=0) * 1e3
+        return dict(zip(self.phases, values.tolist()))
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        ### Returns
+        `Dict[str, Dict[str, float]]`: p50, p99 and mean of each phase and of the whole frame in milliseconds.
+        """
+        samples = self.samples()
+        totals = samples.sum(axis=1, keepdims=True)
+        columns = np.hstack((samples, totals)) if len(samples) else np.zeros((1, len(self.phases) + 1))
+        p50 = np.percentile(columns, 50, axis=0) * 1e3
+        p99 = np.percentile(columns, 99, axis=0) * 1e3
+        mean = columns.mean(axis=0) * 1e3
+        return {name: {'p50': p50[column], 'p99': p99[column], 'mean': mean[column]}
+                for column, name in enumerate(self.phases + ('frame',))}
+
+    def export(self, path: str) -> None:
+        """
+        Writes the stored frames to `path`. A `.csv` path gets one row per frame with a
+        column per phase in milliseconds, any other path gets a JSON document with the
+        summary and the frames.
+        ___
+
+        ### Arguments
+         - `path (str)`: Output file path.
+        """
+        samples = self.samples() * 1e3
+        if path.endswith('.csv'):
+            with open(path, 'w', newline='') as output:
+                writer = csv.writer(output)
+                writer.writerow(self.phases)
+                writer.writerows(samples.tolist())
+        else:
+            with open(path, 'w') as output:
+                json.dump({
+                    'phases': self.phases,
+                    'unit': 'ms',
+                    'total_frames': self.frames,
+                    'summary': self.summary(),
+                    'frames': samples.tolist(),
+                }, output, indent=2)
+
+    def __str__(self):
+        return "FrameProfiler: phases={}, frames={}".format(len(self.phases), self.frames)
+
+
+class LatencyMeter:
+    """
+    Ring buffer of the latest latency samples, e.g. the time from an input to the first
+    frame that shows its effect.
+    ___
+
+    ### Arguments
+     - `capacity [int=600]`: Number of samples to keep.
+    """
+
+    def __init__(self, capacity: int = 600):
+        self.capacity = capacity
+        self.count = 0
+        self._samples = np.zeros(capacity, dtype=np.float64)
+
+    def record(self, seconds: float) -> None:
+        self._samples[self.count % self.capacity] = seconds
+        self.count += 1
+
+    def summary(self) -> Dict[str, float]:
+        """
+        ### Returns
+        `Dict[str, float]`: p50, p99, mean and max of the stored samples in milliseconds.
+        """
+        samples = self._samples[:min(self.count, self.capacity)] * 1e3
+        if len(samples) == 0:
+            return {'p50': 0.0, 'p99': 0.0, 'mean': 0.0, 'max': 0.0}
+        p50, p99 = np.percentile(samples, (50, 99)).tolist()
+        return {'p50': p50, 'p99': p99, 'mean': float(samples.mean()), 'max': float(samples.max())}
+
+    def __str__(self):
+        return "LatencyMeter: samples={}, p50={p50:.2f} ms, p99={p99:.2f} ms, max={max:.2f} ms".format(
+            self.count, **self.summary())
+
+
+class GCMonitor:
+    """
+    Counts the garbage collections per generation and times their pauses, through
+    `gc.callbacks`, while it is started.
+    ___
+
+    ### Arguments
+     - `capacity [int=600]`: Number of pause samples to keep.
+    """
+
+    def __init__(self, capacity: int = 600):
+        self.collections = [0, 0, 0]
+        self.collected = 0
+        self.pauses = LatencyMeter(capacity)
+        self._started_at = None
+        self._elapsed = 0.0
+        self._collection_started_at = 0.0
+
+    def _callback(self, phase: str, info: dict) -> None:
+        if phase == 'start':
+            self._collection_started_at = time.perf_counter()
+        else:
+            self.pauses.record(time.perf_counter() - self._collection_started_at)
+            self.collections[info['generation']] += 1
+            self.collected += info['collected']
+
+    def start(self) -> 'GCMonitor':
+        if self._started_at is None:
+            gc.callbacks.append(self._callback)
+            self._started_at = time.perf_counter()
+        return self
+
+    def stop(self) -> None:
+        if self._started_at is not None:
+            gc.callbacks.remove(self._callback)
+            self._elapsed += time.perf_counter() - self._started_at
+            self._started_at = None
+
+    def per_minute(self, seconds: float = None) -> List[float]:
+        """
+        ### Arguments
+         - `seconds [float=None]`: Length of the measured period, e.g. simulated seconds.
+           (None) for the wall time that the monitor was started for.
+
+        ### Returns
+        `List[float]`: Collections of each generation per minute.
+        """
+        if seconds is None:
+            seconds = self._elapsed
+            if self._started_at is not None:
+                seconds += time.perf_counter() - self._started_at
+        if seconds <= 0:
+            return [0.0, 0.0, 0.0]
+        return [count * 60 / seconds for count in self.collections]
+
+    def __enter__(self) -> 'GCMonitor':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def __str__(self):
+        return "GCMonitor: collections={}, per minute={}, max pause={:.2f} ms".format(
+            self.collections, [round(rate, 1) for rate in self.per_minute()], self.pauses.summary()['max'])
+
+
+class ProfilerOverlay:
+    """
+    Renderable text table of the p50 and p99 times of each profiled phase.
+
+    The text is re-rendered only every `refresh_interval` frames, in between the cached
+    surface is blitted.
+    ___
+
+    ### Arguments
+     - `profiler (FrameProfiler)`: Profiler to be shown.
+     - `visible [bool=False]`: Visibility of the overlay.
+     - `refresh_interval [int=30]`: Number of frames between the text updates.
+    """
+
+    BACKGROUND_COLOR = (0, 0, 0, 160)
+    TEXT_COLOR = (255, 255, 255)
+
+    def __init__(self, profiler: FrameProfiler, visible: bool = False, refresh_interval: int = 30):
+        self.profiler = profiler
+        self.visible = visible
+        self.refresh_interval = refresh_interval
+        self._font = None
+        self._surface = None
+        self._refreshed_at = -refresh_interval
+
+    def _refresh(self):
+        pygame = render_backend.load()
+
+        if self._font is None:
+            self._font = pygame.font.Font(None, 18)
+        p50 = self.profiler.percentiles(50)
+        p99 = self.profiler.percentiles(99)
+        lines = ["{:<16}{:>8}{:>8}".format("phase (ms)", "p50", "p99")]
+        lines += ["{:<16}{:8.2f}{:8.2f}".format(name, p50[name], p99[name]) for name in self.profiler.phases]
+        lines.append("{:<16}{:8.2f}".format("total p50", sum(p50.values())))
+
+        rendered = [self._font.render(line, True, self.TEXT_COLOR) for line in lines]
+        line_height = self._font.get_linesize()
+        width = max(text.get_width() for text in rendered) + 8
+        self._surface = pygame.Surface((width, line_height * len(rendered) + 8), pygame.SRCALPHA)
+        self._surface.fill(self.BACKGROUND_COLOR)
+        for row, text in enumerate(rendered):
+            self._surface.blit(text, (4, 4 + row * line_height))
+        self._refreshed_at = self.profiler.frames
+
+    def render(self, surface, position=(4, 4)):
+        """
+        Draws the overlay if it is visible.
+        ___
+
+        ### Arguments
+         - `surface (pygame.Surface)`: Surface to draw the overlay on.
+         - `position [tuple (int, int)=(4, 4)]`: Top left corner of the overlay.
+
+        ### Returns
+        `pygame.Rect`: Drawn rectangle, or None if the overlay is not visible.
+        """
+        if not self.visible:
+            return None
+        if self._surface is None or self.profiler.frames - self._refreshed_at >= self.refresh_interval:
+            self._refresh()
+        return surface.blit(self._surface, position)
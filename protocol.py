@@ -0,0 +1,212 @@
+"""
+Binary protocol of the multiplayer server.
+
+Every message is a frame of a little-endian `uint32` body length, a `uint8` message type
+and the body. Bodies longer than the reader's limit are refused before they are buffered. Positions are quantized to `uint16` steps of the world size, so a moving
+bubble costs 8 bytes in a state update.
+"""
+import asyncio
+import struct
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from size import Size
+
+FRAME = struct.Struct('<IB')                 # body length, message type
+WELCOME_BODY = struct.Struct('<IHIId')       # player id, tick rate, world width, world height, quantum
+STATE_HEADER = struct.Struct('<IB')          # tick, flags
+INPUT_BODY = struct.Struct('<ff')            # target x, target y
+COUNT = struct.Struct('<I')
+
+WELCOME = 1
+STATE = 2
+INPUT = 3
+
+FULL_STATE = 0x01
+
+QUANTIZED_RANGE = 65535
+
+# Longest body that read_frame() accepts by default, enough for the full state of millions of foods
+MAX_BODY_LENGTH = 64 * 1024 * 1024
+
+
+def quantum_for(size: Size) -> float:
+    """
+    ### Returns
+    `float`: Length of a quantization step that covers the larger dimension of `size` with `uint16`.
+    """
+    return max(size.width, size.height) / QUANTIZED_RANGE
+
+
+def quantize(positions: np.ndarray, quantum: float) -> np.ndarray:
+    """
+    ### Arguments
+     - `positions (numpy.ndarray)`: (N, 2) array of world positions.
+     - `quantum (float)`: Length of a quantization step.
+
+    ### Returns
+    `numpy.ndarray`: (N, 2) `uint16` array of the quantized positions.
+    """
+    return np.clip(np.rint(positions / quantum), 0, QUANTIZED_RANGE).astype(np.uint16)
+
+
+def frame(message_type: int, body: bytes) -> bytes:
+    return FRAME.pack(len(body), message_type) + body
+
+
+async def read_frame(reader: asyncio.StreamReader, max_length: int = MAX_BODY_LENGTH) -> Tuple[int, bytes]:
+    """
+    ### Arguments
+     - `reader (asyncio.StreamReader)`: Stream of the connection.
+     - `max_length [int=MAX_BODY_LENGTH]`: Longest accepted body in bytes.
+
+    ### Returns
+    `tuple (int, bytes)`: Type and body of the next message.
+
+    ### Raises
+    `asyncio.IncompleteReadError`: If the connection is closed.
+    `ValueError`: If the body is longer than `max_length`. It is not read.
+    """
+    length, message_type = FRAME.unpack(await reader.readexactly(FRAME.size))
+    if length > max_length:
+        raise ValueError("Frame body of {} bytes is longer than {} bytes".format(length, max_length))
+    return message_type, await reader.readexactly(length)
+
+
+def _pack_ids(ids: np.ndarray) -> bytes:
+    return COUNT.pack(len(ids)) + ids.astype('<u4').tobytes()
+
+
+def _pack_entities(ids: np.ndarray, quantized: np.ndarray) -> bytes:
+    return COUNT.pack(len(ids)) + ids.astype('<u4').tobytes() + quantized.astype('<u2').tobytes()
+
+
+class DeltaEncoder:
+    """
+    Encodes the state updates of a tick as the difference from the previous update.
+
+    An update holds the bubbles whose quantized positions changed, the removed bubbles,
+    the spawned foods with their positions and the removed foods. Foods do not move, so
+    they are never sent again. Every client receives the same update, so it is encoded
+    once per tick. A client that joins or falls behind gets a full state instead.
+    """
+
+    def __init__(self):
+        self.tick = 0
+        self._bubble_ids = np.empty(0, dtype=np.int64)
+        self._bubble_positions = np.empty((0, 2), dtype=np.uint16)
+        self._food_ids = np.empty(0, dtype=np.int64)
+        self._food_positions = np.empty((0, 2), dtype=np.uint16)
+
+    def encode(self, tick: int, bubble_ids: np.ndarray, bubble_positions: np.ndarray,
+               food_ids: np.ndarray, food_positions: np.ndarray) -> bytes:
+        """
+        Encodes the update of a tick and remembers the state as the base of the next one.
+        ___
+
+        ### Arguments
+         - `tick (int)`: Number of the tick.
+         - `bubble_ids (numpy.ndarray)`: Ids of the bubbles.
+         - `bubble_positions (numpy.ndarray)`: (N, 2) `uint16` quantized bubble positions.
+         - `food_ids (numpy.ndarray)`: Ids of the living foods.
+         - `food_positions (numpy.ndarray)`: (M, 2) `uint16` quantized food positions.
+
+        ### Returns
+        `bytes`: Framed delta update.
+        """
+        order = np.argsort(bubble_ids, kind='stable')
+        bubble_ids = bubble_ids[order]
+        bubble_positions = bubble_positions[order]
+
+        previous_ids = self._bubble_ids
+        if len(previous_ids):
+            slots = np.minimum(np.searchsorted(previous_ids, bubble_ids), len(previous_ids) - 1)
+            known = previous_ids[slots] == bubble_ids
+            moved = ~known | np.any(self._bubble_positions[slots] != bubble_positions, axis=1)
+        else:
+            moved = np.ones(len(bubble_ids), dtype=np.bool_)
+        removed_bubbles = np.setdiff1d(previous_ids, bubble_ids, assume_unique=True)
+
+        spawned = ~np.isin(food_ids, self._food_ids, assume_unique=True)
+        removed_foods = np.setdiff1d(self._food_ids, food_ids, assume_unique=True)
+
+        self.tick = tick
+        self._bubble_ids = bubble_ids
+        self._bubble_positions = bubble_positions
+        self._food_ids = food_ids
+        self._food_positions = food_positions
+        return frame(STATE, STATE_HEADER.pack(tick, 0)
+                     + _pack_entities(bubble_ids[moved], bubble_positions[moved])
+                     + _pack_ids(removed_bubbles)
+                     + _pack_entities(food_ids[spawned], food_positions[spawned])
+                     + _pack_ids(removed_foods))
+
+    def full_state(self) -> bytes:
+        """
+        ### Returns
+        `bytes`: Framed full state of the last encoded tick, for the clients without a base.
+        """
+        no_ids = np.empty(0, dtype=np.int64)
+        return frame(STATE, STATE_HEADER.pack(self.tick, FULL_STATE)
+                     + _pack_entities(self._bubble_ids, self._bubble_positions)
+                     + _pack_ids(no_ids)
+                     + _pack_entities(self._food_ids, self._food_positions)
+                     + _pack_ids(no_ids))
+
+
+class ClientState:
+    """
+    State of the world as seen by a client, rebuilt from the state updates.
+    ___
+
+    ### Arguments
+     - `quantum [float=1.0]`: Length of a quantization step, as sent in the welcome message.
+    """
+
+    def __init__(self, quantum: float = 1.0):
+        self.quantum = quantum
+        self.tick: Optional[int] = None
+        self.bubbles: Dict[int, Tuple[float, float]] = {}
+        self.foods: Dict[int, Tuple[float, float]] = {}
+
+    def apply(self, body: bytes) -> None:
+        """
+        Applies the body of a state message.
+        ___
+
+        ### Arguments
+         - `body (bytes)`: Body of a `STATE` message.
+        """
+        tick, flags = STATE_HEADER.unpack_from(body)
+        offset = STATE_HEADER.size
+        if flags & FULL_STATE:
+            self.bubbles.clear()
+            self.foods.clear()
+
+        def read_ids():
+            nonlocal offset
+            count, = COUNT.unpack_from(body, offset)
+            offset += COUNT.size
+            ids = np.frombuffer(body, dtype='<u4', count=count, offset=offset)
+            offset += ids.nbytes
+            return ids
+
+        def read_positions(count):
+            nonlocal offset
+            positions = np.frombuffer(body, dtype='<u2', count=2 * count, offset=offset).reshape(count, 2)
+            offset += positions.nbytes
+            return positions * self.quantum
+
+        ids = read_ids()
+        self.bubbles.update(zip(ids.tolist(), map(tuple, read_positions(len(ids)).tolist())))
+        for bubble_id in read_ids().tolist():
+            self.bubbles.pop(bubble_id, None)
+        ids = read_ids()
+        self.foods.update(zip(ids.tolist(), map(tuple, read_positions(len(ids)).tolist())))
+        for food_id in read_ids().tolist():
+            self.foods.pop(food_id, None)
+        self.tick = tick
+
+    def __str__(self):
+        return "ClientState: tick={}, bubbles={}, foods={}".format(self.tick, len(self.bubbles), len(self.foods))
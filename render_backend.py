@@ -0,0 +1,54 @@
+"""
+Lazily loaded rendering backend.
+
+The simulation modules draw through this module instead of importing pygame, so they
+can be imported and run headless without loading pygame and SDL. pygame is imported on
+the first call of `load()`, i.e. when something is drawn for the first time.
+"""
+_pygame = None
+
+
+def load():
+    """
+    Imports pygame and its `gfxdraw` module on the first call.
+    ___
+
+    ### Returns
+    `module`: The `pygame` module.
+
+    ### Raises
+    `ImportError`: If pygame is not installed.
+    """
+    global _pygame
+    if _pygame is None:
+        import pygame
+        import pygame.gfxdraw
+        _pygame = pygame
+    return _pygame
+
+
+def gfxdraw():
+    """
+    ### Returns
+    `module`: The `pygame.gfxdraw` module.
+    """
+    return load().gfxdraw
+
+
+def is_loaded() -> bool:
+    """
+    ### Returns
+    `bool`: Whether the backend was loaded or not.
+    """
+    return _pygame is not None
+
+
+def main():
+    """ Created for test purposes """
+    print(is_loaded())
+    load()
+    print(is_loaded())
+
+
+if __name__ == '__main__':
+    main()
@@ -9,10 +9,13 @@ class Renderable:
      - `visible [bool=True]`: Visibility of object
     """
 
+    # Subclasses may declare `visible` in their own __slots__
+    __slots__ = ()
+
     def __init__(self, visible: bool = True):
         self.visible = visible
 
-    def render(self, surface, fps) -> None:
+    def render(self, surface, fps, alpha: float = 1.0) -> None:
         """
         Renders the object considering the properties of Renderable super class.
 
@@ -22,11 +25,12 @@ class Renderable:
         ### Arguments
          - `surface (pygame.surface.Surface)`: PyGame surface that the food will be drawn on.
          - `fps (int)`: The FPS (Frames per Second) value of the game
+         - `alpha [float=1.0]`: Fraction of a simulation tick to interpolate the moving objects with.
         """
         if self.visible:
-            self._draw(surface, fps)
+            self._draw(surface, fps, alpha)
         
-    def _draw(self, surface, fps) -> None:
+    def _draw(self, surface, fps, alpha) -> None:
         """
         Abstract method that draws the object if necessary conditions are met in `render()`.
 
@@ -36,6 +40,7 @@ class Renderable:
         ### Arguments
          - `surface (pygame.surface.Surface)`: PyGame surface that the food will be drawn on.
          - `fps (int)`: The FPS (Frames per Second) value of the game
+         - `alpha (float)`: Fraction of a simulation tick to interpolate the moving objects with.
 
         ### Raises
         `NotImplementedError`: If the method called without implementation, 
@@ -43,3 +48,57 @@ class Renderable:
         """
         raise NotImplementedError(
             "Class {} doesn't implement render()".format(self.__class__.__name__))
+
+    def render_sprites(self, sprite_batch, alpha: float = 1.0) -> None:
+        """
+        Queues the sprites of the object into a `SpriteBatch` instead of drawing them directly.
+
+        __Must ***NOT*** be implemented!__
+        ___
+
+        ### Arguments
+         - `sprite_batch (SpriteBatch)`: Batch that will draw the sprites.
+         - `alpha [float=1.0]`: Fraction of a simulation tick to interpolate the moving objects with.
+        """
+        if self.visible:
+            self._add_sprites(sprite_batch, alpha)
+
+    def _add_sprites(self, sprite_batch, alpha) -> None:
+        """
+        Abstract method that queues the sprites of the object if necessary conditions are met
+        in `render_sprites()`.
+
+        __This method must be implemented in the object class to be drawn in batches!__
+        ___
+
+        ### Arguments
+         - `sprite_batch (SpriteBatch)`: Batch that will draw the sprites.
+         - `alpha (float)`: Fraction of a simulation tick to interpolate the moving objects with.
+
+        ### Raises
+        `NotImplementedError`: If the method called without implementation, 
+                               NotImplementedError will be raised.
+        """
+        raise NotImplementedError(
+            "Class {} doesn't implement render_sprites()".format(self.__class__.__name__))
+
+    def bounding_rect(self, alpha: float = 1.0):
+        """
+        Rectangle that covers everything the object draws in the current frame.
+        Used by the dirty rectangle renderer to know which regions of the screen changed.
+
+        __This method must be implemented in the object class to be drawn with dirty rectangles!__
+        ___
+
+        ### Arguments
+         - `alpha [float=1.0]`: Fraction of a simulation tick to interpolate the moving objects with.
+
+        ### Returns
+        `pygame.Rect`: Bounding rectangle of the object
+
+        ### Raises
+        `NotImplementedError`: If the method called without implementation, 
+                               NotImplementedError will be raised.
+        """
+        raise NotImplementedError(
+            "Class {} doesn't implement bounding_rect()".format(self.__class__.__name__))
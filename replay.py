@@ -0,0 +1,438 @@
+"""
+Compact binary recording of game sessions and memory-mapped playback.
+
+A recording starts with a header of the world parameters and the food generator seed,
+followed by a stream of records:
+
+ - input records, written only on the ticks where the target or a toggle changed,
+ - keyframes, zlib-compressed `World.state()` snapshots every `keyframe_interval` ticks,
+
+and ends with an index of the keyframes. Seeking restores the nearest keyframe before
+the requested tick and re-simulates the ticks in between with the recorded inputs.
+"""
+import bisect
+import io
+import json
+import mmap
+import struct
+import zlib
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+from profiler import NullProfiler
+from size import Size
+from world import World
+
+MAGIC = b'FOBR'
+INDEX_MAGIC = b'FOBX'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sHI')                # magic, version, length of the JSON header
+_RECORD = struct.Struct('<cI')                  # record tag, tick
+_KEYFRAME = struct.Struct('<I')                 # length of the compressed state
+_INPUT_FLAGS = struct.Struct('<B')
+_INTEGER_TARGET = struct.Struct('<hh')
+_FLOAT_TARGET = struct.Struct('<dd')
+_INDEX_ENTRY = struct.Struct('<IQ')             # keyframe tick, offset of its record
+_FOOTER = struct.Struct('<IIQ4s')               # keyframes, recorded ticks, offset of the index, magic
+
+KEYFRAME_TAG = b'K'
+INPUT_TAG = b'I'
+
+TARGET_VISIBLE = 0x01
+BUBBLE_VISIBLE = 0x02
+INTEGER_TARGET = 0x04
+
+
+class TickInput:
+    """
+    Player input that was in effect during a tick.
+    ___
+
+    ### Arguments
+     - `target_x (float)`: X coordinate of the target.
+     - `target_y (float)`: Y coordinate of the target.
+     - `target_visible [bool=False]`: State of the 't' toggle.
+     - `bubble_visible [bool=True]`: State of the 'v' toggle.
+    """
+
+    __slots__ = ('target_x', 'target_y', 'target_visible', 'bubble_visible')
+
+    def __init__(self, target_x: float, target_y: float, target_visible: bool = False,
+                 bubble_visible: bool = True):
+        self.target_x = target_x
+        self.target_y = target_y
+        self.target_visible = target_visible
+        self.bubble_visible = bubble_visible
+
+    def pack(self) -> bytes:
+        """
+        ### Returns
+        `bytes`: Flags and target position. Integral positions, like the ones of the mouse,
+        take 4 bytes instead of 16.
+        """
+        flags = (TARGET_VISIBLE if self.target_visible else 0) | (BUBBLE_VISIBLE if self.bubble_visible else 0)
+        x, y = self.target_x, self.target_y
+        if float(x).is_integer() and float(y).is_integer() and -32768 <= x < 32768 and -32768 <= y < 32768:
+            return _INPUT_FLAGS.pack(flags | INTEGER_TARGET) + _INTEGER_TARGET.pack(int(x), int(y))
+        return _INPUT_FLAGS.pack(flags) + _FLOAT_TARGET.pack(x, y)
+
+    @staticmethod
+    def unpack_from(buffer, offset: int) -> Tuple['TickInput', int]:
+        """
+        ### Returns
+        `tuple (TickInput, int)`: Input packed at `offset` and the offset after it.
+        """
+        flags, = _INPUT_FLAGS.unpack_from(buffer, offset)
+        offset += _INPUT_FLAGS.size
+        target = _INTEGER_TARGET if flags & INTEGER_TARGET else _FLOAT_TARGET
+        x, y = target.unpack_from(buffer, offset)
+        tick_input = TickInput(x, y, bool(flags & TARGET_VISIBLE), bool(flags & BUBBLE_VISIBLE))
+        return tick_input, offset + target.size
+
+    def apply(self, world: World) -> None:
+        world.target.set(self.target_x, self.target_y)
+
+    def __eq__(self, other):
+        return isinstance(other, TickInput) and (
+            self.target_x, self.target_y, self.target_visible, self.bubble_visible) == (
+            other.target_x, other.target_y, other.target_visible, other.bubble_visible)
+
+    def __str__(self):
+        return "TickInput: target=({}, {}), target_visible={}, bubble_visible={}".format(
+            self.target_x, self.target_y, self.target_visible, self.bubble_visible)
+
+
+def encode_state(state: dict) -> bytes:
+    """
+    Serializes a nested state dictionary. The NumPy arrays are stored as raw bytes after
+    a JSON document of everything else, then the whole is compressed.
+    ___
+
+    ### Arguments
+     - `state (dict)`: State of JSON compatible values and NumPy arrays.
+
+    ### Returns
+    `bytes`: Compressed state.
+    """
+    arrays: List[np.ndarray] = []
+
+    def replace_arrays(value):
+        if isinstance(value, np.ndarray):
+            arrays.append(np.ascontiguousarray(value))
+            return {'__array__': len(arrays) - 1, 'dtype': value.dtype.str, 'shape': value.shape}
+        if isinstance(value, dict):
+            return {key: replace_arrays(item) for key, item in value.items()}
+        return value
+
+    document = json.dumps(replace_arrays(state)).encode()
+    output = io.BytesIO()
+    output.write(struct.pack('<I', len(document)))
+    output.write(document)
+    for array in arrays:
+        output.write(array.tobytes())
+    return zlib.compress(output.getvalue())
+
+
+def decode_state(data: bytes) -> dict:
+    """
+    ### Arguments
+     - `data (bytes)`: State compressed by `encode_state()`.
+
+    ### Returns
+    `dict`: The state, with copies of the arrays.
+    """
+    data = zlib.decompress(data)
+    length, = struct.unpack_from('<I', data)
+    offset = 4 + length
+    document = json.loads(data[4:offset])
+
+    def restore_arrays(value):
+        nonlocal offset
+        if isinstance(value, dict) and '__array__' in value:
+            dtype = np.dtype(value['dtype'])
+            count = int(np.prod(value['shape'], dtype=np.int64))
+            array = np.frombuffer(data, dtype=dtype, count=count, offset=offset).reshape(value['shape']).copy()
+            offset += count * dtype.itemsize
+            return array
+        if isinstance(value, dict):
+            return {key: restore_arrays(item) for key, item in value.items()}
+        return value
+
+    # The arrays follow the document in the order of its keys, which json preserves
+    return restore_arrays(document)
+
+
+class ReplayRecorder:
+    """
+    Writes a session of `world` to a replay file. Call `record()` with the current
+    input before every `world.step()`, and `close()` at the end.
+    ___
+
+    ### Arguments
+     - `path (str)`: Output file path.
+     - `world (World)`: World to be recorded. Its food generator seed goes to the header.
+     - `fps (int)`: Simulation ticks per second of the session.
+     - `keyframe_interval [int=600]`: Number of ticks between the keyframes.
+    """
+
+    def __init__(self, path: str, world: World, fps: int, keyframe_interval: int = 600):
+        self.world = world
+        self.keyframe_interval = keyframe_interval
+        self.keyframes: List[Tuple[int, int]] = []
+        self.ticks = 0
+        self._last_input: TickInput = None
+        self._file = open(path, 'wb')
+
+        header = json.dumps({
+            'size': world.size.as_tuple(),
+            'fps': fps,
+            'seed': world.food_generator.seed,
+            'generation_rate': world.food_generator.generation_rate,
+            'max_velocity': world.bubble.max_velocity,
+            'easing': world.easing,
+            'swept_collision': world.swept_collision,
+            'keyframe_interval': keyframe_interval,
+        }).encode()
+        self._file.write(_HEADER.pack(MAGIC, VERSION, len(header)))
+        self._file.write(header)
+
+    def record(self, tick_input: TickInput) -> None:
+        """
+        Records the input of the upcoming tick, and a keyframe if one is due.
+        ___
+
+        ### Arguments
+         - `tick_input (TickInput)`: Input in effect during the upcoming tick.
+        """
+        tick = self.world.tick
+        if tick % self.keyframe_interval == 0 or not self.keyframes:
+            data = encode_state(self.world.state())
+            self.keyframes.append((tick, self._file.tell()))
+            self._file.write(_RECORD.pack(KEYFRAME_TAG, tick))
+            self._file.write(_KEYFRAME.pack(len(data)))
+            self._file.write(data)
+            # Every keyframe is followed by the input in effect, so playback can start there
+            self._last_input = None
+
+        if tick_input != self._last_input:
+            self._file.write(_RECORD.pack(INPUT_TAG, tick))
+            self._file.write(tick_input.pack())
+            self._last_input = TickInput(tick_input.target_x, tick_input.target_y,
+                                         tick_input.target_visible, tick_input.bubble_visible)
+        self.ticks = tick + 1
+
+    def close(self) -> None:
+        """
+        Writes the keyframe index and closes the file.
+        """
+        if self._file.closed:
+            return
+        index_offset = self._file.tell()
+        for tick, offset in self.keyframes:
+            self._file.write(_INDEX_ENTRY.pack(tick, offset))
+        self._file.write(_FOOTER.pack(len(self.keyframes), self.ticks, index_offset, INDEX_MAGIC))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+class Replay:
+    """
+    Memory-mapped replay file. Only the keyframe index is read up front, the records are
+    read from the mapping while seeking and playing.
+    ___
+
+    ### Arguments
+     - `path (str)`: Replay file path.
+
+    ### Raises
+    `ValueError`: If the file is not a replay.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, 'rb')
+        self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, length = _HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("{} is not a version {} replay".format(path, VERSION))
+        self.header = json.loads(self._buffer[_HEADER.size:_HEADER.size + length])
+        self.fps = self.header['fps']
+        self._records_offset = _HEADER.size + length
+        self._records_end = len(self._buffer)
+
+        footer_offset = len(self._buffer) - _FOOTER.size
+        footer = _FOOTER.unpack_from(self._buffer, footer_offset) if footer_offset >= self._records_offset else None
+        if footer is not None and footer[3] == INDEX_MAGIC:
+            n_keyframes, self.ticks, index_offset, _ = footer
+            self.keyframes = [_INDEX_ENTRY.unpack_from(self._buffer, index_offset + i * _INDEX_ENTRY.size)
+                              for i in range(n_keyframes)]
+            self._records_end = index_offset
+        else:
+            # An unfinished recording, index it by scanning the records
+            self.keyframes = []
+            self.ticks = 0
+            for tag, tick, offset, _ in self._records(self._records_offset):
+                if tag == KEYFRAME_TAG:
+                    self.keyframes.append((tick, offset))
+                self.ticks = tick + 1
+        if not self.keyframes:
+            raise ValueError("{} has no keyframes".format(path))
+        self._keyframe_ticks = [tick for tick, _ in self.keyframes]
+
+    def _records(self, offset: int) -> Iterator[Tuple[bytes, int, int, object]]:
+        """
+        ### Returns
+        `Iterator[tuple (bytes, int, int, object)]`: Tag, tick, offset and payload of the records
+        from `offset` on. The payload is the `TickInput` of the input records and the compressed
+        state of the keyframes.
+        """
+        buffer = self._buffer
+        end = self._records_end
+        while offset + _RECORD.size <= end:
+            tag, tick = _RECORD.unpack_from(buffer, offset)
+            start = offset
+            offset += _RECORD.size
+            if tag == KEYFRAME_TAG:
+                length, = _KEYFRAME.unpack_from(buffer, offset)
+                offset += _KEYFRAME.size
+                if offset + length > end:
+                    return
+                payload = buffer[offset:offset + length]
+                offset += length
+            elif tag == INPUT_TAG:
+                payload, offset = TickInput.unpack_from(buffer, offset)
+            else:
+                raise ValueError("Unknown record {!r} at offset {}".format(tag, start))
+            yield tag, tick, start, payload
+
+    def create_world(self, profiler=None) -> World:
+        """
+        ### Returns
+        `World`: A new world with the recorded parameters.
+        """
+        header = self.header
+        return World(Size(*header['size']), generation_rate=header['generation_rate'], seed=header['seed'],
+                     profiler=profiler, max_velocity=header['max_velocity'], easing=header['easing'],
+                     swept_collision=header.get('swept_collision', False))
+
+    def seek(self, tick: int, profiler=None) -> 'ReplayPlayer':
+        """
+        Restores the nearest keyframe at or before `tick` and re-simulates from there.
+        ___
+
+        ### Arguments
+         - `tick (int)`: Tick to seek to, clamped to the recorded ticks.
+         - `profiler [FrameProfiler=None]`: Profiler of the world.
+
+        ### Returns
+        `ReplayPlayer`: Player whose world is at the start of `tick`.
+        """
+        tick = max(0, min(tick, self.ticks))
+        keyframe = max(0, bisect.bisect_right(self._keyframe_ticks, tick) - 1)
+        keyframe_tick, offset = self.keyframes[keyframe]
+
+        world = self.create_world(profiler)
+        records = self._records(offset)
+        _, _, _, data = next(records)
+        world.restore(decode_state(data))
+
+        player = ReplayPlayer(self, world, records)
+        world.profiler = NullProfiler()
+        while world.tick < tick and player.step():
+            pass
+        world.profiler = profiler if profiler is not None else NullProfiler()
+        return player
+
+    def close(self) -> None:
+        self._buffer.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def __str__(self):
+        return "Replay: ticks={}, keyframes={}, seed={}".format(self.ticks, len(self.keyframes), self.header['seed'])
+
+
+class ReplayPlayer:
+    """
+    Steps a world with the recorded inputs. Created by `Replay.seek()`.
+    ___
+
+    ### Arguments
+     - `replay (Replay)`: Replay being played.
+     - `world (World)`: World restored from a keyframe.
+     - `records (Iterator)`: Records after the keyframe.
+    """
+
+    def __init__(self, replay: Replay, world: World, records: Iterator):
+        self.replay = replay
+        self.world = world
+        self.tick_input: TickInput = None
+        self._records = records
+        self._next_record = next(records, None)
+        self._read_inputs()
+
+    def _read_inputs(self) -> None:
+        # Takes the input of the current tick from the records up to it
+        record = self._next_record
+        while record is not None and record[1] <= self.world.tick:
+            if record[0] == INPUT_TAG:
+                self.tick_input = record[3]
+            record = next(self._records, None)
+        self._next_record = record
+
+    def step(self) -> bool:
+        """
+        Applies the input of the current tick and advances the world by a tick.
+        ___
+
+        ### Returns
+        `bool`: False if the recording has ended and the world was not advanced.
+        """
+        world = self.world
+        if world.tick >= self.replay.ticks:
+            return False
+        self._read_inputs()
+        self.tick_input.apply(world)
+        world.step(self.replay.fps)
+        return True
+
+
+def main():
+    """ Created for test purposes """
+    import os
+    import tempfile
+    from world import RandomPilot
+
+    path = os.path.join(tempfile.gettempdir(), 'feed_or_breed.replay')
+    world = World(Size(900, 675), seed=3)
+    pilot = RandomPilot(3)
+    with ReplayRecorder(path, world, 60) as recorder:
+        for _ in range(6000):
+            pilot.update(world)
+            recorder.record(TickInput(world.target.x, world.target.y))
+            world.step(60)
+    print(world, os.path.getsize(path), "bytes")
+
+    with Replay(path) as replay:
+        player = replay.seek(4321)
+        while player.step():
+            pass
+        print(replay, player.world)
+
+
+if __name__ == '__main__':
+    main()
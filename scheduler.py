@@ -0,0 +1,125 @@
+import heapq
+from typing import Dict, Hashable, Iterable, List, Set
+
+
+class ExpiryScheduler:
+    """
+    Scheduler of timed events keyed by their absolute expiry tick.
+
+    Keys that expire on the same tick share a bucket, and a heap keeps the distinct
+    ticks in order. Scheduling and cancelling are O(1) for an existing bucket, and
+    `advance()` only touches the buckets that are due, so its cost is O(expired)
+    instead of O(scheduled). Any kind of timed effect can be scheduled with its own key.
+    ___
+
+    ### Arguments
+     - `tick [int=0]`: Current tick.
+    """
+
+    def __init__(self, tick: int = 0):
+        self.tick = tick
+        self._ticks: List[int] = []
+        self._buckets: Dict[int, Set[Hashable]] = {}
+        self._expiry_of: Dict[Hashable, int] = {}
+
+    def schedule(self, key: Hashable, at_tick: int) -> None:
+        """
+        Schedules `key` to expire on `at_tick`. A scheduled key is rescheduled.
+        ___
+
+        ### Arguments
+         - `key (Hashable)`: Key of the event.
+         - `at_tick (int)`: Absolute tick of the expiry. Past ticks expire on the next `advance()`.
+        """
+        if key in self._expiry_of:
+            self.cancel(key)
+        self._bucket(at_tick).add(key)
+        self._expiry_of[key] = at_tick
+
+    def schedule_many(self, keys: Iterable[Hashable], at_tick: int) -> None:
+        """
+        Schedules every key in `keys` to expire on `at_tick`. The keys must not be scheduled already.
+        ___
+
+        ### Arguments
+         - `keys (Iterable[Hashable])`: Keys of the events.
+         - `at_tick (int)`: Absolute tick of the expiry.
+        """
+        keys = list(keys)
+        self._bucket(at_tick).update(keys)
+        self._expiry_of.update(dict.fromkeys(keys, at_tick))
+
+    def _bucket(self, at_tick: int) -> Set[Hashable]:
+        bucket = self._buckets.get(at_tick)
+        if bucket is None:
+            bucket = self._buckets[at_tick] = set()
+            heapq.heappush(self._ticks, at_tick)
+        return bucket
+
+    def cancel(self, key: Hashable) -> bool:
+        """
+        Cancels the expiry of `key`. Emptied buckets are dropped lazily by `advance()`.
+        ___
+
+        ### Returns
+        `bool`: Whether the key was scheduled or not.
+        """
+        at_tick = self._expiry_of.pop(key, None)
+        if at_tick is None:
+            return False
+        self._buckets[at_tick].discard(key)
+        return True
+
+    def expiry_tick(self, key: Hashable) -> int:
+        """
+        ### Returns
+        `int`: Tick that `key` expires on.
+
+        ### Raises
+        `KeyError`: If the key is not scheduled.
+        """
+        return self._expiry_of[key]
+
+    def advance(self, to_tick: int = None) -> List[Hashable]:
+        """
+        Moves the current tick forward and collects the keys that expired on the way.
+        ___
+
+        ### Arguments
+         - `to_tick [int=None]`: New current tick. (None) for the next tick.
+
+        ### Returns
+        `List[Hashable]`: Expired keys, in the order of their expiry ticks.
+        """
+        self.tick = self.tick + 1 if to_tick is None else max(self.tick, to_tick)
+        expired = []
+        ticks = self._ticks
+        while ticks and ticks[0] <= self.tick:
+            bucket = self._buckets.pop(heapq.heappop(ticks))
+            for key in bucket:
+                del self._expiry_of[key]
+            expired.extend(bucket)
+        return expired
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._expiry_of
+
+    def __len__(self) -> int:
+        return len(self._expiry_of)
+
+    def __str__(self):
+        return "ExpiryScheduler: tick={}, scheduled={}, buckets={}".format(
+            self.tick, len(self), len(self._buckets))
+
+
+def main():
+    """ Created for test purposes """
+    scheduler = ExpiryScheduler()
+    scheduler.schedule_many(['food 1', 'food 2'], 3)
+    scheduler.schedule('effect', 1)
+    print(scheduler)
+    print(scheduler.advance(), scheduler.advance(5), scheduler)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+"""
+Headless authoritative multiplayer server.
+
+    python server.py --port 8765 --world-scale 2
+
+The arena runs at a fixed tick rate. Clients connect over TCP, get a welcome message
+with their player id, then send `INPUT` messages with the target of their bubble in
+world coordinates. After every tick, a delta-compressed state update is broadcast to
+every client. See `protocol.py` for the messages.
+"""
+import argparse
+import asyncio
+import struct
+import time
+from typing import Dict
+
+import protocol
+from arena import Arena
+from profiler import FrameProfiler
+from size import Size
+
+SURFACE_SIZE = Size(900, 675)
+FPS = 60
+SERVER_PHASES = ('generation', 'expiry', 'targeting', 'steering', 'feeding', 'encoding', 'broadcast')
+# Longest message body accepted from a client, the inputs are a few bytes
+MAX_CLIENT_BODY = 1024
+
+
+class ClientConnection:
+    """
+    Connection of a single player.
+    ___
+
+    ### Arguments
+     - `player_id (int)`: Id of the player's bubble in the arena.
+     - `writer (asyncio.StreamWriter)`: Stream of the connection.
+    """
+
+    __slots__ = ('player_id', 'writer', 'needs_full_state', 'bytes_sent', 'connected_at')
+
+    def __init__(self, player_id: int, writer: asyncio.StreamWriter):
+        self.player_id = player_id
+        self.writer = writer
+        self.needs_full_state = True
+        self.bytes_sent = 0
+        self.connected_at = time.perf_counter()
+
+    def send(self, data: bytes) -> None:
+        self.writer.write(data)
+        self.bytes_sent += len(data)
+
+
+class GameServer:
+    """
+    Runs an `Arena` at a fixed tick rate and broadcasts its state to the connected clients.
+
+    The update of a tick is encoded once and written to every client without awaiting
+    them. A client whose unsent data grows over `max_buffer` bytes is skipped until it
+    catches up, then it is resynchronized with a full state.
+    ___
+
+    ### Arguments
+     - `arena (Arena)`: Simulated arena.
+     - `tick_rate [int=FPS]`: Simulation ticks per second.
+     - `max_buffer [int=262144]`: Unsent bytes above which a client is skipped.
+    """
+
+    def __init__(self, arena: Arena, tick_rate: int = FPS, max_buffer: int = 256 * 1024):
+        self.arena = arena
+        self.tick_rate = tick_rate
+        self.max_buffer = max_buffer
+        self.quantum = protocol.quantum_for(arena.size)
+        self.encoder = protocol.DeltaEncoder()
+        self.clients: Dict[int, ClientConnection] = {}
+        self.profiler = FrameProfiler(SERVER_PHASES, capacity=tick_rate * 60)
+        self.late_ticks = 0
+        self.resyncs = 0
+        self.bytes_sent = 0
+        self.departed_client_seconds = 0.0
+        arena.profiler = self.profiler
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Adds a player for the connection and applies its inputs until it disconnects.
+        A client that sends a malformed or oversized message is disconnected.
+        """
+        player_id = self.arena.add_player()
+        client = ClientConnection(player_id, writer)
+        size = self.arena.size
+        client.send(protocol.frame(protocol.WELCOME, protocol.WELCOME_BODY.pack(
+            player_id, self.tick_rate, size.width, size.height, self.quantum)))
+        self.clients[player_id] = client
+        try:
+            while True:
+                message_type, body = await protocol.read_frame(reader, MAX_CLIENT_BODY)
+                if message_type == protocol.INPUT:
+                    self.arena.set_target(player_id, *protocol.INPUT_BODY.unpack(body))
+        except (asyncio.IncompleteReadError, ConnectionError, struct.error, ValueError):
+            pass
+        finally:
+            del self.clients[player_id]
+            self.arena.remove_player(player_id)
+            self.bytes_sent += client.bytes_sent
+            self.departed_client_seconds += time.perf_counter() - client.connected_at
+            writer.close()
+
+    def tick(self) -> None:
+        """
+        Steps the arena and broadcasts the update of the tick.
+        """
+        arena = self.arena
+        profiler = self.profiler
+        arena.step(self.tick_rate)
+
+        with profiler.phase('encoding'):
+            players = arena.players
+            update = self.encoder.encode(
+                arena.tick,
+                players.ids.copy(),
+                protocol.quantize(players.positions, self.quantum),
+                arena.foods.ids().copy(),
+                protocol.quantize(arena.foods.positions(), self.quantum))
+
+        with profiler.phase('broadcast'):
+            full_state = None
+            for client in self.clients.values():
+                if client.writer.transport.get_write_buffer_size() > self.max_buffer:
+                    if not client.needs_full_state:
+                        client.needs_full_state = True
+                        self.resyncs += 1
+                elif client.needs_full_state:
+                    if full_state is None:
+                        full_state = self.encoder.full_state()
+                    client.send(full_state)
+                    client.needs_full_state = False
+                else:
+                    client.send(update)
+        profiler.end_frame()
+
+    async def run_ticks(self) -> None:
+        """
+        Ticks at the fixed rate. Late ticks are caught up, up to a quarter of a second.
+        """
+        loop = asyncio.get_running_loop()
+        tick_duration = 1 / self.tick_rate
+        next_tick = loop.time()
+        while True:
+            self.tick()
+            next_tick += tick_duration
+            delay = next_tick - loop.time()
+            if delay < 0:
+                self.late_ticks += 1
+                next_tick = max(next_tick, loop.time() - 0.25)
+            await asyncio.sleep(max(delay, 0))
+
+    def statistics(self) -> str:
+        """
+        ### Returns
+        `str`: Tick times, client count and the bytes sent per client per second.
+        """
+        summary = self.profiler.summary()['frame']
+        now = time.perf_counter()
+        client_seconds = self.departed_client_seconds + sum(now - client.connected_at
+                                                            for client in self.clients.values())
+        bytes_sent = self.bytes_sent + sum(client.bytes_sent for client in self.clients.values())
+        per_client = bytes_sent / client_seconds if client_seconds > 0 else 0.0
+        return ("tick={} clients={} tick p50={:.3f} ms p99={:.3f} ms late={} resyncs={} "
+                "bytes/client/s={:.0f}").format(self.arena.tick, len(self.clients), summary['p50'],
+                                                summary['p99'], self.late_ticks, self.resyncs, per_client)
+
+
+async def serve(host: str, port: int, server: GameServer, stats_interval: float = 5) -> None:
+    tcp_server = await asyncio.start_server(server.handle_client, host, port)
+    ticks = asyncio.ensure_future(server.run_ticks())
+    try:
+        async with tcp_server:
+            while True:
+                done, _ = await asyncio.wait((ticks,), timeout=stats_interval)
+                if done:
+                    # The tick loop only ends with an error, raised here instead of freezing the world silently
+                    ticks.result()
+                print(server.statistics(), flush=True)
+    finally:
+        ticks.cancel()
+
+
+def parse_arguments(arguments=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Feed or Breed multiplayer server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--tick-rate', type=int, default=FPS, help="simulation ticks per second")
+    parser.add_argument('--world-scale', type=float, default=2, help="size of the world relative to the screen")
+    parser.add_argument('--generation-rate', type=float, default=20, help="foods generated per second")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--ai-players', type=int, default=0, help="bubbles steered to their nearest food")
+    parser.add_argument('--lod-interval', type=int, default=4,
+                        help="ticks between the steps of the bubbles outside every viewport, 1 to step all every tick")
+    parser.add_argument('--stats-interval', type=float, default=5, help="seconds between the statistics lines")
+    return parser.parse_args(arguments)
+
+
+def main():
+    arguments = parse_arguments()
+    size = Size(int(SURFACE_SIZE.width * arguments.world_scale), int(SURFACE_SIZE.height * arguments.world_scale))
+    arena = Arena(size, arguments.generation_rate, arguments.seed, view_size=SURFACE_SIZE,
+                  lod_interval=arguments.lod_interval)
+    for _ in range(arguments.ai_players):
+        arena.add_player(ai=True)
+    server = GameServer(arena, arguments.tick_rate)
+    print("Serving on {}:{}".format(arguments.host, arguments.port), flush=True)
+    try:
+        asyncio.run(serve(arguments.host, arguments.port, server, arguments.stats_interval))
+    except KeyboardInterrupt:
+        pass
+    print(server.statistics(), flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,22 +3,41 @@ from typing import Tuple
 class Size:
     """
     A basic class for simplifying size operations.
+
+    Sizes are immutable, so a single instance can be shared by many objects and
+    its tuple form is built only once.
     ___
-    
+
     ### Arguments
     - `width (int)`: Width of the size.
     - `height (int)`: Height of the size.
     """
+
+    __slots__ = ('_tuple',)
+
     def __init__(self, width, height):
-        self.width = width
-        self.height = height
+        self._tuple = (width, height)
+
+    @property
+    def width(self):
+        return self._tuple[0]
+
+    @property
+    def height(self):
+        return self._tuple[1]
 
     def as_tuple(self) -> Tuple[int, int]:
         """
         ### Returns
         `tuple (int, int)`: Size in tuple form as (width, height)
         """
-        return self.width, self.height
+        return self._tuple
+
+    def __eq__(self, other):
+        return isinstance(other, Size) and other._tuple == self._tuple
+
+    def __hash__(self):
+        return hash(self._tuple)
 
     def __str__(self):
         return "Size: width={:4}, height={:4}".format(self.width, self.height)
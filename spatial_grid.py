@@ -0,0 +1,188 @@
+import math
+from typing import Dict, Hashable, Iterator, Tuple
+
+from position import Position
+from size import Size
+
+
+class SpatialGrid:
+    """
+    Uniform grid spatial index for the circular objects in the game.
+
+    Items are bucketed by the cell their center falls into. A circle query only
+    visits the cells that the circle (grown by the biggest inserted radius) overlaps,
+    so the cost of a query depends on the local density instead of the total count.
+    ___
+
+    ### Arguments
+     - `world_size (Size)`: Size of the indexed area.
+     - `cell_size (float)`: Edge length of a single square cell.
+    """
+
+    def __init__(self, world_size: Size, cell_size: float):
+        if cell_size <= 0:
+            raise ValueError("Cell size must be positive, got {}".format(cell_size))
+        self.world_size = world_size
+        self.cell_size = cell_size
+        self.columns = max(1, math.ceil(world_size.width / cell_size))
+        self.rows = max(1, math.ceil(world_size.height / cell_size))
+        self.max_radius = 0.0
+        self._cells: Dict[Tuple[int, int], Dict[Hashable, Tuple[float, float, float]]] = {}
+        self._item_cells: Dict[Hashable, Tuple[int, int]] = {}
+
+    @staticmethod
+    def for_radii(world_size: Size, food_radius: float, bubble_radius: float) -> 'SpatialGrid':
+        """
+        Creates a grid whose cells are big enough that a bubble circle, grown by the
+        food radius, overlaps at most 2x2 cells.
+        ___
+
+        ### Arguments
+         - `world_size (Size)`: Size of the indexed area.
+         - `food_radius (float)`: Radius of the indexed foods.
+         - `bubble_radius (float)`: Radius of the querying bubbles.
+
+        ### Returns
+        `SpatialGrid`: Grid sized for the given radii.
+        """
+        return SpatialGrid(world_size, 2 * (food_radius + bubble_radius))
+
+    def cell_of(self, x: float, y: float) -> Tuple[int, int]:
+        """
+        ### Returns
+        `tuple (int, int)`: Column and row of the cell containing (`x`, `y`), clamped to the grid.
+        """
+        column = min(max(int(x // self.cell_size), 0), self.columns - 1)
+        row = min(max(int(y // self.cell_size), 0), self.rows - 1)
+        return column, row
+
+    def insert(self, item: Hashable, position: Position, radius: float) -> None:
+        """
+        Adds `item` to the grid. Inserting an already indexed item moves it.
+        ___
+
+        ### Arguments
+         - `item (Hashable)`: Object to be indexed.
+         - `position (Position)`: Center of the item.
+         - `radius (float)`: Radius of the item.
+        """
+        self.insert_point(item, position.x, position.y, radius)
+
+    def insert_point(self, item: Hashable, x: float, y: float, radius: float) -> None:
+        """
+        Same as `insert()`, with the center given as coordinates.
+        ___
+
+        ### Arguments
+         - `item (Hashable)`: Object to be indexed.
+         - `x (float)`: Center of the item in X axis.
+         - `y (float)`: Center of the item in Y axis.
+         - `radius (float)`: Radius of the item.
+        """
+        if item in self._item_cells:
+            self.remove(item)
+        cell = self.cell_of(x, y)
+        self._cells.setdefault(cell, {})[item] = (x, y, radius)
+        self._item_cells[item] = cell
+        if radius > self.max_radius:
+            self.max_radius = radius
+
+    def remove(self, item: Hashable) -> bool:
+        """
+        Removes `item` from the grid.
+        ___
+
+        ### Returns
+        `bool`: Whether the item was indexed or not.
+        """
+        cell = self._item_cells.pop(item, None)
+        if cell is None:
+            return False
+        bucket = self._cells[cell]
+        del bucket[item]
+        if not bucket:
+            del self._cells[cell]
+        return True
+
+    def query(self, position: Position, radius: float) -> Iterator[Tuple[Hashable, float, float, float]]:
+        """
+        Yields the items in the cells that the circle at `position` overlaps.
+        This is a broad phase, yielded items are only candidates. Items may be recycled by
+        their owner once removed, like the `FoodView`s of a `FoodField`, so they should not
+        be kept after the grid changes.
+        ___
+
+        ### Arguments
+         - `position (Position)`: Center of the query circle.
+         - `radius (float)`: Radius of the query circle.
+
+        ### Returns
+        `Iterator[tuple (item, x, y, radius)]`: Candidate items with their stored geometry.
+        """
+        reach = radius + self.max_radius
+        min_column, min_row = self.cell_of(position.x - reach, position.y - reach)
+        max_column, max_row = self.cell_of(position.x + reach, position.y + reach)
+        cells = self._cells
+        for column in range(min_column, max_column + 1):
+            for row in range(min_row, max_row + 1):
+                bucket = cells.get((column, row))
+                if bucket is not None:
+                    for item, (x, y, item_radius) in bucket.items():
+                        yield item, x, y, item_radius
+
+    def query_rect(self, left: float, top: float, right: float,
+                   bottom: float) -> Iterator[Tuple[Hashable, float, float, float]]:
+        """
+        Yields the items whose bounding squares intersect the rectangle, e.g. the ones in
+        the viewport of a camera. Only the cells under the rectangle are visited. Like with
+        `query()`, the items should not be kept after the grid changes.
+        ___
+
+        ### Arguments
+         - `left (float)`: Left edge of the rectangle.
+         - `top (float)`: Top edge of the rectangle.
+         - `right (float)`: Right edge of the rectangle.
+         - `bottom (float)`: Bottom edge of the rectangle.
+
+        ### Returns
+        `Iterator[tuple (item, x, y, radius)]`: Intersecting items with their stored geometry.
+        """
+        reach = self.max_radius
+        min_column, min_row = self.cell_of(left - reach, top - reach)
+        max_column, max_row = self.cell_of(right + reach, bottom + reach)
+        cells = self._cells
+        for column in range(min_column, max_column + 1):
+            for row in range(min_row, max_row + 1):
+                bucket = cells.get((column, row))
+                if bucket is not None:
+                    for item, (x, y, radius) in bucket.items():
+                        if x + radius >= left and x - radius <= right and y + radius >= top and y - radius <= bottom:
+                            yield item, x, y, radius
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._item_cells
+
+    def __len__(self) -> int:
+        return len(self._item_cells)
+
+    def clear(self) -> None:
+        """ Removes every item from the grid. """
+        self._cells.clear()
+        self._item_cells.clear()
+        self.max_radius = 0.0
+
+    def __str__(self):
+        s = "SpatialGrid: cell_size={}, columns={}, rows={}, items={}"
+        return s.format(self.cell_size, self.columns, self.rows, len(self))
+
+
+def main():
+    """ Created for test purposes """
+    grid = SpatialGrid.for_radii(Size(900, 675), 5, 10)
+    grid.insert('food', Position(100, 100), 5)
+    print(grid)
+    print(list(grid.query(Position(110, 100), 10)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+import sys
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Tuple
+
+import numpy as np
+
+import render_backend
+
+if TYPE_CHECKING:
+    import pygame
+
+
+class SpriteCache:
+    """
+    Least recently used cache of pre-rendered anti-aliased circles.
+
+    Each (radius, color, antialiased) key is rasterized once with `gfxdraw` into a
+    per-pixel alpha surface, so drawing a circle becomes a plain blit.
+    ___
+
+    ### Arguments
+     - `max_entries [int=256]`: Number of sprites to keep before evicting the least recently used one.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        if max_entries <= 0:
+            raise ValueError("Max entries must be positive, got {}".format(max_entries))
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._sprites: 'OrderedDict[Tuple[int, tuple, bool], pygame.Surface]' = OrderedDict()
+
+    @staticmethod
+    def rasterize(radius: int, color: tuple, antialiased: bool = True) -> 'pygame.Surface':
+        """
+        Draws a filled circle onto a new transparent surface.
+        The circle center is at (`radius`, `radius`) of the surface.
+        ___
+
+        ### Arguments
+         - `radius (int)`: Radius of the circle.
+         - `color (tuple)`: Color of the circle as (red, green, blue, [alpha]).
+         - `antialiased [bool=True]`: Whether to draw the anti-aliased outline or not.
+
+        ### Returns
+        `pygame.Surface`: Per-pixel alpha surface of the circle.
+        """
+        pygame = render_backend.load()
+        sprite = pygame.Surface((2 * radius + 2, 2 * radius + 2), pygame.SRCALPHA)
+        gfxdraw = pygame.gfxdraw
+        if antialiased:
+            gfxdraw.aacircle(sprite, radius, radius, radius, color)
+        gfxdraw.filled_circle(sprite, radius, radius, radius, color)
+        return sprite
+
+    def get(self, radius: int, color: tuple, antialiased: bool = True) -> 'pygame.Surface':
+        """
+        ### Arguments
+         - `radius (int)`: Radius of the circle.
+         - `color (tuple)`: Color of the circle as (red, green, blue, [alpha]).
+         - `antialiased [bool=True]`: Whether the circle has the anti-aliased outline or not.
+
+        ### Returns
+        `pygame.Surface`: Cached sprite of the circle, rasterized on the first request.
+        """
+        if len(color) == 3:
+            # Keyed like the same color with an opaque alpha, as it comes from SpriteBatch.add_circles()
+            color = (color[0], color[1], color[2], 255)
+        key = (radius, color, antialiased)
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        sprite = self.rasterize(radius, color, antialiased)
+        self._sprites[key] = sprite
+        if len(self._sprites) > self.max_entries:
+            self._sprites.popitem(last=False)
+        return sprite
+
+    def __len__(self) -> int:
+        return len(self._sprites)
+
+    def __str__(self):
+        s = "SpriteCache: entries={}, max_entries={}, hits={}, misses={}"
+        return s.format(len(self), self.max_entries, self.hits, self.misses)
+
+
+class SpriteBatch:
+    """
+    Collects the circle sprites of a frame and draws them with a single `Surface.blits()` call.
+
+    Sprites are queued in world coordinates and drawn relative to `origin`, which is
+    the world position of the top left corner of the surface, e.g. `Camera.origin`.
+    The circles are anti-aliased while `antialiased` is set.
+    ___
+
+    ### Arguments
+     - `sprite_cache (SpriteCache)`: Cache that the sprites are taken from.
+    """
+
+    def __init__(self, sprite_cache: SpriteCache):
+        self.sprite_cache = sprite_cache
+        self.origin: Tuple[int, int] = (0, 0)
+        self.antialiased = True
+        self._blits: List[Tuple['pygame.Surface', Tuple[int, int]]] = []
+
+    def add_circle(self, x: int, y: int, radius: int, color: tuple) -> None:
+        """
+        Queues a circle centered at (`x`, `y`).
+        ___
+
+        ### Arguments
+         - `x (int)`: Center of the circle in X axis.
+         - `y (int)`: Center of the circle in Y axis.
+         - `radius (int)`: Radius of the circle.
+         - `color (tuple)`: Color of the circle as (red, green, blue, [alpha]).
+        """
+        left, top = self.origin
+        sprite = self.sprite_cache.get(radius, color, self.antialiased)
+        self._blits.append((sprite, (x - radius - left, y - radius - top)))
+
+    def add_circles(self, x: np.ndarray, y: np.ndarray, radius: np.ndarray, color: np.ndarray) -> None:
+        """
+        Queues many circles at once. The sprites are looked up once per distinct
+        (radius, color) pair instead of once per circle.
+        ___
+
+        ### Arguments
+         - `x (numpy.ndarray)`: Centers of the circles in X axis.
+         - `y (numpy.ndarray)`: Centers of the circles in Y axis.
+         - `radius (numpy.ndarray)`: Integer radii of the circles.
+         - `color (numpy.ndarray)`: (N, 4) uint8 array of the colors as (red, green, blue, alpha).
+        """
+        origin_x, origin_y = self.origin
+        lefts = (x.astype(np.int64) - radius - origin_x).tolist()
+        tops = (y.astype(np.int64) - radius - origin_y).tolist()
+        packed_colors = np.ascontiguousarray(color, dtype=np.uint8).view(np.uint32).ravel().tolist()
+
+        sprites = {}
+        blits = self._blits
+        antialiased = self.antialiased
+        for left, top, circle_radius, packed_color in zip(lefts, tops, radius.tolist(), packed_colors):
+            key = (circle_radius, packed_color)
+            sprite = sprites.get(key)
+            if sprite is None:
+                circle_color = tuple(packed_color.to_bytes(4, sys.byteorder))
+                sprite = sprites[key] = self.sprite_cache.get(circle_radius, circle_color, antialiased)
+            blits.append((sprite, (left, top)))
+
+    def add_sprite(self, sprite: 'pygame.Surface', x: int, y: int) -> None:
+        """
+        Queues an already looked up sprite with its top left corner at (`x`, `y`).
+        """
+        left, top = self.origin
+        self._blits.append((sprite, (x - left, y - top)))
+
+    def flush(self, surface: 'pygame.Surface', return_rects: bool = False) -> List['pygame.Rect']:
+        """
+        Draws the queued sprites onto `surface` in the order they were added and empties the batch.
+        ___
+
+        ### Arguments
+         - `surface (pygame.Surface)`: Surface to draw the sprites on.
+         - `return_rects [bool=False]`: Whether to return the drawn rectangles or not.
+
+        ### Returns
+        `List[pygame.Rect]`: Drawn rectangles if `return_rects` is set, an empty list otherwise.
+        """
+        rects = []
+        if self._blits:
+            rects = surface.blits(self._blits, doreturn=return_rects) or []
+            self._blits.clear()
+        return rects
+
+    def __len__(self) -> int:
+        return len(self._blits)
@@ -1,10 +1,13 @@
-import pygame
-from pygame import gfxdraw
+from typing import TYPE_CHECKING
 
+import render_backend
 from renderable import Renderable
 
 from position import Position
-from color import Color
+from color import WHITE
+
+if TYPE_CHECKING:
+    import pygame
 
 class Target(Renderable):
     """
@@ -22,16 +25,27 @@ class Target(Renderable):
         self.position = position
         self.size = size
 
-    def _draw(self, surface, fps):
+    def _draw(self, surface, fps, alpha):
+        gfxdraw = render_backend.gfxdraw()
         gfxdraw.hline(
             surface, 
             int(self.position.x - self.size / 2),
             int(self.position.x + self.size / 2),
             int(self.position.y),
-            Color(255, 255, 255).as_tuple())
+            WHITE.as_tuple())
         gfxdraw.vline(
             surface, 
             int(self.position.x), 
             int(self.position.y - self.size / 2),
             int(self.position.y + self.size / 2),
-            Color(255, 255, 255).as_tuple())
+            WHITE.as_tuple())
+
+    def bounding_rect(self, alpha: float = 1.0) -> 'pygame.Rect':
+        """
+        ### Returns
+        `pygame.Rect`: Rectangle that covers the drawn crosshair
+        """
+        Rect = render_backend.load().Rect
+        return Rect(int(self.position.x - self.size / 2),
+                    int(self.position.y - self.size / 2),
+                    self.size + 2, self.size + 2)
@@ -0,0 +1,200 @@
+import threading
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+from game_clock import GameClock
+from replay import ReplayRecorder, TickInput
+from sprite_cache import SpriteBatch
+from world import World
+
+
+class WorldSnapshot:
+    """
+    Immutable copy of what is needed to draw a simulated tick. The arrays are read-only
+    copies, so a snapshot can be drawn on one thread while the next one is simulated on
+    another without any locking.
+    ___
+
+    ### Arguments
+     - `tick (int)`: Number of the simulated ticks.
+     - `published_at (float)`: `time.perf_counter()` of the end of the tick.
+     - `input_time (float)`: `time.perf_counter()` of the input consumed by the tick. (None) if none.
+     - `bubble (tuple)`: Previous x, previous y, x, y and radius of the bubble.
+     - `bubble_color (tuple)`: Color of the bubble as (red, green, blue, [alpha]).
+     - `foods (tuple (numpy.ndarray, ...))`: x, y, radius and color arrays of the visible foods.
+     - `target (tuple (float, float))`: Target of the bubble in world coordinates.
+    """
+
+    __slots__ = ('tick', 'published_at', 'input_time', 'bubble', 'bubble_color', 'foods', 'target')
+
+    def __init__(self, tick: int, published_at: float, input_time: Optional[float], bubble: tuple,
+                 bubble_color: tuple, foods: Tuple[np.ndarray, ...], target: Tuple[float, float]):
+        for array in foods:
+            array.flags.writeable = False
+        self.tick = tick
+        self.published_at = published_at
+        self.input_time = input_time
+        self.bubble = bubble
+        self.bubble_color = bubble_color
+        self.foods = foods
+        self.target = target
+
+    @staticmethod
+    def capture(world: World, input_time: float = None) -> 'WorldSnapshot':
+        """
+        ### Returns
+        `WorldSnapshot`: Snapshot of the current state of `world`.
+        """
+        bubble = world.bubble
+        previous = bubble.previous_position
+        return WorldSnapshot(world.tick, time.perf_counter(), input_time,
+                             (previous.x, previous.y, bubble.position.x, bubble.position.y, bubble.radius()),
+                             bubble.color.as_tuple(), world.foods.visible_arrays(), world.target.as_tuple())
+
+    def bubble_position(self, alpha: float) -> Tuple[float, float]:
+        """
+        ### Returns
+        `tuple (float, float)`: Bubble position interpolated between the previous and the current tick.
+        """
+        previous_x, previous_y, x, y, _ = self.bubble
+        return previous_x + (x - previous_x) * alpha, previous_y + (y - previous_y) * alpha
+
+    def render_sprites(self, sprite_batch: SpriteBatch, alpha: float, viewport: tuple = None,
+                       bubble_visible: bool = True) -> None:
+        """
+        Queues the sprites of the foods in the `viewport` and of the bubble.
+        ___
+
+        ### Arguments
+         - `sprite_batch (SpriteBatch)`: Batch that will draw the snapshot.
+         - `alpha (float)`: Fraction of a tick to interpolate the bubble with.
+         - `viewport [tuple (left, top, right, bottom)=None]`: Drawn area of the world. (None) for everywhere.
+         - `bubble_visible [bool=True]`: Whether to draw the bubble or not.
+        """
+        x, y, radius, color = self.foods
+        if viewport is not None:
+            left, top, right, bottom = viewport
+            selected = np.flatnonzero((x + radius >= left) & (x - radius <= right)
+                                      & (y + radius >= top) & (y - radius <= bottom))
+            x, y, radius, color = x[selected], y[selected], radius[selected], color[selected]
+        sprite_batch.add_circles(x, y, radius, color)
+
+        if bubble_visible:
+            bubble_x, bubble_y = self.bubble_position(alpha)
+            sprite_batch.add_circle(int(bubble_x), int(bubble_y), self.bubble[4], self.bubble_color)
+
+    def __str__(self):
+        return "WorldSnapshot: tick={}, foods={}".format(self.tick, len(self.foods[0]))
+
+
+class SimulationThread(threading.Thread):
+    """
+    Runs a world at a fixed tick rate on its own thread and publishes a `WorldSnapshot`
+    after the ticks of every wake-up.
+
+    Every publish builds a new immutable snapshot while the renderer draws the previous
+    one, then swaps a single reference to it, which is atomic. Snapshots are never
+    reused, so the renderer can keep reading the one it took as long as it needs.
+    Inputs are handed over the same way with `submit_input()`.
+    ___
+
+    ### Arguments
+     - `world (World)`: World to be simulated. It must not be used by other threads.
+     - `tick_rate (int)`: Simulation ticks per second.
+     - `recorder [ReplayRecorder=None]`: Recorder of the consumed inputs. (None) for no recording.
+     - `max_frame_time [float=0.25]`: Longest stall in seconds that is caught up.
+    """
+
+    def __init__(self, world: World, tick_rate: int, recorder: ReplayRecorder = None,
+                 max_frame_time: float = 0.25):
+        threading.Thread.__init__(self, name='simulation', daemon=True)
+        self.world = world
+        self.tick_rate = tick_rate
+        self.recorder = recorder
+        self.game_clock = GameClock(tick_rate, max_frame_time)
+        self._input: Tuple[TickInput, Optional[float]] = (
+            TickInput(world.target.x, world.target.y), None)
+        self._consumed_input: Tuple[TickInput, Optional[float]] = None
+        self._snapshot = WorldSnapshot.capture(world)
+        self._stopped = threading.Event()
+
+    @property
+    def snapshot(self) -> WorldSnapshot:
+        """
+        `WorldSnapshot`: Latest complete snapshot.
+        """
+        return self._snapshot
+
+    def submit_input(self, tick_input: TickInput, input_time: float = None) -> None:
+        """
+        Hands an input over to the simulation, it is used from the next tick on. If the
+        previous input was not used by a tick yet, the earlier of their times is kept, so
+        its latency is still measured when this input replaces it.
+        ___
+
+        ### Arguments
+         - `tick_input (TickInput)`: Input in world coordinates.
+         - `input_time [float=None]`: `time.perf_counter()` of the input, for measuring latency.
+        """
+        submitted = self._input
+        pending_time = submitted[1]
+        if submitted is not self._consumed_input and pending_time is not None \
+                and (input_time is None or pending_time < input_time):
+            input_time = pending_time
+        self._input = (tick_input, input_time)
+
+    def run(self) -> None:
+        world = self.world
+        tick_rate = self.tick_rate
+        game_clock = self.game_clock
+        last = time.perf_counter()
+        while not self._stopped.is_set():
+            now = time.perf_counter()
+            ticks = game_clock.advance(now - last)
+            last = now
+
+            input_time = None
+            for _ in range(ticks):
+                submitted = self._input
+                tick_input, submitted_time = submitted
+                if submitted is not self._consumed_input:
+                    self._consumed_input = submitted
+                    input_time = submitted_time
+                tick_input.apply(world)
+                if self.recorder is not None:
+                    self.recorder.record(tick_input)
+                world.step(tick_rate)
+            if ticks:
+                self._snapshot = WorldSnapshot.capture(world, input_time)
+
+            # Sleep until the next tick is due
+            self._stopped.wait((1 - game_clock.alpha) * game_clock.tick_duration)
+
+    def stop(self) -> None:
+        """
+        Stops the simulation and waits for the thread to finish.
+        """
+        self._stopped.set()
+        if self.is_alive():
+            self.join()
+
+    def __str__(self):
+        return "SimulationThread: tick_rate={}, tick={}".format(self.tick_rate, self.world.tick)
+
+
+def main():
+    """ Created for test purposes """
+    from size import Size
+
+    world = World(Size(900, 675), seed=0)
+    simulation = SimulationThread(world, 60)
+    simulation.start()
+    time.sleep(0.5)
+    simulation.stop()
+    print(simulation, simulation.snapshot)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,15 +4,90 @@ from typing import Tuple
 class Velocity:
     """
     A basic class for simplifying velocity operations.
+
+    The velocity is stored as its X and Y components, so the motion can be read without
+    any trigonometry. The polar `angle` and `coefficent` are computed only when asked.
     ___
-    
+
     ### Arguments
     - `angle (float)`: Angle of motion __in degrees__.
     - `coefficent (float)`: Velocity coefficent of motion (_Pixels per Second_).
     """
-    def __init__(self, angle: float, coefficent: float) -> Tuple[float, float]:
-        self.angle = angle % 360
-        self.coefficent = coefficent
+
+    __slots__ = ('velocity_x', 'velocity_y', '_angle')
+
+    def __init__(self, angle: float, coefficent: float):
+        self._angle = angle % 360
+        self.velocity_x = math.cos(math.radians(self._angle)) * coefficent
+        self.velocity_y = math.sin(math.radians(self._angle)) * coefficent
+
+    @staticmethod
+    def from_components(velocity_x: float, velocity_y: float) -> 'Velocity':
+        """
+        Creates a velocity from its axial components.
+        ___
+
+        ### Arguments
+         - `velocity_x (float)`: Velocity in X axis (_Pixels per Second_).
+         - `velocity_y (float)`: Velocity in Y axis (_Pixels per Second_).
+
+        ### Returns
+        `Velocity`: Created velocity
+        """
+        velocity = Velocity.__new__(Velocity)
+        velocity.set_components(velocity_x, velocity_y)
+        return velocity
+
+    def set_components(self, velocity_x: float, velocity_y: float) -> None:
+        """
+        Sets the axial components of the velocity in place.
+        ___
+
+        ### Arguments
+         - `velocity_x (float)`: Velocity in X axis (_Pixels per Second_).
+         - `velocity_y (float)`: Velocity in Y axis (_Pixels per Second_).
+        """
+        self.velocity_x = velocity_x
+        self.velocity_y = velocity_y
+        self._angle = None
+
+    @property
+    def angle(self) -> float:
+        """
+        `float`: Angle of motion __in degrees__, in [0, 360)
+        """
+        if self._angle is None:
+            self._angle = math.degrees(math.atan2(self.velocity_y, self.velocity_x)) % 360
+        return self._angle
+
+    @angle.setter
+    def angle(self, angle: float):
+        coefficent = self.coefficent
+        self._angle = angle % 360
+        self.velocity_x = math.cos(math.radians(self._angle)) * coefficent
+        self.velocity_y = math.sin(math.radians(self._angle)) * coefficent
+
+    @property
+    def coefficent(self) -> float:
+        """
+        `float`: Velocity coefficent of motion (_Pixels per Second_)
+        """
+        return math.hypot(self.velocity_x, self.velocity_y)
+
+    @coefficent.setter
+    def coefficent(self, coefficent: float):
+        magnitude = self.coefficent
+        if magnitude > 0:
+            scale = coefficent / magnitude
+            self.velocity_x *= scale
+            self.velocity_y *= scale
+            if coefficent < 0:
+                self._angle = None
+        else:
+            # There is no direction left in the components, use the last known angle
+            angle = math.radians(self.angle)
+            self.velocity_x = math.cos(angle) * coefficent
+            self.velocity_y = math.sin(angle) * coefficent
 
     def axial_motion(self) -> Tuple[float, float]:
         """
@@ -21,10 +96,7 @@ class Velocity:
         ### Returns
         `tuple (float, float)`: Velocity tuple in X and Y axis as (velocity_x, velocity_y)
         """
-        velocity_x = math.cos(math.radians(self.angle)) * self.coefficent
-        velocity_y = math.sin(math.radians(self.angle)) * self.coefficent
-        
-        return velocity_x, velocity_y
+        return self.velocity_x, self.velocity_y
 
     @staticmethod
     def calculate_angle(x: int, y: int) -> float:
@@ -34,14 +106,14 @@ class Velocity:
         ### Arguments
          - `x (int)`: Horizontonal edge of triangle
          - `y (int)`: Horizontonal edge of triangle
-        
+
         ### Returns
         `float`: Calculated angle **in degrees**
         """
         if x == 0:
             if y >= 0:
                 return 90
-            else: 
+            else:
                 return 270
         elif y == 0:
             if x >= 0:
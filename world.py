@@ -0,0 +1,178 @@
+import random
+
+from bubble import Bubble
+from collision import CollisionDetector
+from food import Food
+from food_field import FoodField
+from food_generator import FoodGenerator
+from position import Position
+from profiler import NullProfiler
+from size import Size
+from spatial_grid import SpatialGrid
+from velocity import Velocity
+
+
+class World:
+    """
+    Class for holding and advancing the state of the game without rendering it.
+
+    A single `step()` generates, ages and expires the foods, steers and moves the
+    bubble towards the `target` and lets the bubble eat the foods it touches.
+    ___
+
+    ### Arguments
+     - `size (Size)`: Size of the world.
+     - `generation_rate [float=1]`: Number of foods to be generated in one second.
+     - `seed [int=None]`: Seed of the food generation. (None) for an unpredictable seed.
+     - `target [Position=None]`: Position that the bubble follows. (None) for the origin.
+     - `profiler [FrameProfiler=None]`: Profiler that times the phases of `step()`.
+       Needs the `generation`, `expiry`, `steering` and `feeding` phases.
+     - `max_velocity [float=Bubble.DEFAULT_MAX_VELOCITY]`: Max velocity of the bubble.
+     - `easing [float=40]`: Easing coefficent of the bubble's steering.
+     - `swept_collision [bool=False]`: Whether the bubble eats the foods along its whole movement
+       of the tick or only the ones it touches at the end of it. Needed for low tick rates, where
+       the bubble moves farther than a food in a tick.
+    """
+
+    def __init__(self, size: Size, generation_rate: float = 1, seed: int = None,
+                 target: Position = None, profiler=None,
+                 max_velocity: float = Bubble.DEFAULT_MAX_VELOCITY, easing: float = 40,
+                 swept_collision: bool = False):
+        self.size = size
+        self.target = target if target is not None else Position(0, 0)
+        self.profiler = profiler if profiler is not None else NullProfiler()
+        self.easing = easing
+        self.swept_collision = swept_collision
+
+        self.bubble = Bubble(
+            position=Position(400, 400),
+            velocity=Velocity(90, 300),
+            max_velocity=max_velocity)
+
+        self.food_grid = SpatialGrid.for_radii(size, Food.DEFAULT_SIZE.width / 2, self.bubble.radius())
+        self.foods = FoodField(food_grid=self.food_grid)
+        self.food_generator = FoodGenerator(size, generation_rate=generation_rate, generating=True,
+                                            seed=seed)
+        self.collision_detector = CollisionDetector(self.food_grid)
+
+        self.tick = 0
+        self.foods_eaten = 0
+        self.distance_travelled = 0.0
+
+    def step(self, fps: int) -> None:
+        """
+        Advances the world by a single tick of `1 / fps` seconds.
+        ___
+
+        ### Arguments
+         - `fps (int)`: The FPS (Frames per Second) value of the simulation
+        """
+        profiler = self.profiler
+        with profiler.phase('generation'):
+            self.food_generator.generate_in_game_loop(self.foods, fps)
+        with profiler.phase('expiry'):
+            self.foods.expire(1 / fps)
+
+        with profiler.phase('steering'):
+            bubble = self.bubble
+            bubble.remember_position()
+            if self.target.euclidean_distance_to(bubble.position) < bubble.velocity.coefficent / fps:
+                self.distance_travelled += self.target.euclidean_distance_to(bubble.position)
+                bubble.position.copy_from(self.target)
+                bubble.pinned = True
+            else:
+                bubble.pinned = False
+                bubble.set_velocity_for_target(self.target, self.easing)
+                self.distance_travelled += bubble.velocity.coefficent / fps
+                bubble.commit_movement(fps)
+
+        with profiler.phase('feeding'):
+            if self.swept_collision:
+                contacts = self.collision_detector.detect_feeding_swept(self.foods, [bubble])
+            else:
+                contacts = self.collision_detector.detect_feeding(self.foods, [bubble])
+            # Removing in id order keeps the food arrays independent of the spatial index order
+            eaten = sorted((contact[1] for contact in contacts), key=lambda food: food.food_id)
+            for food in eaten:
+                self.foods.remove(food)
+                self.foods_eaten += 1
+
+        self.tick += 1
+
+    def state(self) -> dict:
+        """
+        ### Returns
+        `dict`: Snapshot of everything that `step()` depends on, for `restore()`.
+        """
+        bubble = self.bubble
+        return {
+            'tick': self.tick,
+            'foods_eaten': self.foods_eaten,
+            'distance_travelled': self.distance_travelled,
+            'target': self.target.as_tuple(),
+            'bubble': {
+                'position': bubble.position.as_tuple(),
+                'previous_position': bubble.previous_position.as_tuple(),
+                'velocity': bubble.velocity.axial_motion(),
+                'pinned': bubble.pinned,
+                'current_health': bubble.current_health,
+            },
+            'foods': self.foods.state(),
+            'food_generator': self.food_generator.state(),
+        }
+
+    def restore(self, state: dict) -> None:
+        """
+        Puts the world back to a `state()`. Stepping it afterwards gives the same ticks
+        as stepping the world that the state was taken from.
+        ___
+
+        ### Arguments
+         - `state (dict)`: State returned by `state()`.
+        """
+        self.tick = state['tick']
+        self.foods_eaten = state['foods_eaten']
+        self.distance_travelled = state['distance_travelled']
+        self.target.set(*state['target'])
+
+        bubble = self.bubble
+        bubble_state = state['bubble']
+        bubble.position.set(*bubble_state['position'])
+        bubble.previous_position.set(*bubble_state['previous_position'])
+        bubble.velocity.set_components(*bubble_state['velocity'])
+        bubble.pinned = bubble_state['pinned']
+        bubble.current_health = bubble_state['current_health']
+
+        self.foods.restore(state['foods'])
+        self.food_generator.restore(state['food_generator'])
+
+    def __str__(self):
+        s = "World: tick={}, foods={}, foods_eaten={}, distance_travelled={:.1f}"
+        return s.format(self.tick, len(self.foods), self.foods_eaten, self.distance_travelled)
+
+
+class RandomPilot:
+    """
+    Stand-in for the mouse in headless runs. Moves the target of a world to a random
+    position whenever the bubble gets within its radius.
+    ___
+
+    ### Arguments
+     - `seed [int=None]`: Seed of the target positions. (None) for an unpredictable seed.
+    """
+
+    def __init__(self, seed: int = None):
+        self.random = random.Random(seed)
+
+    def update(self, world: World) -> None:
+        """
+        Moves the target of `world` if the bubble has reached it. Call it before every `step()`.
+        ___
+
+        ### Arguments
+         - `world (World)`: World to be piloted.
+        """
+        target = world.target
+        if target.euclidean_distance_to(world.bubble.position) < world.bubble.radius():
+            target.x = self.random.uniform(0, world.size.width)
+            target.y = self.random.uniform(0, world.size.height)